@@ -136,4 +136,54 @@ LOGOUT_REDIRECT_URL = '/'
 
 MEDIA_ROOT = BASE_DIR
 
+# Published scoreboards (static JSON/HTML files written by services.publisher).
+# SCOREBOARD_ROOT holds only the guest-visible scoreboard (frozen during a freeze); in production the front proxy
+# should serve SCOREBOARD_URL straight from it. SCOREBOARD_JUDGE_ROOT holds the live and frozen scoreboards and
+# must NOT be served by the proxy - SCOREBOARD_JUDGE_URL is served by Django to judges only.
+SCOREBOARD_ROOT = os.path.join(BASE_DIR, 'scoreboards')
+SCOREBOARD_URL = '/scoreboards/'
+SCOREBOARD_JUDGE_ROOT = os.path.join(BASE_DIR, 'scoreboards-judges')
+SCOREBOARD_JUDGE_URL = '/scoreboards-judges/'
+
+# Maximum size of an uploaded solution source file in bytes (services.submission).
+SOLUTION_MAX_SIZE = 256 * 1024
+
+# Maximum size of a test output stored inline in the AutomatedTestResult row instead of a file, in bytes.
+TEST_OUTPUT_INLINE_MAX_SIZE = 4 * 1024
+
+# Maximum size of a judged program's stdout or stderr in bytes (services.judge). The program is killed beyond it.
+JUDGE_OUTPUT_LIMIT = 16 * 1024 * 1024
+
+# Unprivileged user (name or uid) that runs compilers and contestants' programs (services.judge). The judge worker
+# must run as root to switch to it, and MEDIA_ROOT and the database must not be accessible to that user. When None,
+# solutions run as the judge worker's own user WITHOUT ANY ISOLATION: they can read test files (including expected
+# outputs), stored blobs and the database. judge_worker prints a warning in that case.
+JUDGE_SANDBOX_USER = None
+
+# Directory of compiled checker and interactor programs, one subdirectory per source hash (services.judge).
+CHECKER_CACHE_ROOT = os.path.join(BASE_DIR, 'checkers')
+
+# Login credentials of qualified teams are emailed to captains by qualify_teams (services.qualification).
+# Configure EMAIL_HOST, EMAIL_PORT, EMAIL_HOST_USER, EMAIL_HOST_PASSWORD, EMAIL_USE_TLS and DEFAULT_FROM_EMAIL
+# for production; teams whose credentials could not be sent are listed by the command.
+
+# Rate limits (services.ratelimit): name -> (requests, period in seconds).
+# RATELIMIT_CACHE must be shared by all workers in production (memcached, redis);
+# the default local-memory cache limits each worker separately.
+RATE_LIMITS = {
+    'submission_team': (10, 300),
+    'submission_task': (3, 120),
+}
+RATELIMIT_CACHE = 'default'
+
+# Cache of clarifications pages and versions (services.clarifications). It must be shared by all
+# workers in production (memcached, redis): the notification stream (SSE) polls the version bumped
+# by the worker that saved an explanation, so with the local-memory cache clients never see it.
+CLARIFICATIONS_CACHE = 'default'
+
+# Cache of the registration form's competition choices and institution search results (buzkashi_app.forms).
+# It must be shared by all workers in production (memcached, redis): saving a competition or an institution
+# invalidates the entries only in the cache of the worker that saved it, others would serve stale choices.
+REGISTRATION_CACHE = 'default'
+
 django_heroku.settings(locals())
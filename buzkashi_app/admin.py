@@ -1,14 +1,105 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.db import transaction
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 
 from buzkashi_app.models import Judge, Task, Team, Competition, Participant, EduInstitution, Solution, AutomatedTest, \
-    AutomatedTestResult
+    AutomatedTestResult, Notice, Explanation, ReferenceSolution, TestTimeLimit
+from services.importer import IMPORTERS, FORMATS
+
+
+class ImportForm(forms.Form):
+    """
+    Klasa formularzu importu danych z pliku.
+    """
+
+    file = forms.FileField(label='Plik')
+    format = forms.ChoiceField(label='Format', choices=[(fmt, fmt) for fmt in FORMATS])
+
+
+class ImportAdmin(admin.ModelAdmin):
+    """
+    Klasa panelu administracyjnego z widokiem importu obiektów z pliku csv lub JSON Lines.
+    """
+
+    change_list_template = 'admin/import_change_list.html'
+    import_kind = None
+    """Rodzaj importowanych danych - klucz słownika services.importer.IMPORTERS."""
+
+    max_reported_errors = 50
+    """Maksymalna liczba błędów wyświetlanych po imporcie."""
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='%s_%s_import' % info),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        """
+        Widok importu. Plik przetwarzany jest strumieniowo, a błędy wierszy wyświetlane jako komunikaty.
+        """
+        if not self.has_add_permission(request):
+            return redirect('admin:index')
+
+        form = ImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            report = IMPORTERS[self.import_kind]().run(form.cleaned_data['file'].file, form.cleaned_data['format'])
+
+            for line_num, message in report.errors[:self.max_reported_errors]:
+                messages.error(request, f'Wiersz {line_num}: {message}')
+            if len(report.errors) > self.max_reported_errors:
+                messages.error(request, f'Pominięto {len(report.errors) - self.max_reported_errors} kolejnych błędów')
+            messages.success(request, f'Zaimportowano: {report.created}, błędy: {len(report.errors)}')
+
+            return redirect(f'admin:{self.model._meta.app_label}_{self.model._meta.model_name}_changelist')
+
+        context = dict(self.admin_site.each_context(request), opts=self.model._meta, form=form,
+                       title=f'Import: {self.model._meta.verbose_name_plural}')
+        return TemplateResponse(request, 'admin/import.html', context)
+
+
+@admin.register(EduInstitution)
+class EduInstitutionAdmin(ImportAdmin):
+    import_kind = 'institutions'
+
+
+@admin.register(Team)
+class TeamAdmin(ImportAdmin):
+    import_kind = 'teams'
+
+    def save_model(self, request, obj, form, change):
+        """
+        Zapisuje zespół i aktualizuje licznik zarejestrowanych zespołów zawodów (zob. Competition.reserve_slot).
+        Zespół spoza listy rezerwowej, dla którego brak wolnego miejsca, trafia na listę rezerwową.
+        """
+        previous = Team.objects.filter(id=obj.id).values_list('competition_id', 'is_waitlisted').first() \
+            if change else None
+        with transaction.atomic():
+            if previous is not None and not previous[1] \
+                    and (obj.is_waitlisted or previous[0] != obj.competition_id):
+                Competition.objects.get(id=previous[0]).release_slot()
+            holds_slot = previous is not None and not previous[1] and previous[0] == obj.competition_id
+            if not obj.is_waitlisted and not holds_slot and not obj.competition.reserve_slot():
+                obj.is_waitlisted = True
+                messages.warning(request, f'Brak wolnych miejsc - zespół {obj.name} dodano do listy rezerwowej')
+            super().save_model(request, obj, form, change)
+
+
+@admin.register(Participant)
+class ParticipantAdmin(ImportAdmin):
+    import_kind = 'participants'
+
 
 admin.site.register(Competition)
-admin.site.register(Team)
-admin.site.register(Participant)
-admin.site.register(EduInstitution)
 admin.site.register(Task)
 admin.site.register(Judge)
 admin.site.register(Solution)
 admin.site.register(AutomatedTest)
 admin.site.register(AutomatedTestResult)
+admin.site.register(ReferenceSolution)
+admin.site.register(TestTimeLimit)
+admin.site.register(Notice)
+admin.site.register(Explanation)
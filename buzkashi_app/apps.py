@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class BuzkashiAppConfig(AppConfig):
     name = 'buzkashi_app'
+
+    def ready(self):
+        """
+        Rejestruje odbiorniki sygnałów aplikacji.
+        """
+        from . import signals  # noqa: F401
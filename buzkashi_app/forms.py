@@ -1,6 +1,117 @@
 from django import forms
+from django.conf import settings
+from django.core.cache import caches
+from django.urls import reverse
+from django.utils import timezone
 from . import models
 
+COMPETITION_CHOICES_CACHE_KEY = 'registration:competition-choices:{date}'
+"""Klucz pamięci podręcznej dla listy wyboru zawodów otwartych na rejestrację. Zależy od bieżącej daty."""
+
+COMPETITION_CHOICES_TIMEOUT = 60 * 60
+"""Czas przechowywania listy wyboru zawodów w pamięci podręcznej (w sekundach)."""
+
+
+def _cache():
+    """
+    :return: pamięć podręczna formularza rejestracji (settings.REGISTRATION_CACHE). Lista wyboru zawodów i wersja
+        wyników wyszukiwania placówek są unieważniane przez proces zapisujący zmianę, a odczytywane przez wszystkie
+        procesy obsługujące rejestrację, więc pamięć musi być wspólna dla wszystkich procesów (np. memcached, redis).
+    """
+    return caches[settings.REGISTRATION_CACHE]
+
+
+def get_competition_choices():
+    """
+    Zwraca listę wyboru zawodów otwartych na rejestrację w postaci par (id, etykieta).
+    Lista jest wyliczana raz na dzień (okno rejestracji zależy od daty) i przechowywana w pamięci podręcznej
+    do czasu zmiany dowolnych zawodów (zob. invalidate_competition_choices).
+
+    :return: lista par (id zawodów, etykieta).
+    """
+    key = COMPETITION_CHOICES_CACHE_KEY.format(date=timezone.now().date().isoformat())
+    choices = _cache().get(key)
+    if choices is None:
+        choices = [(competition.id, competition_label(competition))
+                   for competition in models.Competition.get_coming_competitions(registration_open=True)]
+        _cache().set(key, choices, COMPETITION_CHOICES_TIMEOUT)
+    return choices
+
+
+INSTITUTION_SEARCH_CACHE_KEY = 'registration:institutions:{version}:{query}'
+"""Klucz pamięci podręcznej dla wyników wyszukiwania placówek edukacyjnych."""
+
+INSTITUTION_SEARCH_VERSION_KEY = 'registration:institutions:version'
+"""Klucz pamięci podręcznej z wersją wyników wyszukiwania. Zmiana wersji unieważnia wszystkie wyniki."""
+
+INSTITUTION_SEARCH_LIMIT = 20
+"""Maksymalna liczba zwracanych placówek edukacyjnych."""
+
+INSTITUTION_SEARCH_MIN_LENGTH = 2
+"""Minimalna długość szukanej frazy."""
+
+
+def search_institution_choices(query):
+    """
+    Zwraca listę wyboru placówek edukacyjnych pasujących do frazy w postaci par (id, etykieta).
+    Wyniki są przechowywane w pamięci podręcznej do czasu zmiany dowolnej placówki
+    (zob. invalidate_institution_choices).
+
+    :param query: szukana fraza.
+    :return: lista par (id placówki, etykieta). Pusta dla zbyt krótkiej frazy.
+    """
+    query = ' '.join(query.split()).lower()
+    if len(query) < INSTITUTION_SEARCH_MIN_LENGTH:
+        return []
+
+    version = _cache().get_or_set(INSTITUTION_SEARCH_VERSION_KEY, 1, None)
+    key = INSTITUTION_SEARCH_CACHE_KEY.format(version=version, query=query.encode('utf-8').hex())
+    choices = _cache().get(key)
+    if choices is None:
+        choices = [(institution.id, institution_label(institution))
+                   for institution in models.EduInstitution.search(query, limit=INSTITUTION_SEARCH_LIMIT)]
+        _cache().set(key, choices)
+    return choices
+
+
+def invalidate_institution_choices():
+    """
+    Unieważnia wyniki wyszukiwania placówek edukacyjnych. Wywoływana po każdej zmianie modelu placówki.
+    """
+    try:
+        _cache().incr(INSTITUTION_SEARCH_VERSION_KEY)
+    except ValueError:
+        _cache().set(INSTITUTION_SEARCH_VERSION_KEY, 1, None)
+
+
+def institution_label(institution):
+    """
+    Definiuje reprezentacje placówki edukacyjnej dla użytkownika.
+
+    :param institution: instancja modelu placówki edukacyjnej
+    :return: 'nazwa, rejon'
+    """
+    return f"{institution.name}, {institution.region}"
+
+
+def competition_label(competition):
+    """
+    Definiuje reprezentacje zawodów dla użytkownika.
+
+    :param competition: instancja modelu zawodów
+    :return: 'tytuł, sesja, data rozpoczęcia'
+    """
+    return f'{competition.title}, ' \
+           f'{"uczelnie wyższe" if competition.session == models.Competition.Session.UNIVERSITY_SESSION else "szkoły średnie"}, ' \
+           f'{competition.start_date}'
+
+
+def invalidate_competition_choices():
+    """
+    Usuwa z pamięci podręcznej listę wyboru zawodów. Wywoływana po każdej zmianie modelu zawodów.
+    """
+    _cache().delete(COMPETITION_CHOICES_CACHE_KEY.format(date=timezone.now().date().isoformat()))
+
 
 class ParticipantForm(forms.ModelForm):
     """
@@ -61,10 +172,31 @@ class EduInstitutionSelectForm(forms.Form):
             :param obj: instancja modelu placówki edukacyjnej
             :return: 'nazwa, rejon'
             """
-            return f"{obj.name}, {obj.region}"
+            return institution_label(obj)
 
     # placówka edukacyjna
     institution = EduInstitutionChoiceField(label='Nazwa', queryset=models.EduInstitution.objects.all())
+    """
+    Lista wyboru zawiera tylko wybraną placówkę. Pozostałe placówki są wyszukiwane przez widok
+    institution_search_view, a walidowane jest wyłącznie wybrane id.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(EduInstitutionSelectForm, self).__init__(*args, **kwargs)
+        field = self.fields['institution']
+        field.choices = [('', field.empty_label)]
+        field.widget.attrs['data-search-url'] = reverse('institution_search')
+
+    def clean_institution(self):
+        """
+        Dodaje wybraną placówkę do listy wyboru, aby została wyświetlona po ponownym wyrenderowaniu formularza.
+
+        :return: model wybranej placówki edukacyjnej.
+        """
+        institution = self.cleaned_data['institution']
+        field = self.fields['institution']
+        field.choices = [('', field.empty_label), (institution.id, institution_label(institution))]
+        return institution
 
 
 class CompetitionSelectForm(forms.Form):
@@ -79,16 +211,24 @@ class CompetitionSelectForm(forms.Form):
             :param obj: instancja modelu zawodów
             :return: 'tytuł, sesja, data rozpoczęcia'
             """
-            return f'{obj.title}, ' \
-                   f'{"uczelnie wyższe" if obj.session == models.Competition.Session.UNIVERSITY_SESSION else "szkoły średnie"}, ' \
-                   f'{obj.start_date}'
+            return competition_label(obj)
 
-    competition = CompetitionChoiceField(label='Zawody',
-                                         queryset=models.Competition.get_coming_competitions(registration_open=True))
+    competition = CompetitionChoiceField(label='Zawody', queryset=models.Competition.objects.none())
     """
     Zawody wybierane są tylko z nadchodzących, otwartych na rejestrację.
+    Query set oraz lista wyboru są ustawiane dla każdego formularza osobno w konstruktorze.
     """
 
+    def __init__(self, *args, **kwargs):
+        """
+        Ustawia query set zawodów otwartych na rejestrację w chwili utworzenia formularza (używany tylko do walidacji
+        wybranego id) oraz listę wyboru pobraną z pamięci podręcznej.
+        """
+        super(CompetitionSelectForm, self).__init__(*args, **kwargs)
+        field = self.fields['competition']
+        field.queryset = models.Competition.get_coming_competitions(registration_open=True)
+        field.choices = [('', field.empty_label)] + get_competition_choices()
+
 
 class RegistrationComplimentForm(forms.Form):
     """
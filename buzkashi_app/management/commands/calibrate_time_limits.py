@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from buzkashi_app.models import Task, AutomatedTestResult
+from services import calibration, judge
+
+VARIANCE_WARNING = 0.1
+"""Współczynnik zmienności pomiarów (odchylenie / mediana), powyżej którego pomiar oznaczany jest jako niestabilny."""
+
+
+class Command(BaseCommand):
+    """
+    Komenda wyznaczania limitów czasu testów zadania dla języków programowania z czasów działania rozwiązań
+    wzorcowych (zob. services.calibration). Komendę należy uruchamiać na maszynie oceniającej rozwiązania.
+    Użycie: python manage.py calibrate_time_limits <id zadania> [--runs N] [--multiplier M] [--headroom MS]
+    [--dry-run]
+    """
+
+    help = 'Wyznacza limity czasu testów zadania dla każdego języka z czasów działania rozwiązań wzorcowych.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('task_id', type=int)
+        parser.add_argument('--runs', type=int, default=calibration.RUNS,
+                            help=f'Liczba pomiarów każdego testu. Domyślnie: {calibration.RUNS}.')
+        parser.add_argument('--multiplier', type=float, default=calibration.MULTIPLIER,
+                            help=f'Mnożnik mediany czasu działania. Domyślnie: {calibration.MULTIPLIER}.')
+        parser.add_argument('--headroom', type=int, default=calibration.HEADROOM // timedelta(milliseconds=1),
+                            help='Zapas czasu w milisekundach. Domyślnie: 100.')
+        parser.add_argument('--dry-run', action='store_true', help='Tylko wypisuje wyznaczone limity.')
+
+    def handle(self, *args, **options):
+        try:
+            task = Task.objects.get(id=options['task_id'])
+        except Task.DoesNotExist:
+            raise CommandError(f"Zadanie o id {options['task_id']} nie istnieje")
+        if options['runs'] < 1:
+            raise CommandError('Liczba pomiarów musi być dodatnia')
+
+        try:
+            result = calibration.calibrate(task, options['runs'], options['multiplier'],
+                                           timedelta(milliseconds=options['headroom']), dry_run=options['dry_run'])
+        except judge.CheckerError as error:
+            raise CommandError(str(error))
+
+        for failure in result.failures:
+            test = failure.test.title or failure.test.id if failure.test else 'kompilacja'
+            self.stderr.write(f'Rozwiązanie wzorcowe {failure.reference.title or failure.reference.id}, '
+                              f'test {test}: {AutomatedTestResult.TestStatus(failure.status).label}')
+
+        for measurement in result.measurements:
+            variance = measurement.deviation / measurement.median if measurement.median else 0
+            line = (f'{measurement.test.title or measurement.test.id}\t{measurement.language}\t'
+                    f'mediana {measurement.median.total_seconds():.3f}s ± {measurement.deviation.total_seconds():.3f}s '
+                    f'({variance:.0%})\tlimit {measurement.previous.total_seconds():.2f}s -> '
+                    f'{measurement.max_time.total_seconds():.2f}s')
+            self.stdout.write(self.style.WARNING(line + '\tniestabilny pomiar') if variance > VARIANCE_WARNING
+                              else line)
+
+        if not result.measurements:
+            raise CommandError('Brak poprawnych rozwiązań wzorcowych zadania')
+        self.stdout.write(self.style.SUCCESS(f'Wyznaczone limity: {len(result.measurements)}'
+                                             + (' (nie zapisano)' if options['dry_run'] else '')))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from buzkashi_app.models import Competition
+from services.scoreboard import is_binary_rank, dump_rank, parse_rank, save_rank
+
+
+class Command(BaseCommand):
+    """
+    Komenda konwersji plików rankingów z formatu csv do formatu binarnego.
+    Użycie: python manage.py convert_ranks [--dry-run]
+    """
+
+    help = 'Konwertuje pliki rankingów zawodów z formatu csv do binarnego formatu rankingu.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Wyświetla pliki do konwersji bez ich zmieniania.')
+
+    def handle(self, *args, **options):
+        converted = 0
+        competitions = Competition.objects.filter(Q(rank__gt='') | Q(rank_frozen__gt=''))
+
+        for competition in competitions.iterator():
+            contents = {}
+            for field in ('rank', 'rank_frozen'):
+                rank_file = getattr(competition, field)
+                if not rank_file:
+                    continue
+                try:
+                    with rank_file.open('rb') as file:
+                        content = file.read()
+                except FileNotFoundError:
+                    self.stderr.write(f'Brak pliku {rank_file.name} (zawody {competition.title})')
+                    continue
+                if not is_binary_rank(content):
+                    contents[field] = dump_rank(parse_rank(content))
+                    self.stdout.write(f'{competition.title}: {rank_file.name}')
+
+            if contents and not options['dry_run']:
+                save_rank(competition, contents)
+            converted += len(contents)
+
+        self.stdout.write(self.style.SUCCESS(f'Pliki do konwersji: {converted}' if options['dry_run']
+                                             else f'Skonwertowane pliki: {converted}'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from buzkashi_app.models import Competition
+from services.export import EXPORTS, FORMATS, export
+
+
+class Command(BaseCommand):
+    """
+    Komenda eksportu danych zawodów do pliku csv lub JSON.
+    Użycie: python manage.py export_results <id zawodów> <standings|solutions|test_results> [--format csv|json]
+    [--output ścieżka]
+    """
+
+    help = 'Eksportuje ranking, werdykty rozwiązań lub wyniki testów zawodów do pliku csv lub JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('competition_id', type=int)
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', default=None, help='Ścieżka pliku wynikowego. Domyślnie standardowe wyjście.')
+
+    def handle(self, *args, **options):
+        try:
+            competition = Competition.objects.get(id=options['competition_id'])
+        except Competition.DoesNotExist:
+            raise CommandError(f"Zawody o id {options['competition_id']} nie istnieją")
+
+        chunks = export(competition, options['kind'], options['format'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
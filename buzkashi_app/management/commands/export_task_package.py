@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from buzkashi_app.models import Task
+from services.packages import export_package
+
+
+class Command(BaseCommand):
+    """
+    Komenda eksportu zadania z testami automatycznymi do pakietu zadania (archiwum zip).
+    Użycie: python manage.py export_task_package <id zadania> [--output ścieżka]
+    """
+
+    help = 'Eksportuje zadanie z testami automatycznymi do pakietu zadania (archiwum zip).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('task_id', type=int)
+        parser.add_argument('--output', default=None, help='Ścieżka pliku wynikowego. Domyślnie standardowe wyjście.')
+
+    def handle(self, *args, **options):
+        try:
+            task = Task.objects.get(id=options['task_id'])
+        except Task.DoesNotExist:
+            raise CommandError(f"Zadanie o id {options['task_id']} nie istnieje")
+
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                output.writelines(export_package(task))
+        else:
+            sys.stdout.buffer.writelines(export_package(task))
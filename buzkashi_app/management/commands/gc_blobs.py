@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from services import blobs
+
+
+class Command(BaseCommand):
+    """
+    Komenda usuwania nieużywanych plików magazynu plików według skrótu treści (zob. buzkashi_app.storage).
+    Użycie: python manage.py gc_blobs [--grace GODZINY] [--recount] [--dry-run]
+    """
+
+    help = 'Usuwa pliki rozwiązań, testów i wyjść programów, do których nie odwołuje się żaden model.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=float, default=blobs.GRACE_PERIOD.total_seconds() / 3600,
+                            help='Minimalny wiek nieużywanego pliku w godzinach. Domyślnie: 24.')
+        parser.add_argument('--recount', action='store_true',
+                            help='Wylicza od nowa liczby odwołań na podstawie modeli przed usuwaniem plików.')
+        parser.add_argument('--dry-run', action='store_true', help='Tylko wypisuje liczbę plików do usunięcia.')
+
+    def handle(self, *args, **options):
+        grace = timedelta(hours=options['grace'])
+        if options['recount']:
+            self.stdout.write(f'Poprawione liczby odwołań: {blobs.recount()}')
+
+        count, freed = blobs.collect(grace, options['dry_run'])
+        orphans, orphans_freed = blobs.collect_orphans(grace, options['dry_run'])
+        self.stdout.write(self.style.SUCCESS(f'Usunięte pliki: {count + orphans} '
+                                             f'({(freed + orphans_freed) / 1024 / 1024:.1f} MiB)'))
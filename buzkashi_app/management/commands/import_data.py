@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from services.importer import IMPORTERS, FORMATS
+
+
+class Command(BaseCommand):
+    """
+    Komenda importu placówek edukacyjnych, zespołów lub uczestników z pliku csv lub JSON Lines.
+    Użycie: python manage.py import_data <institutions|teams|participants> <ścieżka> [--format csv|jsonl]
+    """
+
+    help = 'Importuje placówki edukacyjne, zespoły lub uczestników z pliku csv lub JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, default=None,
+                            help='Format pliku. Domyślnie określany na podstawie rozszerzenia.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('jsonl' if options['path'].endswith(('.jsonl', '.json')) else 'csv')
+        importer = IMPORTERS[options['kind']](batch_size=options['batch_size'])
+
+        try:
+            with open(options['path'], 'rb') as stream:
+                report = importer.run(stream, fmt)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for line_num, message in report.errors:
+            self.stderr.write(f'Wiersz {line_num}: {message}')
+        self.stdout.write(self.style.SUCCESS(f'Zaimportowano: {report.created}, błędy: {len(report.errors)}'))
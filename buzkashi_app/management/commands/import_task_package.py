@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from buzkashi_app.models import Judge
+from services.packages import PackageError, import_package
+
+
+class Command(BaseCommand):
+    """
+    Komenda importu zadania z testami automatycznymi z pakietu zadania (archiwum zip).
+    Użycie: python manage.py import_task_package <ścieżka> <nazwa użytkownika sędziego> [--title tytuł]
+    """
+
+    help = 'Tworzy zadanie z testami automatycznymi z pakietu zadania (archiwum zip).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('author', help='Nazwa użytkownika sędziego - autora zadania.')
+        parser.add_argument('--title', default=None, help='Tytuł zadania. Domyślnie tytuł z manifestu pakietu.')
+
+    def handle(self, *args, **options):
+        try:
+            author = Judge.objects.get(user__username=options['author'])
+        except Judge.DoesNotExist:
+            raise CommandError(f"Sędzia {options['author']} nie istnieje")
+
+        try:
+            task = import_package(options['path'], author, options['title'])
+        except (PackageError, OSError) as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(f'Utworzono zadanie {task.title} (id {task.id}, '
+                                             f'testy: {task.automatedtest_set.count()})'))
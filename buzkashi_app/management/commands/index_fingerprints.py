@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from buzkashi_app.models import Solution
+from services.plagiarism import index_solution
+
+
+class Command(BaseCommand):
+    """
+    Komenda indeksowania odcisków rozwiązań dla wykrywania plagiatów.
+    Użycie: python manage.py index_fingerprints [--task ID] [--all]
+    """
+
+    help = 'Wylicza odciski kodu źródłowego rozwiązań, które nie zostały jeszcze zindeksowane.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--task', type=int, help='Id zadania. Domyślnie: wszystkie zadania.')
+        parser.add_argument('--all', action='store_true',
+                            help='Indeksuje ponownie również rozwiązania, które mają odciski.')
+
+    def handle(self, *args, **options):
+        solutions = Solution.objects.order_by('id').only('id', 'task_id', 'programming_language', 'source_code')
+        if options['task'] is not None:
+            solutions = solutions.filter(task_id=options['task'])
+        if not options['all']:
+            solutions = solutions.filter(solutionfingerprint__isnull=True)
+
+        indexed = 0
+        for solution in solutions.iterator():
+            try:
+                index_solution(solution)
+            except FileNotFoundError:
+                self.stderr.write(f'Brak pliku {solution.source_code.name} (rozwiązanie {solution.id})')
+                continue
+            indexed += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Zindeksowane rozwiązania: {indexed}'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from services.outputs import inline_outputs
+
+
+class Command(BaseCommand):
+    """
+    Komenda przenoszenia małych wyjść programów z plików do wierszy wyników testów automatycznych.
+    Użycie: python manage.py inline_test_outputs
+    """
+
+    help = 'Przenosi wyjścia programów nie większe niż TEST_OUTPUT_INLINE_MAX_SIZE z plików do bazy danych.'
+
+    def handle(self, *args, **options):
+        moved, missing = inline_outputs()
+        if missing:
+            self.stderr.write(f'Brakujące pliki wyjść: {missing}')
+        self.stdout.write(self.style.SUCCESS(f'Przeniesione wyjścia: {moved}'))
@@ -0,0 +1,46 @@
+import signal
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from services import judge, worker
+
+
+class Command(BaseCommand):
+    """
+    Komenda procesu oceniającego rozwiązania z kolejki zadań oceny (zob. services.worker). Procesy mogą działać
+    jednocześnie na wielu maszynach korzystających ze wspólnej bazy danych. Sygnały SIGTERM i SIGINT kończą proces
+    po ocenie bieżącego rozwiązania. Izolację rozwiązań zapewnia tylko ustawienie settings.JUDGE_SANDBOX_USER
+    (proces musi wtedy działać jako root) - bez niego komenda wypisuje ostrzeżenie.
+    Użycie: python manage.py judge_worker [--name NAZWA] [--lease SEKUNDY] [--poll SEKUNDY] [--once]
+    """
+
+    help = 'Ocenia rozwiązania z kolejki zadań oceny testami automatycznymi.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--name', default=None, help='Nazwa procesu oceniającego. Domyślnie: <host>:<pid>.')
+        parser.add_argument('--lease', type=float, default=worker.LEASE_DURATION.total_seconds(),
+                            help=f'Czas dzierżawy zadania oceny w sekundach. '
+                                 f'Domyślnie: {worker.LEASE_DURATION.total_seconds():g}.')
+        parser.add_argument('--poll', type=float, default=worker.POLL_INTERVAL,
+                            help='Średni czas oczekiwania przy pustej kolejce w sekundach. Domyślnie: 1.')
+        parser.add_argument('--once', action='store_true', help='Kończy działanie po opróżnieniu kolejki.')
+
+    def handle(self, *args, **options):
+        stopping = []
+
+        def stop(signum, frame):
+            stopping.append(signum)
+
+        handlers = {signum: signal.signal(signum, stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+        name = options['name'] or worker.worker_name()
+        for warning in judge.sandbox_warnings():
+            self.stderr.write(self.style.WARNING(warning))
+        self.stdout.write(f'Proces oceniający {name} rozpoczął pracę')
+        try:
+            processed = worker.work(name, timedelta(seconds=options['lease']), options['poll'], options['once'],
+                                    stop=lambda: bool(stopping))
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f'Ocenione rozwiązania: {processed}'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from buzkashi_app.models import Competition
+from services.publisher import publish
+
+
+class Command(BaseCommand):
+    """
+    Komenda ponownej publikacji rankingów jako plików statycznych.
+    Użycie: python manage.py publish_scoreboards [id zawodów ...]
+    Bez argumentów publikuje rankingi obecnie odbywających się zawodów.
+    """
+
+    help = 'Publikuje rankingi zawodów jako statyczne pliki JSON i HTML.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('competition_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        if options['competition_ids']:
+            competitions = Competition.objects.filter(id__in=options['competition_ids'])
+        else:
+            competitions = Competition.get_current_competitions()
+
+        for competition in competitions:
+            publish(competition)
+            self.stdout.write(f'Opublikowano ranking zawodów {competition.title}')
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from buzkashi_app.models import Competition
+from services.qualification import qualify, team_username
+
+
+class Command(BaseCommand):
+    """
+    Komenda kwalifikacji zespołów na zawody.
+    Użycie: python manage.py qualify_teams <id zawodów> [--institution-quota N] [--dry-run]
+    """
+
+    help = 'Kwalifikuje zespoły na zawody według priorytetu, daty zgłoszenia, limitu placówek i max_teams.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('competition_id', type=int)
+        parser.add_argument('--institution-quota', type=int, default=None,
+                            help='Maksymalna liczba zespołów z jednej placówki edukacyjnej.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Wyświetla zmiany bez zapisywania ich w bazie danych.')
+
+    def handle(self, *args, **options):
+        try:
+            competition = Competition.objects.get(id=options['competition_id'])
+        except Competition.DoesNotExist:
+            raise CommandError(f"Zawody o id {options['competition_id']} nie istnieją")
+
+        result = qualify(competition, options['institution_quota'], options['dry_run'])
+
+        for team in result.added:
+            self.stdout.write(f'+ {team.name}')
+        for team in result.removed:
+            self.stdout.write(f'- {team.name}')
+        for team in result.unsent:
+            self.stderr.write(self.style.WARNING(f'Nie wysłano danych logowania zespołu {team.name} - '
+                                                 f'należy ustawić hasło konta {team_username(team)} ręcznie'))
+
+        summary = f'Zakwalifikowane zespoły: {len(result.qualified)} ' \
+                  f'(dodane: {len(result.added)}, usunięte: {len(result.removed)})'
+        if options['dry_run']:
+            self.stdout.write(f'{summary}. Tryb próbny - zmiany nie zostały zapisane.')
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from services import search
+
+
+class Command(BaseCommand):
+    """
+    Komenda tworzenia od nowa indeksu wyszukiwania pełnotekstowego.
+    Użycie: python manage.py rebuild_search_index
+    """
+
+    help = 'Tworzy od nowa indeks wyszukiwania zadań, uwag i wyjaśnień.'
+
+    def handle(self, *args, **options):
+        if search.get_backend() is None:
+            raise CommandError('Wyszukiwanie pełnotekstowe nie jest obsługiwane dla tej bazy danych.')
+
+        count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Zindeksowane dokumenty: {count}'))
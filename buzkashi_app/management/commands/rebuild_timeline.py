@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from buzkashi_app.models import Competition
+from services.timeline import rebuild
+
+
+class Command(BaseCommand):
+    """
+    Komenda odbudowy historii rankingu zawodów na podstawie zaakceptowanych rozwiązań.
+    Użycie: python manage.py rebuild_timeline <id zawodów>
+    """
+
+    help = 'Odbudowuje historię rankingu (migawki i zmiany) na podstawie zaakceptowanych rozwiązań.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('competition_id', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            competition = Competition.objects.get(id=options['competition_id'])
+        except Competition.DoesNotExist:
+            raise CommandError(f"Zawody o id {options['competition_id']} nie istnieją")
+
+        rebuild(competition)
+        self.stdout.write(self.style.SUCCESS(f'Odbudowano historię rankingu zawodów {competition.title}'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from buzkashi_app.models import Competition
+
+
+class Command(BaseCommand):
+    """
+    Komenda wyliczenia od nowa liczby zarejestrowanych zespołów zawodów (Competition.registered_teams).
+    Użycie: python manage.py recount_team_slots
+    """
+
+    help = 'Wylicza od nowa liczniki zarejestrowanych zespołów zawodów na podstawie zespołów spoza listy rezerwowej.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'Poprawione liczniki: {Competition.recount_slots()}'))
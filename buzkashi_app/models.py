@@ -1,11 +1,16 @@
 import math
+import zlib
 
-from django.db import models
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
 from datetime import datetime, timedelta
 
+from .storage import content_storage
+
 
 class Competition(models.Model):
     """
@@ -54,6 +59,18 @@ class Competition(models.Model):
     is_frozen = models.BooleanField(default=False)
     """Oznaczenie zamrożenia rankingu dla danych zawodów. Domyślna wartość: False"""
 
+    registered_teams = models.IntegerField(default=0)
+    """Liczba zespołów z zarezerwowanym miejscem (spoza listy rezerwowej). Domyślna wartość: 0."""
+
+    class Meta:
+        """
+        Klasa z metadanymi. Indeks daty rozpoczęcia wspiera wyszukiwanie trwających i nadchodzących zawodów.
+        """
+
+        indexes = [
+            models.Index(fields=['start_date'], name='competition_start_date_idx'),
+        ]
+
     @classmethod
     def get_coming_competitions(cls, registration_open=False):
         """
@@ -75,20 +92,93 @@ class Competition(models.Model):
         query_set = Competition.objects.filter(start_date__gt=search_from).order_by('start_date')
         return query_set
 
+    def reserve_slot(self):
+        """
+        Atomowo rezerwuje miejsce dla zespołu, jeżeli liczba zarejestrowanych zespołów jest mniejsza od max_teams.
+        Rezerwacja jest warunkową aktualizacją licznika w jednym zapytaniu, bez blokowania tabeli.
+
+        :return: True, jeżeli miejsce zostało zarezerwowane. False, jeżeli brak wolnych miejsc.
+        """
+        return Competition.objects.filter(id=self.id, registered_teams__lt=models.F('max_teams')) \
+            .update(registered_teams=models.F('registered_teams') + 1) == 1
+
+    def free_slot(self):
+        """
+        Zwalnia miejsce zespołu bez przydzielania go zespołowi z listy rezerwowej.
+        """
+        Competition.objects.filter(id=self.id, registered_teams__gt=0) \
+            .update(registered_teams=models.F('registered_teams') - 1)
+
+    def release_slot(self):
+        """
+        Zwalnia miejsce zespołu i przydziela je pierwszemu zespołowi z listy rezerwowej (zob. get_waitlist).
+        Miejsce jest najpierw rezerwowane, a zespół przenoszony z listy rezerwowej warunkową aktualizacją - jeżeli
+        równoczesne zwolnienie miejsca przeniosło już ten zespół, rezerwacja jest zwalniana i próbowany jest
+        kolejny zespół z listy rezerwowej.
+        """
+        self.free_slot()
+        while self.reserve_slot():
+            promoted = self.get_waitlist().values_list('id', flat=True).first()
+            if promoted is None:
+                self.free_slot()
+                return
+            if Team.objects.filter(id=promoted, is_waitlisted=True).update(is_waitlisted=False):
+                return
+            self.free_slot()
+
     @classmethod
-    def get_current_competition(cls):
+    def recount_slots(cls):
         """
-        Statyczna funkcja, która zwraca obecnie odbywające się zawody.
+        Statyczna funkcja, która wylicza od nowa liczniki zarejestrowanych zespołów (registered_teams) wszystkich
+        zawodów na podstawie zespołów spoza listy rezerwowej (np. dla zespołów zapisanych przed wprowadzeniem
+        licznika).
 
-        :return: model obecnie odbywających się zawodów.
+        :return: liczba zawodów z poprawionym licznikiem.
+        """
+        counts = dict(Team.objects.filter(is_waitlisted=False).values_list('competition_id')
+                      .annotate(count=models.Count('id')).values_list('competition_id', 'count'))
+        changed = 0
+        for competition_id, registered in cls.objects.values_list('id', 'registered_teams'):
+            if registered != counts.get(competition_id, 0):
+                changed += cls.objects.filter(id=competition_id).update(registered_teams=counts.get(competition_id, 0))
+        return changed
+
+    def get_waitlist(self):
+        """
+        Zwraca zespoły z listy rezerwowej zawodów uporządkowane według priorytetu i daty zgłoszenia.
+
+        :return: query set zespołów z listy rezerwowej.
+        """
+        return Team.objects.filter(competition=self, is_waitlisted=True).order_by('priority', 'application_date', 'id')
+
+    @classmethod
+    def get_current_competitions(cls):
+        """
+        Statyczna funkcja, która zwraca wszystkie obecnie odbywające się zawody (np. równoległe sesje
+        dla uczelni wyższych i szkół średnich).
+
+        :return: lista modeli obecnie odbywających się zawodów uporządkowana według daty rozpoczęcia.
         """
         now = timezone.now()
         cur_date = datetime(year=now.year, month=now.month, day=now.day, tzinfo=now.tzinfo)
 
-        competition_set = Competition.objects.filter(start_date__range=(cur_date, cur_date + timedelta(days=1)))
+        competition_set = Competition.objects.filter(start_date__range=(cur_date, cur_date + timedelta(days=1))) \
+            .order_by('start_date', 'id')
+
+        return [_competition for _competition in competition_set
+                if _competition.start_date <= now <= _competition.start_date + _competition.duration]
+
+    @classmethod
+    def get_current_competition(cls, session=None):
+        """
+        Statyczna funkcja, która zwraca obecnie odbywające się zawody.
+        Jeżeli odbywa się kilka zawodów, zwraca pierwsze z nich lub pierwsze z podanej sesji.
 
-        for _competition in competition_set:
-            if _competition.start_date <= now <= _competition.start_date + _competition.duration:
+        :param session: opcjonalna sesja zawodów z enumeratora Competition.Session.
+        :return: model obecnie odbywających się zawodów.
+        """
+        for _competition in cls.get_current_competitions():
+            if session is None or _competition.session == session:
                 return _competition
 
         return None
@@ -118,6 +208,71 @@ class EduInstitution(models.Model):
     is_university = models.BooleanField(default=True)
     """Oznaczenie uczelni wyższej. Wartość domyślna: True."""
 
+    name_key = models.CharField(max_length=50, db_index=True, editable=False)
+    """
+    Nazwa w postaci do wyszukiwania (zob. search_key), ustawiana przy zapisie. Indeks wspiera wyszukiwanie
+    po prefiksie nazwy (w PostgreSQL tworzony jest również indeks varchar_pattern_ops dla zapytań LIKE).
+    """
+
+    region_key = models.CharField(max_length=50, db_index=True, editable=False)
+    """Rejon w postaci do wyszukiwania (zob. search_key), ustawiany przy zapisie. Indeks jak dla name_key."""
+
+    SEARCH_KEYS = {'name': 'name_key', 'region': 'region_key'}
+    """Pola wyszukiwane i odpowiadające im pola w postaci do wyszukiwania."""
+
+    @staticmethod
+    def search_key(value):
+        """
+        :param value: napis.
+        :return: napis w postaci do wyszukiwania: małe litery i pojedyncze spacje między słowami.
+        """
+        return ' '.join(value.split()).lower()
+
+    def set_search_keys(self):
+        """
+        Ustawia pola w postaci do wyszukiwania na podstawie nazwy i rejonu (np. przed zapisem przez bulk_create).
+        """
+        for field, key_field in self.SEARCH_KEYS.items():
+            setattr(self, key_field, self.search_key(getattr(self, field)))
+
+    def save(self, *args, **kwargs):
+        self.set_search_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {self.SEARCH_KEYS[field] for field in update_fields
+                                                            if field in self.SEARCH_KEYS}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def update_search_keys(cls):
+        """
+        Statyczna funkcja, która ustawia pola w postaci do wyszukiwania placówek bez tych pól (np. zapisanych przed
+        ich wprowadzeniem).
+
+        :return: liczba zmienionych placówek.
+        """
+        institutions = list(cls.objects.filter(name_key=''))
+        for institution in institutions:
+            institution.set_search_keys()
+        cls.objects.bulk_update(institutions, list(cls.SEARCH_KEYS.values()), batch_size=500)
+        return len(institutions)
+
+    @classmethod
+    def search(cls, query, limit=20):
+        """
+        Statyczna funkcja, która wyszukuje placówki edukacyjne, których nazwa lub rejon zaczyna się od szukanej
+        frazy (bez rozróżniania wielkości liter). Porównywane są pola w postaci do wyszukiwania (zob. search_key),
+        więc zapytanie korzysta z indeksów tych pól - wyszukiwanie fragmentu nazwy wymagałoby przeglądania całej
+        tabeli.
+
+        :param query: szukana fraza.
+        :param limit: maksymalna liczba wyników.
+        :return: lista modeli placówek edukacyjnych.
+        """
+        key = cls.search_key(query)
+        prefix = models.Q(name_key__startswith=key) | models.Q(region_key__startswith=key)
+        return list(EduInstitution.objects.filter(prefix).order_by('name')[:limit])
+
 
 class Team(models.Model):
     """
@@ -159,6 +314,21 @@ class Team(models.Model):
     institution = models.ForeignKey(EduInstitution, on_delete=models.PROTECT)
     """Placówka edukacyjna. Klucz obcy. Zespół chroniony podczas usuwania."""
 
+    is_waitlisted = models.BooleanField(default=False)
+    """Oznaczenie zespołu na liście rezerwowej (zgłoszonego po wyczerpaniu miejsc). Domyślna wartość: False."""
+
+    class Meta:
+        """
+        Klasa z metadanymi. Indeksy złożone wspierają złączenie rozwiązań z zespołami danych zawodów
+        oraz pobieranie listy rezerwowej.
+        """
+
+        indexes = [
+            models.Index(fields=['competition', 'id'], name='team_competition_idx'),
+            models.Index(fields=['competition', 'is_waitlisted', 'priority', 'application_date'],
+                         name='team_waitlist_idx'),
+        ]
+
 
 class Participant(models.Model):
     """
@@ -215,7 +385,13 @@ class Task(models.Model):
     """Unikalny tytuł zadania."""
 
     body = models.TextField(max_length=2000)
-    """Treść zadania."""
+    """Treść zadania w formacie Markdown (wzory w notacji LaTeX)."""
+
+    body_html = models.TextField(blank=True, default='')
+    """Treść zadania wyrenderowana do HTML (zob. services.statements). Aktualizowana po zmianie treści."""
+
+    body_hash = models.CharField(max_length=64, blank=True, default='')
+    """Skrót SHA-256 treści zadania, z której wyrenderowano body_html. Klucz pamięci podręcznej i ETag treści."""
 
     author = models.ForeignKey(Judge, on_delete=models.CASCADE)
     """Autor - sędzia. Klucz obcy. Zadanie jest usuwane kaskadowo."""
@@ -223,6 +399,30 @@ class Task(models.Model):
     competition = models.ForeignKey(Competition, blank=True, null=True, default=None, on_delete=models.PROTECT)
     """Zawody. Klucz obcy. Zadanie jest chronione podczas usuwania. Opcjonalne."""
 
+    class CheckerType(models.IntegerChoices):
+        """
+        Enumerator dla sposobu oceny wyjścia rozwiązania.
+        """
+
+        EXACT = 0, 'Porównanie z oczekiwanym wyjściem'
+        CHECKER = 1, 'Program sprawdzający'
+        INTERACTOR = 2, 'Interaktor'
+
+    checker_type = models.IntegerField(choices=CheckerType.choices, default=CheckerType.EXACT)
+    """Sposób oceny wyjścia wybierany z enumeratora: Task.CheckerType. Domyślna wartość: EXACT."""
+
+    checker = models.FileField(upload_to='uploads/checkers', storage=content_storage, blank=True)
+    """
+    Ścieżka do pliku z kodem źródłowym programu sprawdzającego lub interaktora (zob. services.judge). Wymagane dla
+    checker_type CHECKER i INTERACTOR.
+    """
+
+    checker_language = models.CharField(max_length=20, blank=True, default='')
+    """Język programowania programu sprawdzającego z enumeratora Solution.ProgrammingLanguage. Opcjonalne."""
+
+    checker_time_limit = models.DurationField(default=timedelta(seconds=10))
+    """Limit czasu programu sprawdzającego dla jednego testu. Domyślna wartość: 10s."""
+
     def get_absolute_url(self):
         return reverse("task_edit", kwargs={"task_id": self.id})
 
@@ -256,7 +456,7 @@ class Solution(models.Model):
         ACCEPTED = 'Zaakceptowane'
         REJECTED = 'Odrzucone'
 
-    source_code = models.FileField(upload_to='uploads/solutions')
+    source_code = models.FileField(upload_to='uploads/solutions', storage=content_storage)
     """Ścieżka do pliku kodu źródłowego rozwiązania."""
 
     programming_language = models.TextField(choices=ProgrammingLanguage.choices, default=ProgrammingLanguage.JAVA)
@@ -280,6 +480,22 @@ class Solution(models.Model):
     submission_time = models.DateTimeField(default=timezone.now, null=True, blank=True)
     """Czas złożenia. Domyślna wartość: timezone.now. Opcjonalne."""
 
+    source_hash = models.CharField(max_length=64, blank=True, default='')
+    """Skrót SHA-256 kodu źródłowego (szesnastkowo) wyliczany podczas przesyłania pliku. Opcjonalne."""
+
+    source_size = models.IntegerField(default=0)
+    """Rozmiar kodu źródłowego w bajtach. Domyślna wartość: 0."""
+
+    class Meta:
+        """
+        Klasa z metadanymi. Indeks złożony wspiera wyszukiwanie rozwiązań sędziego o danym statusie
+        w obrębie zawodów (przez zespół autora).
+        """
+
+        indexes = [
+            models.Index(fields=['judge', 'status', 'author'], name='solution_judge_status_idx'),
+        ]
+
     @property
     def submission_time_in_minutes(self):
         """
@@ -308,12 +524,18 @@ class AutomatedTest(models.Model):
     title = models.CharField(max_length=255, null=True, blank=True)
     """Tytuł. Opcjonalne."""
 
-    input = models.FileField(upload_to='uploads/tests', null=True, blank=True)
+    input = models.FileField(upload_to='uploads/tests', storage=content_storage, null=True, blank=True)
     """Ścieżka do pliku z wejściem programu. Opcjonalne."""
 
-    expected_output = models.FileField(upload_to='uploads/tests')
+    expected_output = models.FileField(upload_to='uploads/tests', storage=content_storage)
     """Ścieżka do pliku z oczekiwanym wyjściem programu."""
 
+    input_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    """Skrót SHA-256 pliku z wejściem programu (szesnastkowo). Pusty, jeżeli nie został wyliczony."""
+
+    expected_output_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    """Skrót SHA-256 pliku z oczekiwanym wyjściem programu (szesnastkowo). Pusty, jeżeli nie został wyliczony."""
+
     max_time = models.DurationField(default=timedelta(seconds=1))
     """Maksymalny czas wykonywania testu. Domyślna wartość: 1s."""
 
@@ -340,15 +562,29 @@ class AutomatedTestResult(models.Model):
         COMPILATION_ERROR = 2
         RUNTIME_ERROR = 3
         FAILED = 4
+        OUTPUT_LIMIT_EXCEEDED = 5
+        CHECKER_ERROR = 6
 
-    output = models.FileField(upload_to='uploads/test_results')
-    """Ścieżka do pliku z wyjściem programu."""
+    output = models.FileField(upload_to='uploads/test_results', storage=content_storage, blank=True)
+    """Ścieżka do pliku z wyjściem programu. Pusta, jeżeli wyjście jest przechowywane w output_inline."""
+
+    output_inline = models.BinaryField(null=True, blank=True)
+    """
+    Wyjście programu nie większe niż settings.TEST_OUTPUT_INLINE_MAX_SIZE przechowywane w wierszu (zob. set_output):
+    pierwszy bajt określa format (0 - bez kompresji, 1 - zlib), pozostałe to zawartość. Opcjonalne.
+    """
 
     status = models.IntegerField(choices=TestStatus.choices, default=TestStatus.FAILED)
     """Status testu wybierany z enumeratora: AutomatedTestResult.TestStatus. Domyślna wartość: FAILED."""
 
     runtime = models.DurationField()
-    """Czas wykonywania testu."""
+    """Czas wykonywania testu (bez czasu programu sprawdzającego)."""
+
+    checker_runtime = models.DurationField(default=timedelta(0))
+    """Czas wykonywania programu sprawdzającego lub interaktora. Domyślna wartość: 0."""
+
+    checker_message = models.CharField(max_length=255, blank=True, default='')
+    """Komunikat programu sprawdzającego lub interaktora. Opcjonalne."""
 
     test = models.ForeignKey(AutomatedTest, on_delete=models.CASCADE)
     """Test. Klucz obcy. Wynik testu automatycznego jest usuwany kaskadowo."""
@@ -356,6 +592,112 @@ class AutomatedTestResult(models.Model):
     solution = models.ForeignKey(Solution, on_delete=models.CASCADE)
     """Rozwiązanie. Klucz obcy. Wynik testu automatycznego jest usuwany kaskadowo."""
 
+    class Meta:
+        """
+        Klasa z metadanymi. Indeks złożony wspiera pobieranie wyników testów danego rozwiązania.
+        """
+
+        indexes = [
+            models.Index(fields=['solution', 'test'], name='test_result_solution_idx'),
+        ]
+
+    def set_output(self, content, name='output.txt'):
+        """
+        Ustawia wyjście programu. Wyjście nie większe niż settings.TEST_OUTPUT_INLINE_MAX_SIZE zapisywane jest
+        w wierszu wyniku (output_inline), skompresowane, jeżeli kompresja zmniejsza jego rozmiar. Większe wyjście
+        zapisywane jest w magazynie plików. Nie zapisuje modelu.
+
+        :param content: wyjście programu (bajty).
+        :param name: nazwa pliku dla wyjścia zapisywanego w magazynie plików.
+        """
+        if len(content) <= settings.TEST_OUTPUT_INLINE_MAX_SIZE:
+            compressed = zlib.compress(content)
+            self.output_inline = b'\x01' + compressed if len(compressed) < len(content) else b'\x00' + content
+            self.output = None
+        else:
+            self.output_inline = None
+            self.output.save(name, ContentFile(content), save=False)
+
+    def read_output(self):
+        """
+        Zwraca wyjście programu. Wyjście przechowywane w wierszu nie wymaga odczytu pliku.
+
+        :return: wyjście programu (bajty).
+        :raise FileNotFoundError: jeżeli plik wyjścia nie istnieje.
+        """
+        if self.output_inline is not None:
+            data = bytes(self.output_inline)
+            return zlib.decompress(data[1:]) if data[:1] == b'\x01' else data[1:]
+        if not self.output:
+            raise FileNotFoundError(f'Brak wyjścia wyniku testu {self.id}')
+
+        with self.output.open('rb') as file:
+            return file.read()
+
+
+class ReferenceSolution(models.Model):
+    """
+    Klasa ORM rozwiązania wzorcowego zadania.
+    Id jest generowane automatycznie.
+    Rozwiązania wzorcowe służą do wyznaczania limitów czasu testów dla języków programowania (zob. TestTimeLimit).
+    """
+
+    objects = models.Manager
+    """Domyślny menadżer dla modelu. Menadżer umożliwia tworzenie zapytań do bazy danych."""
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    """Zadanie. Klucz obcy. Rozwiązanie wzorcowe jest usuwane kaskadowo."""
+
+    title = models.CharField(max_length=255, blank=True, default='')
+    """Tytuł. Opcjonalne."""
+
+    source_code = models.FileField(upload_to='uploads/reference', storage=content_storage)
+    """Ścieżka do pliku kodu źródłowego rozwiązania."""
+
+    programming_language = models.TextField(choices=Solution.ProgrammingLanguage.choices,
+                                            default=Solution.ProgrammingLanguage.JAVA)
+    """Język programowania wybierany z enumeratora: Solution.ProgrammingLanguage. Domyślna wartość: JAVA."""
+
+
+class TestTimeLimit(models.Model):
+    """
+    Klasa ORM limitu czasu testu automatycznego dla języka programowania.
+    Id jest generowane automatycznie.
+    Limit wyznaczany jest z czasów działania rozwiązań wzorcowych (zob. services.calibration). Dla języków bez
+    limitu obowiązuje AutomatedTest.max_time.
+    """
+
+    objects = models.Manager
+    """Domyślny menadżer dla modelu. Menadżer umożliwia tworzenie zapytań do bazy danych."""
+
+    test = models.ForeignKey(AutomatedTest, on_delete=models.CASCADE)
+    """Test. Klucz obcy. Limit jest usuwany kaskadowo."""
+
+    programming_language = models.TextField(choices=Solution.ProgrammingLanguage.choices)
+    """Język programowania wybierany z enumeratora: Solution.ProgrammingLanguage."""
+
+    max_time = models.DurationField()
+    """Maksymalny czas wykonywania testu dla języka."""
+
+    median = models.DurationField()
+    """Mediana zmierzonych czasów działania najwolniejszego rozwiązania wzorcowego."""
+
+    deviation = models.DurationField()
+    """Odchylenie standardowe zmierzonych czasów działania najwolniejszego rozwiązania wzorcowego."""
+
+    runs = models.IntegerField()
+    """Liczba pomiarów każdego rozwiązania wzorcowego."""
+
+    calibrated = models.DateTimeField(default=timezone.now)
+    """Data wyznaczenia limitu. Domyślna wartość: timezone.now."""
+
+    class Meta:
+        """
+        Klasa z metadanymi. Limit jest unikalny dla pary (test, język programowania).
+        """
+
+        unique_together = [('test', 'programming_language')]
+
 
 class Notice(models.Model):
     """
@@ -402,3 +744,271 @@ class Explanation(models.Model):
 
     notice = models.ForeignKey(Notice, on_delete=models.CASCADE, default=None)
     """Uwaga. Klucz obcy: Wyjaśnienie jest usuwane kaskadowo."""
+
+    class Meta:
+        """
+        Klasa z metadanymi. Indeks złożony wspiera stronicowanie wyjaśnień według daty opublikowania i id
+        (zob. services.clarifications).
+        """
+
+        indexes = [
+            models.Index(fields=['publication_date', 'id'], name='explanation_feed_idx'),
+        ]
+
+
+class StandingsSnapshot(models.Model):
+    """
+    Klasa ORM pełnej migawki rankingu zawodów.
+    Id jest generowane automatycznie.
+    Migawka przechowuje stan wszystkich zespołów po uwzględnieniu zmian do danej minuty zawodów włącznie.
+    """
+
+    objects = models.Manager
+    """Domyślny menadżer dla modelu. Menadżer umożliwia tworzenie zapytań do bazy danych."""
+
+    competition = models.ForeignKey(Competition, on_delete=models.CASCADE)
+    """Zawody. Klucz obcy. Migawka jest usuwana kaskadowo."""
+
+    minute = models.IntegerField()
+    """Minuta zawodów liczona od ich rozpoczęcia."""
+
+    data = models.BinaryField()
+    """Stan zespołów zapisany w formacie msgpack: lista [id zespołu, zadania rozwiązane, czas w minutach]."""
+
+    class Meta:
+        """
+        Klasa z metadanymi. Migawka jest unikalna dla pary (zawody, minuta).
+        """
+
+        unique_together = [('competition', 'minute')]
+
+
+class StandingsDelta(models.Model):
+    """
+    Klasa ORM zmian rankingu zawodów w danej minucie.
+    Id jest generowane automatycznie.
+    """
+
+    objects = models.Manager
+    """Domyślny menadżer dla modelu. Menadżer umożliwia tworzenie zapytań do bazy danych."""
+
+    competition = models.ForeignKey(Competition, on_delete=models.CASCADE)
+    """Zawody. Klucz obcy. Zmiana jest usuwana kaskadowo."""
+
+    minute = models.IntegerField()
+    """Minuta zawodów liczona od ich rozpoczęcia."""
+
+    data = models.BinaryField()
+    """
+    Nowy stan zespołów zmienionych w danej minucie zapisany w formacie msgpack:
+    lista [id zespołu, zadania rozwiązane, czas w minutach].
+    """
+
+    class Meta:
+        """
+        Klasa z metadanymi. Zmiana jest unikalna dla pary (zawody, minuta).
+        """
+
+        unique_together = [('competition', 'minute')]
+
+
+class SubmissionCounter(models.Model):
+    """
+    Klasa ORM licznika zgłoszeń rozwiązań zespołu dla zadania.
+    Id jest generowane automatycznie.
+    Licznik wyznacza wersję kolejnego rozwiązania (zob. next_version).
+    """
+
+    objects = models.Manager
+    """Domyślny menadżer dla modelu. Menadżer umożliwia tworzenie zapytań do bazy danych."""
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE)
+    """Zespół. Klucz obcy. Licznik jest usuwany kaskadowo."""
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    """Zadanie. Klucz obcy. Licznik jest usuwany kaskadowo."""
+
+    count = models.IntegerField(default=0)
+    """Liczba zgłoszonych rozwiązań. Domyślna wartość: 0."""
+
+    class Meta:
+        """
+        Klasa z metadanymi. Licznik jest unikalny dla pary (zespół, zadanie).
+        """
+
+        unique_together = [('team', 'task')]
+
+    @classmethod
+    def next_version(cls, team, task):
+        """
+        Statyczna funkcja, która atomowo zwiększa licznik zgłoszeń zespołu dla zadania i zwraca nową wartość.
+        Licznik zwiększany jest jednym zapytaniem UPDATE, które blokuje wiersz licznika do końca transakcji,
+        więc równoczesne zgłoszenia otrzymują kolejne, różne wersje. Pierwsze zgłoszenie tworzy licznik -
+        jeżeli równoległe zgłoszenie utworzyło go wcześniej, licznik jest zwiększany ponownie.
+        Funkcja musi być wywołana wewnątrz transakcji.
+
+        :param team: model zespołu.
+        :param task: model zadania.
+        :return: wersja zgłaszanego rozwiązania.
+        """
+        counters = cls.objects.filter(team=team, task=task)
+        if not counters.update(count=models.F('count') + 1):
+            try:
+                with transaction.atomic():
+                    cls.objects.create(team=team, task=task, count=1)
+                return 1
+            except IntegrityError:
+                counters.update(count=models.F('count') + 1)
+
+        return counters.values_list('count', flat=True).get()
+
+
+class JudgingJob(models.Model):
+    """
+    Klasa ORM zadania oceny rozwiązania w kolejce sprawdzaczki.
+    Id jest generowane automatycznie i wyznacza kolejność w kolejce.
+    """
+
+    objects = models.Manager
+    """Domyślny menadżer dla modelu. Menadżer umożliwia tworzenie zapytań do bazy danych."""
+
+    class JobStatus(models.IntegerChoices):
+        """
+        Enumerator dla statusu zadania oceny.
+        """
+
+        QUEUED = 0, 'Oczekujące'
+        RUNNING = 1, 'W trakcie oceny'
+        DONE = 2, 'Zakończone'
+        FAILED = 3, 'Nieudane'
+
+    solution = models.OneToOneField(Solution, on_delete=models.CASCADE)
+    """Oceniane rozwiązanie. Zadanie oceny jest usuwane kaskadowo."""
+
+    status = models.IntegerField(choices=JobStatus.choices, default=JobStatus.QUEUED)
+    """Status wybierany z enumeratora: JudgingJob.JobStatus. Domyślna wartość: QUEUED."""
+
+    created = models.DateTimeField(default=timezone.now)
+    """Data dodania do kolejki. Domyślna wartość: timezone.now."""
+
+    worker = models.CharField(max_length=255, blank=True, default='')
+    """Nazwa procesu oceniającego, który ostatnio pobrał zadanie oceny (zob. services.worker). Opcjonalne."""
+
+    lease_expires = models.DateTimeField(null=True, blank=True)
+    """
+    Czas wygaśnięcia dzierżawy zadania oceny w statusie RUNNING. Proces oceniający przedłuża dzierżawę w trakcie
+    oceny - zadanie z wygasłą dzierżawą może zostać pobrane przez inny proces. Opcjonalne.
+    """
+
+    attempts = models.IntegerField(default=0)
+    """
+    Liczba pobrań zadania oceny. Zwiększana przy każdym pobraniu, więc wyznacza również wersję dzierżawy.
+    Domyślna wartość: 0.
+    """
+
+    class Meta:
+        """
+        Klasa z metadanymi. Indeksy złożone wspierają pobieranie najstarszych oczekujących zadań oceny i zadań
+        oceny z wygasłą dzierżawą.
+        """
+
+        indexes = [
+            models.Index(fields=['status', 'id'], name='judging_job_queue_idx'),
+            models.Index(fields=['status', 'lease_expires'], name='judging_job_lease_idx'),
+        ]
+
+
+class SolutionFingerprint(models.Model):
+    """
+    Klasa ORM odcisku kodu źródłowego rozwiązania - wpis odwróconego indeksu wykorzystywanego do wykrywania
+    plagiatów (zob. services.plagiarism).
+    Id jest generowane automatycznie.
+    """
+
+    objects = models.Manager
+    """Domyślny menadżer dla modelu. Menadżer umożliwia tworzenie zapytań do bazy danych."""
+
+    solution = models.ForeignKey(Solution, on_delete=models.CASCADE)
+    """Rozwiązanie. Klucz obcy. Odcisk jest usuwany kaskadowo."""
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    """Zadanie rozwiązania (kopia Solution.task). Klucz obcy. Odcisk jest usuwany kaskadowo."""
+
+    hash = models.BigIntegerField()
+    """Skrót fragmentu znormalizowanego kodu źródłowego wybrany algorytmem winnowing."""
+
+    class Meta:
+        """
+        Klasa z metadanymi. Odcisk jest unikalny dla pary (rozwiązanie, skrót). Indeks złożony wspiera
+        pobieranie odcisków zadania uporządkowanych według skrótu (listy rozwiązań dla kolejnych skrótów).
+        """
+
+        unique_together = [('solution', 'hash')]
+        indexes = [
+            models.Index(fields=['task', 'hash'], name='fingerprint_task_hash_idx'),
+        ]
+
+
+class StoredBlob(models.Model):
+    """
+    Klasa ORM pliku przechowywanego według skrótu treści (zob. buzkashi_app.storage.ContentAddressedStorage).
+    Kluczem głównym jest skrót SHA-256 treści.
+    """
+
+    objects = models.Manager
+    """Domyślny menadżer dla modelu. Menadżer umożliwia tworzenie zapytań do bazy danych."""
+
+    digest = models.CharField(max_length=64, primary_key=True)
+    """Skrót SHA-256 treści (szesnastkowo). Klucz główny."""
+
+    size = models.BigIntegerField(default=0)
+    """Rozmiar treści w bajtach."""
+
+    stored_size = models.BigIntegerField(default=0)
+    """Rozmiar pliku na dysku w bajtach (po kompresji)."""
+
+    references = models.IntegerField(default=0)
+    """Liczba odwołań do pliku. Pliki bez odwołań usuwa komenda gc_blobs."""
+
+    modified = models.DateTimeField(default=timezone.now)
+    """Data ostatniej zmiany liczby odwołań. Domyślna wartość: timezone.now."""
+
+    class Meta:
+        """
+        Klasa z metadanymi. Indeks wspiera wyszukiwanie plików bez odwołań.
+        """
+
+        indexes = [
+            models.Index(fields=['references', 'modified'], name='stored_blob_gc_idx'),
+        ]
+
+    @classmethod
+    def retain(cls, digest, size=None, stored_size=None):
+        """
+        Statyczna funkcja, która atomowo zwiększa liczbę odwołań do pliku. Pierwsze odwołanie tworzy wpis pliku -
+        jeżeli równoległy zapis utworzył go wcześniej, liczba odwołań jest zwiększana ponownie.
+
+        :param digest: skrót treści.
+        :param size: rozmiar treści w bajtach (wymagany przy pierwszym zapisie pliku).
+        :param stored_size: rozmiar pliku na dysku w bajtach (wymagany przy pierwszym zapisie pliku).
+        :return: True, jeżeli wpis pliku został utworzony.
+        """
+        blobs = cls.objects.filter(digest=digest)
+        if not blobs.update(references=models.F('references') + 1, modified=timezone.now()) and size is not None:
+            try:
+                with transaction.atomic():
+                    cls.objects.create(digest=digest, size=size, stored_size=stored_size, references=1)
+                return True
+            except IntegrityError:
+                blobs.update(references=models.F('references') + 1, modified=timezone.now())
+        return False
+
+    @classmethod
+    def release(cls, digest):
+        """
+        Statyczna funkcja, która atomowo zmniejsza liczbę odwołań do pliku.
+
+        :param digest: skrót treści.
+        """
+        cls.objects.filter(digest=digest, references__gt=0) \
+            .update(references=models.F('references') - 1, modified=timezone.now())
@@ -0,0 +1,120 @@
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+
+from services import clarifications, search, blobs
+from services.publisher import publish_safely
+from .forms import invalidate_competition_choices, invalidate_institution_choices
+from .models import Competition, EduInstitution, Team, Notice, Explanation, Task, Solution, AutomatedTest, \
+    AutomatedTestResult, ReferenceSolution
+
+
+@receiver([post_save, post_delete], sender=Competition)
+def competition_changed(sender, instance, **kwargs):
+    """
+    Unieważnia dane zawodów przechowywane w pamięci podręcznej po zapisaniu lub usunięciu modelu zawodów.
+    Po zapisaniu zawodów z plikiem rankingu (np. wgraniu pliku lub zamrożeniu rankingu) publikuje ranking.
+    """
+    invalidate_competition_choices()
+    if kwargs['signal'] is post_save and (instance.rank or instance.rank_frozen):
+        publish_safely(instance)
+
+
+@receiver([post_save, post_delete], sender=EduInstitution)
+def institution_changed(sender, instance, **kwargs):
+    """
+    Unieważnia wyniki wyszukiwania placówek edukacyjnych po zapisaniu lub usunięciu modelu placówki.
+    """
+    invalidate_institution_choices()
+
+
+@receiver(post_delete, sender=Team)
+def team_deleted(sender, instance, **kwargs):
+    """
+    Zwalnia miejsce usuniętego zespołu, który nie był na liście rezerwowej.
+    """
+    if not instance.is_waitlisted:
+        try:
+            instance.competition.release_slot()
+        except Competition.DoesNotExist:
+            pass
+
+
+@receiver([post_save, post_delete], sender=Notice)
+@receiver([post_save, post_delete], sender=Explanation)
+def clarification_changed(sender, instance, **kwargs):
+    """
+    Unieważnia strony wyjaśnień zawodów po zapisaniu lub usunięciu uwagi albo wyjaśnienia.
+    Nowa wersja wyjaśnień powiadamia klientów kanału powiadomień.
+    """
+    if isinstance(instance, Notice):
+        task_id = instance.task_id
+    else:
+        task_id = Notice.objects.filter(id=instance.notice_id).values_list('task_id', flat=True).first()
+
+    competition_id = Task.objects.filter(id=task_id).values_list('competition_id', flat=True).first()
+    if competition_id is not None:
+        clarifications.invalidate(competition_id)
+
+
+@receiver(post_migrate)
+def install_search_index(sender, using, **kwargs):
+    """
+    Tworzy tabelę indeksu wyszukiwania (spoza ORM) po migracji bazy danych aplikacji.
+    """
+    if sender.name == 'buzkashi_app':
+        backend = search.get_backend(using)
+        if backend is not None:
+            backend.install()
+
+
+@receiver(post_migrate)
+def fill_institution_search_keys(sender, **kwargs):
+    """
+    Ustawia pola w postaci do wyszukiwania placówek edukacyjnych zapisanych przed ich wprowadzeniem.
+    """
+    if sender.name == 'buzkashi_app':
+        EduInstitution.update_search_keys()
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Notice)
+@receiver(post_save, sender=Explanation)
+def searchable_saved(sender, instance, raw=False, using=None, **kwargs):
+    """
+    Aktualizuje dokument zadania, uwagi lub wyjaśnienia w indeksie wyszukiwania. Zmiana uwagi aktualizuje również
+    wyjaśnienia, których tytułem jest tytuł uwagi.
+    """
+    backend = search.get_backend(using)
+    if backend is None or raw:
+        return
+
+    documents = [search.document(instance)]
+    if isinstance(instance, Notice):
+        documents += [search.Document('explanation', explanation_id, instance.title, body or '')
+                      for explanation_id, body in instance.explanation_set.values_list('id', 'body')]
+    backend.index(documents)
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Notice)
+@receiver(post_delete, sender=Explanation)
+def searchable_deleted(sender, instance, using=None, **kwargs):
+    """
+    Usuwa dokument zadania, uwagi lub wyjaśnienia z indeksu wyszukiwania.
+    """
+    backend = search.get_backend(using)
+    if backend is not None:
+        backend.remove(search.KINDS[sender], instance.id)
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Solution)
+@receiver(post_delete, sender=AutomatedTest)
+@receiver(post_delete, sender=AutomatedTestResult)
+@receiver(post_delete, sender=ReferenceSolution)
+def stored_files_deleted(sender, instance, **kwargs):
+    """
+    Zmniejsza liczbę odwołań do plików usuniętego zadania, rozwiązania, rozwiązania wzorcowego, testu lub wyniku
+    testu. Nieużywane pliki usuwa komenda gc_blobs.
+    """
+    blobs.release_files(instance)
@@ -0,0 +1,215 @@
+import gzip
+import hashlib
+import io
+import os
+import posixpath
+import shutil
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs/'
+"""Prefiks nazw plików przechowywanych według skrótu treści."""
+
+COMPRESS_MIN_SIZE = 4 * 1024
+"""Minimalny rozmiar pliku w bajtach, od którego plik jest kompresowany."""
+
+COMPRESS_MAX_RATIO = 0.9
+"""Plik jest przechowywany w postaci skompresowanej tylko, jeżeli kompresja zmniejsza go co najmniej o 10%."""
+
+COMPRESSED_SUFFIX = '.gz'
+"""Rozszerzenie skompresowanych plików na dysku."""
+
+CHUNK_SIZE = 64 * 1024
+"""Rozmiar fragmentu pliku kopiowanego jednorazowo w bajtach."""
+
+
+def blob_name(digest):
+    """
+    :param digest: skrót SHA-256 treści (szesnastkowo).
+    :return: nazwa pliku o tej treści, np. blobs/ab/ab12...
+    """
+    return f'{BLOB_PREFIX}{digest[:2]}/{digest}'
+
+
+def is_blob(name):
+    """
+    :param name: nazwa pliku.
+    :return: True, jeżeli plik jest przechowywany według skrótu treści.
+    """
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def blob_digest(name):
+    """
+    :param name: nazwa pliku przechowywanego według skrótu treści.
+    :return: skrót SHA-256 treści.
+    """
+    return posixpath.basename(name)
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Magazyn plików przechowujący pliki według skrótu SHA-256 treści (blobs/<2 znaki skrótu>/<skrót>). Pliki
+    o tej samej treści (np. ponowne zgłoszenia tego samego rozwiązania, identyczne wyjścia programów) są zapisywane
+    na dysku raz. Nazwa przekazana przy zapisie (i upload_to pola) jest ignorowana.
+    Liczba odwołań do pliku przechowywana jest w modelu StoredBlob: zapis pliku zwiększa ją, a usunięcie (delete)
+    zmniejsza. Pliki nie są usuwane od razu - nieużywane pliki usuwa komenda gc_blobs.
+    Pliki większe niż COMPRESS_MIN_SIZE przechowywane są w postaci skompresowanej (gzip), jeżeli kompresja jest
+    opłacalna - odczyt metodą open jest przezroczysty. Skompresowane pliki nie mają ścieżki (path).
+    Pliki o nazwach spoza BLOB_PREFIX (zapisane przed wprowadzeniem magazynu) obsługiwane są jak w FileSystemStorage.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        """
+        Nazwa pliku wynika z treści, więc nie jest sprawdzana.
+        """
+        return name
+
+    def _blob_path(self, name):
+        """
+        :param name: nazwa pliku.
+        :return: krotka (ścieżka pliku na dysku, True, jeżeli plik jest skompresowany) lub (None, False), jeżeli
+            plik nie istnieje.
+        """
+        path = super().path(name)
+        if os.path.exists(path):
+            return path, False
+        if os.path.exists(path + COMPRESSED_SUFFIX):
+            return path + COMPRESSED_SUFFIX, True
+        return None, False
+
+    def _open(self, name, mode='rb'):
+        if not is_blob(name):
+            return super()._open(name, mode)
+        if any(flag in mode for flag in 'wax+'):
+            raise ValueError('Pliki przechowywane według skrótu treści są tylko do odczytu')
+
+        path, compressed = self._blob_path(name)
+        if path is None:
+            raise FileNotFoundError(f'Plik {name} nie istnieje')
+        file = gzip.open(path, 'rb') if compressed else open(path, 'rb')
+        if 'b' not in mode:
+            file = io.TextIOWrapper(file, encoding='utf-8')
+        return File(file, name)
+
+    def _save(self, name, content):
+        """
+        Zapisuje treść do pliku tymczasowego, wyliczając skrót, i zwiększa liczbę odwołań do pliku o tym skrócie.
+        Odwołanie jest zapisywane przed sprawdzeniem pliku, więc komenda gc_blobs nie usunie go w międzyczasie.
+        Jeżeli wpis pliku został dopiero utworzony (np. po usunięciu nieużywanego pliku) lub plik nie istnieje,
+        plik tymczasowy jest (opcjonalnie) kompresowany i przenoszony pod docelową nazwę. W przeciwnym wypadku plik
+        tymczasowy jest usuwany.
+
+        :return: nazwa pliku wynikająca z treści.
+        """
+        from .models import StoredBlob
+
+        directory = super().path(f'{BLOB_PREFIX}tmp')
+        os.makedirs(directory, exist_ok=True)
+        digest, size = hashlib.sha256(), 0
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as temporary:
+            for chunk in content.chunks(CHUNK_SIZE):
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                digest.update(chunk)
+                size += len(chunk)
+                temporary.write(chunk)
+
+        name = blob_name(digest.hexdigest())
+        try:
+            created = StoredBlob.retain(blob_digest(name), size, size)
+            if created or self._blob_path(name)[0] is None:
+                try:
+                    stored_size = self._store(temporary.name, super().path(name), size)
+                except Exception:
+                    StoredBlob.release(blob_digest(name))
+                    raise
+                StoredBlob.objects.filter(digest=blob_digest(name)).update(stored_size=stored_size)
+        finally:
+            if os.path.exists(temporary.name):
+                os.remove(temporary.name)
+        return name
+
+    def _store(self, temporary, path, size):
+        """
+        Przenosi plik tymczasowy pod docelową ścieżkę, kompresując go, jeżeli jest to opłacalne.
+
+        :param temporary: ścieżka pliku tymczasowego.
+        :param path: docelowa ścieżka pliku (bez rozszerzenia COMPRESSED_SUFFIX).
+        :param size: rozmiar pliku w bajtach.
+        :return: rozmiar pliku na dysku w bajtach.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if size >= COMPRESS_MIN_SIZE:
+            compressed = temporary + COMPRESSED_SUFFIX
+            with open(temporary, 'rb') as source, gzip.open(compressed, 'wb') as target:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+            if os.path.getsize(compressed) <= size * COMPRESS_MAX_RATIO:
+                temporary, path = compressed, path + COMPRESSED_SUFFIX
+            else:
+                os.remove(compressed)
+
+        if self.file_permissions_mode is not None:
+            os.chmod(temporary, self.file_permissions_mode)
+        os.replace(temporary, path)
+        return os.path.getsize(path)
+
+    def delete(self, name):
+        """
+        Zmniejsza liczbę odwołań do pliku przechowywanego według skrótu treści (plik usuwa komenda gc_blobs).
+        Pozostałe pliki usuwa od razu.
+        """
+        from .models import StoredBlob
+
+        if not is_blob(name):
+            return super().delete(name)
+        StoredBlob.release(blob_digest(name))
+
+    def retain(self, name):
+        """
+        Zwiększa liczbę odwołań do zapisanego już pliku (np. gdy nowy model wskazuje istniejący plik).
+
+        :param name: nazwa pliku.
+        """
+        from .models import StoredBlob
+
+        if is_blob(name):
+            StoredBlob.retain(blob_digest(name))
+
+    def purge(self, name):
+        """
+        Usuwa plik przechowywany według skrótu treści z dysku niezależnie od liczby odwołań.
+
+        :param name: nazwa pliku.
+        """
+        path, _ = self._blob_path(name)
+        if path is not None:
+            os.remove(path)
+
+    def exists(self, name):
+        if not is_blob(name):
+            return super().exists(name)
+        return self._blob_path(name)[0] is not None
+
+    def path(self, name):
+        if is_blob(name) and self._blob_path(name)[1]:
+            raise NotImplementedError('Skompresowane pliki nie mają ścieżki - należy użyć metody open')
+        return super().path(name)
+
+    def size(self, name):
+        from .models import StoredBlob
+
+        if not is_blob(name):
+            return super().size(name)
+        size = StoredBlob.objects.filter(digest=blob_digest(name)).values_list('size', flat=True).first()
+        if size is None:
+            raise FileNotFoundError(f'Plik {name} nie istnieje')
+        return size
+
+
+content_storage = ContentAddressedStorage()
+"""Magazyn plików rozwiązań, testów i wyjść programów."""
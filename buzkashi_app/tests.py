@@ -1,12 +1,36 @@
 from datetime import timedelta
+import hashlib
 from django.utils import timezone
 from django.contrib.auth.models import User
-from django.test import TestCase, Client
+import json
+import os
+import tempfile
+import zipfile
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import resolve, reverse
 
-from buzkashi_app.forms import RegistrationComplimentForm
-from buzkashi_app.models import Judge, Task, Competition
+from buzkashi_app.forms import RegistrationComplimentForm, CompetitionSelectForm, EduInstitutionSelectForm, \
+    COMPETITION_CHOICES_CACHE_KEY, INSTITUTION_SEARCH_VERSION_KEY, competition_label
+from buzkashi_app.models import Judge, Task, Competition, Solution, AutomatedTestResult, EduInstitution, Team, \
+    Participant, StandingsSnapshot, SubmissionCounter, JudgingJob, SolutionFingerprint, Notice, Explanation, \
+    AutomatedTest, StoredBlob, ReferenceSolution, TestTimeLimit
+from buzkashi_app.storage import content_storage, ContentAddressedStorage
 from buzkashi_app.views import TasksView
+from services import timeline, plagiarism, clarifications, search, statements, packages, blobs, outputs, judge, \
+    calibration, worker, publisher, qualification
+from services.cache import PartitionedCache
+from services.importer import TeamImporter
+from services.ratelimit import RateLimiter
+from services.scoreboard import RankRow, dump_rank, parse_rank, load_rank, rank_cache, update_rank
 
 USERNAME = 'new'
 PASSWORD = 'zawody2k21'
@@ -70,6 +94,38 @@ def get_task_by_other_judge():
     return task
 
 
+def create_team(competition, name, institution=None):
+    """
+    Funkcja pomocnicza tworząca nowy zespół.
+
+    :param competition: Obiekt zawodów.
+    :param name: Nazwa zespołu.
+    :param institution: Obiekt placówki edukacyjnej. Domyślnie tworzona jest nowa placówka.
+    :return: Obiekt zespołu.
+    """
+    if institution is None:
+        institution = EduInstitution.objects.create(name=f'Placówka {name}', region='Region',
+                                                    email=f'{name.lower()}@example.com')
+    return Team.objects.create(name=name, competition=competition, institution=institution)
+
+
+def create_solution(team, task, judge, status=None, submission_time=None, version=1):
+    """
+    Funkcja pomocnicza tworząca nowe rozwiązanie.
+
+    :param team: Obiekt zespołu - autora rozwiązania.
+    :param task: Obiekt zadania.
+    :param judge: Obiekt sędziego.
+    :param status: Status rozwiązania.
+    :param submission_time: Czas złożenia. Domyślnie: timezone.now.
+    :param version: Wersja rozwiązania.
+    :return: Obiekt rozwiązania.
+    """
+    return Solution.objects.create(source_code='uploads/solutions/main.py', author=team, task=task, judge=judge,
+                                   status=status, submission_time=submission_time or timezone.now(),
+                                   version=version)
+
+
 class TaskViewTest(TestCase):
     """
     Test dla widoku zadań dla użytkownika, który nie jest sędzią.
@@ -170,6 +226,25 @@ class CompetitionModelTest(TestCase):
         self.assertIsNotNone(competition_model)
         self.assertEqual(competition_model.id, _id)
 
+    def test_get_current_competitions(self):
+        """
+        Test dla metody Competition.get_current_competitions. Metoda jest testowana dla przypadków:
+
+        + dwie równoległe sesje zawodów,
+        + wybór zawodów według sesji w metodzie Competition.get_current_competition.
+
+        """
+        create_competition('Finished 1 minute ago', timezone.now() - timedelta(hours=3, minutes=1))
+        university = Competition.objects.create(title='University', start_date=timezone.now())
+        high_school = Competition.objects.create(title='High school', start_date=timezone.now(),
+                                                 session=Competition.Session.HIGH_SCHOOL_SESSION)
+
+        competitions = Competition.get_current_competitions()
+        self.assertEqual([c.id for c in competitions], [university.id, high_school.id])
+
+        competition_model = Competition.get_current_competition(session=Competition.Session.HIGH_SCHOOL_SESSION)
+        self.assertEqual(competition_model.id, high_school.id)
+
     def test_get_coming_competitions(self):
         """
         Test dla metody Competition.get_coming_competition. Metoda jest testowana dla przypadków:
@@ -270,3 +345,2153 @@ class RegistrationComplimentFormTest(TestCase):
         })
         form.set_valid_auth_code('valid@code')
         self.assertTrue(form.is_valid())
+
+
+class RankViewTest(TestCase):
+    """
+    Zestaw testów dla widoku rankingu przy równolegle trwających zawodach.
+    """
+
+    def setUp(self) -> None:
+        self.university = Competition.objects.create(title='University', start_date=timezone.now())
+        self.high_school = Competition.objects.create(title='High school', start_date=timezone.now(),
+                                                      session=Competition.Session.HIGH_SCHOOL_SESSION)
+
+    def test_rank_keyed_by_url(self):
+        """
+        Test wyboru zawodów na podstawie id przekazanego w URL.
+        """
+        response = self.client.get(reverse('rank', kwargs={'competition_id': self.high_school.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['competition'].id, self.high_school.id)
+        self.assertEqual(len(response.context['competitions']), 2)
+
+    def test_rank_bound_to_session(self):
+        """
+        Test zapamiętania w sesji zawodów wybranych poprzez URL.
+        """
+        self.client.get(reverse('rank', kwargs={'competition_id': self.high_school.id}))
+        response = self.client.get(reverse('rank'))
+        self.assertEqual(response.context['competition'].id, self.high_school.id)
+
+    def test_rank_default_competition(self):
+        """
+        Test wyboru pierwszych trwających zawodów, gdy nie wskazano zawodów.
+        """
+        response = self.client.get(reverse('rank'))
+        self.assertEqual(response.context['competition'].id, self.university.id)
+
+
+class PartitionedCacheTest(TestCase):
+    """
+    Zestaw testów dla pamięci podręcznej podzielonej na partycje.
+    """
+
+    def test_partitions_are_isolated(self):
+        """
+        Test, czy przepełnienie jednej partycji nie usuwa wpisów z innej partycji.
+        """
+        cache = PartitionedCache(max_entries=2)
+        cache.set(1, 'rank', 'university')
+        for i in range(10):
+            cache.set(2, i, i)
+
+        self.assertEqual(cache.get(1, 'rank'), 'university')
+        self.assertIsNone(cache.get(2, 0))
+        self.assertEqual(cache.get(2, 9), 9)
+
+    def test_invalidate(self):
+        """
+        Test usunięcia wszystkich wpisów partycji.
+        """
+        cache = PartitionedCache()
+        cache.set(1, 'rank', 'university')
+        cache.set(2, 'rank', 'high school')
+        cache.invalidate(1)
+
+        self.assertIsNone(cache.get(1, 'rank'))
+        self.assertEqual(cache.get(2, 'rank'), 'high school')
+
+
+class QueryPlanTest(TestCase):
+    """
+    Zestaw testów planów zapytań dla najczęściej wykonywanych zapytań.
+    Test kończy się niepowodzeniem, jeżeli baza danych przegląda całą tabelę zamiast użyć indeksu.
+    Obsługiwane są bazy SQLite oraz PostgreSQL.
+    """
+
+    def assertNoFullScan(self, query_set, table):
+        """
+        Sprawdza plan zapytania (EXPLAIN) i zgłasza błąd, jeżeli tabela jest przeglądana w całości.
+
+        :param query_set: badany query set.
+        :param table: nazwa tabeli w bazie danych.
+        """
+        if connection.vendor == 'sqlite':
+            plan = query_set.explain()
+            for line in plan.splitlines():
+                self.assertFalse(f'SCAN {table}' in line and 'INDEX' not in line,
+                                 f'Pełne przeglądanie tabeli {table}:\n{plan}')
+        elif connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+            plan = query_set.explain()
+            self.assertNotIn(f'Seq Scan on {table}', plan, f'Pełne przeglądanie tabeli {table}:\n{plan}')
+        else:
+            self.skipTest(f'Brak obsługi planów zapytań dla bazy {connection.vendor}')
+
+    def test_pending_solutions_query(self):
+        """
+        Test planu zapytania o oczekujące rozwiązania sędziego w obrębie zawodów (SolutionsView).
+        """
+        query_set = Solution.objects.select_related('author__competition') \
+            .filter(judge_id=1).filter(author__competition=1) \
+            .filter(status=Solution.SolutionStatus.PENDING)
+        self.assertNoFullScan(query_set, Solution._meta.db_table)
+
+    def test_current_competitions_query(self):
+        """
+        Test planu zapytania o trwające zawody (Competition.get_current_competitions).
+        """
+        now = timezone.now()
+        query_set = Competition.objects.filter(start_date__range=(now, now + timedelta(days=1))) \
+            .order_by('start_date', 'id')
+        self.assertNoFullScan(query_set, Competition._meta.db_table)
+
+    def test_coming_competitions_query(self):
+        """
+        Test planu zapytania o nadchodzące zawody (Competition.get_coming_competitions).
+        """
+        self.assertNoFullScan(Competition.get_coming_competitions(), Competition._meta.db_table)
+
+    def test_test_results_query(self):
+        """
+        Test planu zapytania o wyniki testów automatycznych rozwiązania (SolutionResultsView).
+        """
+        query_set = AutomatedTestResult.objects.select_related('test').filter(solution=1)
+        self.assertNoFullScan(query_set, AutomatedTestResult._meta.db_table)
+
+
+class CompetitionSelectFormTest(TestCase):
+    """
+    Zestaw testów dla formularza wyboru zawodów i pamięci podręcznej listy wyboru.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.competition = Competition.objects.create(title='Open', start_date=timezone.now() + timedelta(weeks=2))
+
+    def test_choices_cached(self):
+        """
+        Test, czy lista wyboru jest pobierana z pamięci podręcznej bez zapytań do bazy danych.
+        """
+        CompetitionSelectForm()
+        with self.assertNumQueries(0):
+            choices = list(CompetitionSelectForm().fields['competition'].choices)
+        self.assertEqual([value for value, label in choices], ['', self.competition.id])
+
+    def test_choices_invalidated(self):
+        """
+        Test, czy zmiana zawodów unieważnia listę wyboru.
+        """
+        CompetitionSelectForm()
+        other = Competition.objects.create(title='Other', start_date=timezone.now() + timedelta(weeks=3))
+        choices = list(CompetitionSelectForm().fields['competition'].choices)
+        self.assertIn(other.id, [value for value, label in choices])
+
+        other.delete()
+        choices = list(CompetitionSelectForm().fields['competition'].choices)
+        self.assertNotIn(other.id, [value for value, label in choices])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                               'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                          'LOCATION': 'shared'}},
+                       REGISTRATION_CACHE='shared')
+    def test_choices_shared_cache(self):
+        """
+        Test, czy lista wyboru jest przechowywana i unieważniana we wspólnej pamięci podręcznej REGISTRATION_CACHE.
+        """
+        key = COMPETITION_CHOICES_CACHE_KEY.format(date=timezone.now().date().isoformat())
+        self.addCleanup(caches['shared'].clear)
+        CompetitionSelectForm()
+        self.assertEqual(caches['shared'].get(key), [(self.competition.id, competition_label(self.competition))])
+        self.assertIsNone(caches['default'].get(key))
+
+        self.competition.save()
+        self.assertIsNone(caches['shared'].get(key))
+
+    def test_validation(self):
+        """
+        Test walidacji formularza dla zawodów otwartych i zamkniętych na rejestrację.
+        """
+        self.assertTrue(CompetitionSelectForm({'competition': self.competition.id}).is_valid())
+
+        closed = Competition.objects.create(title='Closed', start_date=timezone.now() + timedelta(days=1))
+        self.assertFalse(CompetitionSelectForm({'competition': closed.id}).is_valid())
+
+
+class InstitutionSearchTest(TestCase):
+    """
+    Zestaw testów dla wyszukiwania placówek edukacyjnych w formularzu rejestracji.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.wroclaw = EduInstitution.objects.create(name='Politechnika Wrocławska', region='Wrocław',
+                                                     email='pwr@example.com')
+        EduInstitution.objects.create(name='Uniwersytet Wrocławski', region='Wrocław', email='uwr@example.com')
+        EduInstitution.objects.create(name='Politechnika Gdańska', region='Gdańsk', email='pg@example.com')
+
+    def search(self, query):
+        """
+        Funkcja pomocnicza wysyłająca żądanie wyszukiwania.
+
+        :param query: szukana fraza.
+        :return: lista etykiet wyników.
+        """
+        response = self.client.get(reverse('institution_search'), {'q': query})
+        return [result['label'] for result in response.json()['results']]
+
+    def test_prefix_before_substring(self):
+        """
+        Test wyszukiwania po prefiksie nazwy lub rejonu bez rozróżniania wielkości liter.
+        """
+        self.assertEqual(self.search('wroc'), ['Politechnika Wrocławska, Wrocław', 'Uniwersytet Wrocławski, Wrocław'])
+        self.assertEqual(self.search('GDAŃ'), ['Politechnika Gdańska, Gdańsk'])
+        self.assertEqual(self.search('Poli'), ['Politechnika Gdańska, Gdańsk', 'Politechnika Wrocławska, Wrocław'])
+        self.assertEqual(self.search('techn'), [])
+        self.assertEqual(self.search('p'), [])
+
+    def test_search_keys(self):
+        """
+        Test ustawiania pól w postaci do wyszukiwania przy zapisie i uzupełniania ich dla istniejących placówek.
+        """
+        self.wroclaw.name = 'Politechnika  WROCŁAWSKA'
+        self.wroclaw.save(update_fields=['name'])
+        self.assertEqual(EduInstitution.objects.get(id=self.wroclaw.id).name_key, 'politechnika wrocławska')
+
+        EduInstitution.objects.update(name_key='', region_key='')
+        self.assertEqual(EduInstitution.update_search_keys(), 3)
+        self.assertEqual(self.search('gdańsk'), ['Politechnika Gdańska, Gdańsk'])
+
+    def test_results_cached_and_invalidated(self):
+        """
+        Test pamięci podręcznej wyników i jej unieważnienia po dodaniu placówki.
+        """
+        self.search('poli')
+        with self.assertNumQueries(0):
+            self.search('poli')
+
+        EduInstitution.objects.create(name='Politechnika Śląska', region='Gliwice', email='pslask@example.com')
+        self.assertEqual(len(self.search('poli')), 3)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                               'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                          'LOCATION': 'shared'}},
+                       REGISTRATION_CACHE='shared')
+    def test_version_shared_cache(self):
+        """
+        Test, czy wersja wyników wyszukiwania jest przechowywana i zmieniana we wspólnej pamięci podręcznej
+        REGISTRATION_CACHE.
+        """
+        self.addCleanup(caches['shared'].clear)
+        default_version = caches['default'].get(INSTITUTION_SEARCH_VERSION_KEY)
+        self.search('poli')
+        self.assertEqual(caches['shared'].get(INSTITUTION_SEARCH_VERSION_KEY), 1)
+
+        EduInstitution.objects.create(name='Politechnika Śląska', region='Gliwice', email='pslask@example.com')
+        self.assertEqual(caches['shared'].get(INSTITUTION_SEARCH_VERSION_KEY), 2)
+        self.assertEqual(caches['default'].get(INSTITUTION_SEARCH_VERSION_KEY), default_version)
+        self.assertEqual(len(self.search('poli')), 3)
+
+    def test_registration_page_renders_only_selected(self):
+        """
+        Test, czy strona rejestracji nie zawiera listy wszystkich placówek.
+        """
+        response = self.client.get(reverse('registration'))
+        self.assertNotContains(response, 'Politechnika Wrocławska')
+
+    def test_form_validates_chosen_id(self):
+        """
+        Test walidacji wybranego id placówki i dodania jej do listy wyboru.
+        """
+        form = EduInstitutionSelectForm({'institution': self.wroclaw.id})
+        self.assertTrue(form.is_valid())
+        self.assertIn('Politechnika Wrocławska', str(form['institution']))
+        self.assertNotIn('Politechnika Gdańska', str(form['institution']))
+
+        self.assertFalse(EduInstitutionSelectForm({'institution': 0}).is_valid())
+
+
+class RegistrationCapacityTest(TestCase):
+    """
+    Zestaw testów dla rezerwacji miejsc na zawodach i listy rezerwowej.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.institution = EduInstitution.objects.create(name='Uczelnia', region='Region', email='uni@example.com')
+        self.competition = Competition.objects.create(title='Zawody', start_date=timezone.now() + timedelta(weeks=2),
+                                                      max_teams=1)
+
+    def register(self, team_name):
+        """
+        Funkcja pomocnicza wysyłająca formularz rejestracji zespołu.
+
+        :param team_name: nazwa zespołu.
+        :return: odpowiedź HTTP.
+        """
+        data = {
+            'form-TOTAL_FORMS': 3, 'form-INITIAL_FORMS': 0,
+            'name': team_name,
+            'institution': self.institution.id,
+            'competition': self.competition.id,
+        }
+        for i in range(3):
+            data[f'form-{i}-name'] = f'Imię{i}'
+            data[f'form-{i}-surname'] = f'Nazwisko{i}'
+            data[f'form-{i}-email'] = f'{team_name}{i}@example.com'
+        return self.client.post(reverse('registration'), data)
+
+    def test_reserve_slot(self):
+        """
+        Test warunkowej rezerwacji miejsca przy wyczerpanym limicie.
+        """
+        self.assertTrue(self.competition.reserve_slot())
+        self.assertFalse(self.competition.reserve_slot())
+        self.competition.refresh_from_db()
+        self.assertEqual(self.competition.registered_teams, 1)
+
+    def test_registration_over_capacity(self):
+        """
+        Test rejestracji: pierwszy zespół otrzymuje miejsce, kolejne trafiają na listę rezerwową.
+        """
+        response = self.register('Pierwsi')
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn('waitlisted', response.url)
+        self.assertEqual(Participant.objects.filter(team__name='Pierwsi').count(), 3)
+
+        response = self.register('Drudzy')
+        self.assertIn('waitlisted', response.url)
+        self.assertEqual([team.name for team in self.competition.get_waitlist()], ['Drudzy'])
+
+    def test_release_slot_promotes_waitlisted(self):
+        """
+        Test zwolnienia miejsca po usunięciu zespołu i przydzielenia go pierwszemu zespołowi z listy rezerwowej.
+        """
+        self.register('Pierwsi')
+        self.register('Drudzy')
+        self.register('Trzeci')
+        Team.objects.filter(name='Trzeci').update(priority=0)
+
+        Team.objects.get(name='Pierwsi').delete()
+
+        self.assertFalse(Team.objects.get(name='Trzeci').is_waitlisted)
+        self.assertTrue(Team.objects.get(name='Drudzy').is_waitlisted)
+        self.competition.refresh_from_db()
+        self.assertEqual(self.competition.registered_teams, 1)
+
+    def test_release_slot_skips_promoted(self):
+        """
+        Test zwolnienia miejsca, gdy pierwszy zespół z listy rezerwowej został już przeniesiony przez równoczesne
+        zwolnienie miejsca - miejsce otrzymuje kolejny zespół, a licznik nie jest zwiększany dwukrotnie.
+        """
+        self.register('Pierwsi')
+        self.register('Drudzy')
+        self.register('Trzeci')
+        Competition.objects.filter(id=self.competition.id).update(max_teams=2)
+        Team.objects.filter(name='Drudzy').update(is_waitlisted=False)
+        stale = Team.objects.filter(name__in=['Drudzy', 'Trzeci']).order_by('id')
+        waitlist = [stale, self.competition.get_waitlist()]
+
+        with mock.patch.object(Competition, 'get_waitlist', side_effect=lambda: waitlist.pop(0)):
+            Team.objects.get(name='Pierwsi').delete()
+
+        self.assertFalse(Team.objects.get(name='Trzeci').is_waitlisted)
+        self.competition.refresh_from_db()
+        self.assertEqual(self.competition.registered_teams, 1)
+
+    def test_recount_slots(self):
+        """
+        Test komendy wyliczającej od nowa liczniki zarejestrowanych zespołów.
+        """
+        create_team(self.competition, 'Pierwsi')
+        create_team(self.competition, 'Drudzy')
+        Team.objects.filter(name='Drudzy').update(is_waitlisted=True)
+        out = StringIO()
+        call_command('recount_team_slots', stdout=out)
+        self.assertIn('Poprawione liczniki: 1', out.getvalue())
+        self.competition.refresh_from_db()
+        self.assertEqual(self.competition.registered_teams, 1)
+
+    def test_admin_add_over_capacity(self):
+        """
+        Test dodania zespołów w panelu administracyjnym: zespół ponad limit trafia na listę rezerwową,
+        a usunięcie zespołu zwalnia jego miejsce.
+        """
+        User.objects.create_superuser('admin', 'admin@example.com', PASSWORD)
+        self.client.login(username='admin', password=PASSWORD)
+        for name in ('Pierwsi', 'Drudzy'):
+            self.client.post(reverse('admin:buzkashi_app_team_add'), {
+                'name': name, 'competition': self.competition.id, 'institution': self.institution.id,
+                'score': '0', 'priority': 0, 'application_date_0': '2021-01-01', 'application_date_1': '12:00:00',
+            })
+
+        self.assertFalse(Team.objects.get(name='Pierwsi').is_waitlisted)
+        self.assertTrue(Team.objects.get(name='Drudzy').is_waitlisted)
+        self.competition.refresh_from_db()
+        self.assertEqual(self.competition.registered_teams, 1)
+
+
+class QualificationTest(TestCase):
+    """
+    Zestaw testów dla kwalifikacji zespołów na zawody.
+    """
+
+    def setUp(self) -> None:
+        self.competition = Competition.objects.create(title='Zawody', max_teams=2)
+        self.school_a = EduInstitution.objects.create(name='A', region='R', email='a@example.com')
+        self.school_b = EduInstitution.objects.create(name='B', region='R', email='b@example.com')
+        now = timezone.now()
+        self.first = Team.objects.create(name='Pierwsi', competition=self.competition, institution=self.school_a,
+                                         application_date=now)
+        self.second = Team.objects.create(name='Drudzy', competition=self.competition, institution=self.school_a,
+                                          application_date=now + timedelta(minutes=1))
+        self.third = Team.objects.create(name='Trzeci', competition=self.competition, institution=self.school_b,
+                                         application_date=now + timedelta(minutes=2), priority=2)
+        Participant.objects.create(name='Jan', surname='Kowalski', email='jan@example.com', is_capitan=True,
+                                   team=self.first)
+
+    def test_dry_run(self):
+        """
+        Test trybu próbnego: wyświetlenie zmian bez zapisu.
+        """
+        out = StringIO()
+        call_command('qualify_teams', self.competition.id, '--dry-run', stdout=out, stderr=StringIO())
+
+        self.assertIn('+ Pierwsi', out.getvalue())
+        self.assertIn('+ Drudzy', out.getvalue())
+        self.assertNotIn('Trzeci', out.getvalue())
+        self.assertFalse(Team.objects.filter(is_qualified=True).exists())
+
+    def test_institution_quota(self):
+        """
+        Test kwalifikacji z limitem zespołów na placówkę, zapisu wyniku i utworzenia kont użytkowników.
+        """
+        call_command('qualify_teams', self.competition.id, '--institution-quota', 1, stdout=StringIO(),
+                     stderr=StringIO())
+
+        qualified = Team.objects.filter(is_qualified=True).order_by('id')
+        self.assertEqual([team.name for team in qualified], ['Pierwsi', 'Trzeci'])
+        self.assertTrue(all(team.user_id for team in qualified))
+        self.assertEqual(User.objects.get(id=qualified[0].user_id).email, 'jan@example.com')
+
+    def test_requalification_removes_teams(self):
+        """
+        Test usunięcia kwalifikacji zespołu, który przestał się mieścić w limicie.
+        """
+        call_command('qualify_teams', self.competition.id, stdout=StringIO(), stderr=StringIO())
+        Team.objects.filter(id=self.third.id).update(priority=0)
+
+        out = StringIO()
+        call_command('qualify_teams', self.competition.id, stdout=out, stderr=StringIO())
+        self.assertIn('+ Trzeci', out.getvalue())
+        self.assertIn('- Drudzy', out.getvalue())
+
+    def test_qualified_team_logs_in(self):
+        """
+        Test wysłania danych logowania na email kapitana i zalogowania zakwalifikowanego zespołu.
+        """
+        result = qualification.qualify(self.competition)
+
+        self.assertEqual([team.name for team in result.unsent], ['Drudzy'])
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['jan@example.com'])
+        username, password = (line.split(': ', 1)[1] for line in mail.outbox[0].body.splitlines()[-2:])
+        self.assertEqual(username, qualification.team_username(self.first))
+        self.assertTrue(self.client.login(username=username, password=password))
+
+    def test_waitlisted_not_qualified(self):
+        """
+        Test pominięcia w kwalifikacji zespołów z listy rezerwowej.
+        """
+        Team.objects.filter(id=self.first.id).update(is_waitlisted=True)
+
+        result = qualification.qualify(self.competition)
+        self.assertEqual(result.qualified, {self.second.id, self.third.id})
+
+    def test_existing_username(self):
+        """
+        Test kwalifikacji zespołu, dla którego istnieje już konto o nazwie zespołu.
+        """
+        user = User.objects.create_user(qualification.team_username(self.first))
+
+        qualification.qualify(self.competition)
+        self.assertEqual(Team.objects.get(id=self.first.id).user_id, user.id)
+        self.assertTrue(Team.objects.get(id=self.second.id).user_id)
+
+
+class ImportTest(TestCase):
+    """
+    Zestaw testów dla importu placówek edukacyjnych, zespołów i uczestników.
+    """
+
+    def write(self, content, suffix):
+        """
+        Funkcja pomocnicza zapisująca treść do pliku tymczasowego.
+
+        :param content: treść pliku.
+        :param suffix: rozszerzenie pliku.
+        :return: ścieżka do pliku.
+        """
+        file = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False, encoding='utf-8')
+        file.write(content)
+        file.close()
+        self.addCleanup(os.unlink, file.name)
+        return file.name
+
+    def test_import_institutions_with_errors(self):
+        """
+        Test importu placówek z pliku csv z błędnymi wierszami (zduplikowana nazwa, niepoprawny email).
+        """
+        EduInstitution.objects.create(name='Istniejąca', region='R', email='old@example.com')
+        path = self.write('name,region,email,is_university\n'
+                          'Szkoła 1,Wrocław,s1@example.com,0\n'
+                          'Istniejąca,Wrocław,s2@example.com,0\n'
+                          'Szkoła 3,Wrocław,niepoprawny,0\n'
+                          'Szkoła 4,Gdańsk,s4@example.com,1\n'
+                          'Szkoła 4,Gdańsk,s5@example.com,1\n', '.csv')
+
+        out, err = StringIO(), StringIO()
+        call_command('import_data', 'institutions', path, '--batch-size', 1, stdout=out, stderr=err)
+
+        self.assertIn('Zaimportowano: 2, błędy: 3', out.getvalue())
+        self.assertIn('Wiersz 3', err.getvalue())
+        self.assertIn('Wiersz 4', err.getvalue())
+        self.assertIn('Wiersz 6', err.getvalue())
+        self.assertFalse(EduInstitution.objects.get(name='Szkoła 1').is_university)
+
+    def test_import_teams_and_participants(self):
+        """
+        Test importu zespołów i uczestników z plików JSON Lines.
+        """
+        competition = Competition.objects.create(title='Zawody')
+        EduInstitution.objects.create(name='Szkoła', region='R', email='s@example.com')
+        teams = [{'name': 'Zespół', 'competition': competition.id, 'institution': 'Szkoła', 'priority': 2},
+                 {'name': 'Bez szkoły', 'competition': competition.id, 'institution': 'Brak'}]
+        path = self.write('\n'.join(json.dumps(team) for team in teams) + '\nnie json\n', '.jsonl')
+        call_command('import_data', 'teams', path, stdout=StringIO(), stderr=StringIO())
+
+        participants = [{'name': 'Jan', 'surname': 'Kowalski', 'email': 'jan@example.com', 'team': 'Zespół',
+                         'is_capitan': True}]
+        path = self.write('\n'.join(json.dumps(participant) for participant in participants), '.jsonl')
+        call_command('import_data', 'participants', path, stdout=StringIO(), stderr=StringIO())
+
+        team = Team.objects.get()
+        self.assertEqual(team.priority, 2)
+        self.assertTrue(Participant.objects.get(team=team).is_capitan)
+        competition.refresh_from_db()
+        self.assertEqual(competition.registered_teams, 1)
+
+    def test_import_teams_over_capacity(self):
+        """
+        Test importu zespołów ponad limit miejsc oraz zespołu zapisanego w międzyczasie przez inny proces:
+        błędny wiersz jest zgłaszany, a pozostałe zespoły zapisywane na miejscach lub na liście rezerwowej.
+        """
+        competition = Competition.objects.create(title='Zawody', max_teams=2)
+        institution = EduInstitution.objects.create(name='Szkoła', region='R', email='s@example.com')
+        importer = TeamImporter()
+        Team.objects.create(name='Drudzy', competition=competition, institution=institution)
+        rows = ''.join(f'{name},{competition.id},Szkoła\n' for name in ('Pierwsi', 'Drudzy', 'Trzeci', 'Czwarci'))
+
+        report = importer.run(StringIO('name,competition,institution\n' + rows), 'csv')
+
+        self.assertEqual(report.created, 3)
+        self.assertEqual([line_num for line_num, _ in report.errors], [3])
+        self.assertEqual(list(Team.objects.filter(is_waitlisted=True).values_list('name', flat=True)
+                              .order_by('name')), ['Czwarci'])
+        competition.refresh_from_db()
+        self.assertEqual(competition.registered_teams, 2)
+
+    def test_admin_upload(self):
+        """
+        Test importu przez panel administracyjny.
+        """
+        User.objects.create_superuser('admin', 'admin@example.com', PASSWORD)
+        self.client.login(username='admin', password=PASSWORD)
+
+        upload = SimpleUploadedFile('institutions.csv', 'name,region,email\nSzkoła,R,s@example.com\n'.encode())
+        response = self.client.post(reverse('admin:buzkashi_app_eduinstitution_import'),
+                                    {'file': upload, 'format': 'csv'})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(EduInstitution.objects.filter(name='Szkoła').exists())
+
+
+class ExportTest(TestCase):
+    """
+    Zestaw testów dla eksportu danych zawodów.
+    """
+
+    def setUp(self) -> None:
+        self.judge = create_judge()
+        self.competition = Competition.objects.create(title='Zawody', start_date=timezone.now() - timedelta(hours=1))
+        task_a = create_task(self.judge, 'A', 'Treść')
+        task_b = create_task(self.judge, 'B', 'Treść')
+        self.winners = create_team(self.competition, 'Zwycięzcy')
+        self.others = create_team(self.competition, 'Pozostali')
+        Team.objects.filter(id=self.winners.id).update(score=timedelta(minutes=50))
+
+        create_solution(self.winners, task_a, self.judge, Solution.SolutionStatus.ACCEPTED)
+        create_solution(self.winners, task_b, self.judge, Solution.SolutionStatus.ACCEPTED)
+        create_solution(self.others, task_a, self.judge, Solution.SolutionStatus.REJECTED)
+
+    def test_export_standings_csv(self):
+        """
+        Test eksportu rankingu do pliku csv przez administratora.
+        """
+        User.objects.create_superuser('admin', 'admin@example.com', PASSWORD)
+        self.client.login(username='admin', password=PASSWORD)
+
+        response = self.client.get(reverse('competition_export', args=[self.competition.id, 'standings', 'csv']))
+        content = b''.join(response.streaming_content).decode('utf-8')
+
+        self.assertEqual(content.splitlines(), ['position,team,solved,time', '1,Zwycięzcy,2,50', '2,Pozostali,0,0'])
+
+    def test_export_solutions_json(self):
+        """
+        Test eksportu werdyktów rozwiązań do pliku JSON za pomocą komendy.
+        """
+        out = StringIO()
+        call_command('export_results', self.competition.id, 'solutions', '--format', 'json', stdout=out)
+
+        solutions = json.loads(out.getvalue())
+        self.assertEqual(len(solutions), 3)
+        self.assertEqual(solutions[2]['status'], Solution.SolutionStatus.REJECTED)
+
+    def test_export_requires_staff(self):
+        """
+        Test braku dostępu do eksportu dla użytkownika bez uprawnień administratora.
+        """
+        self.client.login(username=USERNAME, password=PASSWORD)
+        response = self.client.get(reverse('competition_export', args=[self.competition.id, 'standings', 'csv']))
+        self.assertEqual(response.status_code, 302)
+
+
+class ScoreboardPublishTest(TestCase):
+    """
+    Zestaw testów dla aktualizacji rankingu po akceptacji rozwiązania i publikacji rankingów jako plików statycznych.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        settings_override = override_settings(MEDIA_ROOT=self.root, SCOREBOARD_ROOT=os.path.join(self.root, 'pub'),
+                                              SCOREBOARD_JUDGE_ROOT=os.path.join(self.root, 'judges'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(rank_cache.clear)
+
+        self.judge = create_judge()
+        self.client.login(username=USERNAME, password=PASSWORD)
+        self.competition = Competition.objects.create(title='Zawody', start_date=timezone.now() - timedelta(hours=1))
+        self.team = create_team(self.competition, 'Zespół')
+        self.solution = create_solution(self.team, create_task(self.judge, 'A', 'Treść'), self.judge,
+                                        Solution.SolutionStatus.PENDING)
+
+    def read(self, artifact):
+        """
+        Funkcja pomocnicza czytająca opublikowany plik rankingu.
+
+        :param artifact: nazwa pliku.
+        :return: zawartość pliku.
+        """
+        with open(os.path.join(publisher.competition_dir(self.competition.id, artifact), artifact),
+                  encoding='utf-8') as file:
+            return file.read()
+
+    def test_accept_publishes_rank(self):
+        """
+        Test akceptacji rozwiązania: zapis oceny zespołu, aktualizacja pliku rankingu i publikacja plików statycznych.
+        """
+        self.client.get(reverse('solution_judgement', args=[self.solution.id, 'accept']))
+
+        self.team.refresh_from_db()
+        self.assertGreaterEqual(self.team.score, timedelta(minutes=0))
+        self.assertEqual(json.loads(self.read('rank.json'))['rows'], [[1, 'Zespół', 1, 60]])
+        self.assertIn('Zespół', self.read('public.html'))
+        self.assertEqual([name for name in os.listdir(os.path.join(self.root, 'pub', str(self.competition.id)))
+                          if name.endswith('.tmp')], [])
+
+    def test_accept_once(self):
+        """
+        Test akceptacji tylko oczekującego rozwiązania przypisanego do zalogowanego sędziego: ponowna akceptacja
+        i odrzucenie zaakceptowanego rozwiązania nie zmieniają oceny zespołu.
+        """
+        url = reverse('solution_judgement', args=[self.solution.id, 'accept'])
+        self.client.get(url)
+        self.team.refresh_from_db()
+        score = self.team.score
+        self.client.get(url)
+        self.client.get(reverse('solution_judgement', args=[self.solution.id, 'reject']))
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.score, score)
+        self.assertEqual(Solution.objects.get(id=self.solution.id).status, Solution.SolutionStatus.ACCEPTED)
+
+        other = Judge.objects.create(user=User.objects.create_user(username='other', password=PASSWORD))
+        self.client.login(username='other', password=PASSWORD)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(other.solution_set.count(), 0)
+
+    def test_frozen_rank_not_updated(self):
+        """
+        Test publikacji po zamrożeniu rankingu: ranking publiczny jest rankingiem zamrożonym.
+        """
+        self.competition.is_frozen = True
+        self.competition.save()
+        self.client.get(reverse('solution_judgement', args=[self.solution.id, 'accept']))
+
+        self.assertEqual(json.loads(self.read('rank.json'))['rows'], [[1, 'Zespół', 1, 60]])
+        self.assertEqual(json.loads(self.read('public.json'))['rows'], [])
+        self.assertTrue(json.loads(self.read('public.json'))['frozen'])
+
+    def test_live_rank_hidden_from_guests(self):
+        """
+        Test dostępu do rankingu aktualnego: tylko ranking publiczny jest w katalogu SCOREBOARD_ROOT, a ranking
+        aktualny serwowany jest tylko sędziom.
+        """
+        self.client.get(reverse('solution_judgement', args=[self.solution.id, 'accept']))
+        self.assertEqual(sorted(os.listdir(os.path.join(self.root, 'pub', str(self.competition.id)))),
+                         ['public.html', 'public.json'])
+        url = publisher.competition_url(self.competition.id, 'rank.json')
+        self.assertEqual(json.loads(b''.join(self.client.get(url).streaming_content))['rows'],
+                         [[1, 'Zespół', 1, 60]])
+
+        self.client.logout()
+        self.assertEqual(self.client.get(f'/scoreboards/{self.competition.id}/rank.json').status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        User.objects.create_user(username='team', password=PASSWORD)
+        self.client.login(username='team', password=PASSWORD)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_rank_view_is_shell(self):
+        """
+        Test widoku rankingu dla gościa: przekazanie adresu rankingu publicznego bez danych rankingu.
+        """
+        self.client.logout()
+        response = self.client.get(reverse('rank', kwargs={'competition_id': self.competition.id}))
+        self.assertEqual(response.context['public_url'], f'/scoreboards/{self.competition.id}/public.html')
+        self.assertNotIn('rank_url', response.context)
+
+
+class RankFormatTest(TestCase):
+    """
+    Zestaw testów dla binarnego formatu rankingu i konwersji plików csv.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=directory.name,
+                                              SCOREBOARD_ROOT=os.path.join(directory.name, 'pub'),
+                                              SCOREBOARD_JUDGE_ROOT=os.path.join(directory.name, 'judges'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(rank_cache.clear)
+
+    def test_round_trip(self):
+        """
+        Test serializacji i deserializacji wierszy rankingu.
+        """
+        rows = (RankRow(1, 'Zespół', 3, 120), RankRow(2, 'Żółwie', 1, 15))
+        content = dump_rank(rows)
+        self.assertTrue(content.startswith(b'BZSB\x01'))
+        self.assertEqual(parse_rank(content), rows)
+        self.assertEqual(parse_rank(content)[0].team, 'Zespół')
+
+    def test_unsupported_version(self):
+        """
+        Test odrzucenia pliku w nieobsługiwanej wersji formatu.
+        """
+        with self.assertRaises(ValueError):
+            parse_rank(b'BZSB\x02' + dump_rank(())[5:])
+
+    def test_convert_csv_ranks(self):
+        """
+        Test konwersji wgranego pliku csv do formatu binarnego komendą convert_ranks.
+        """
+        competition = Competition.objects.create(title='Zawody')
+        competition.rank.save('rank.csv', ContentFile('1,Zespół,2,30\n2,Inni,1,10\n'.encode()))
+        self.assertEqual(load_rank(competition)[1], RankRow(2, 'Inni', 1, 10))
+
+        call_command('convert_ranks', stdout=StringIO())
+
+        competition.refresh_from_db()
+        self.assertTrue(competition.rank.name.endswith('.bzsb'))
+        self.assertEqual(load_rank(competition), (RankRow(1, 'Zespół', 2, 30), RankRow(2, 'Inni', 1, 10)))
+
+
+class TimelineTest(TestCase):
+    """
+    Zestaw testów dla historii rankingu zawodów.
+    """
+
+    def setUp(self) -> None:
+        self.judge = create_judge()
+        self.start = timezone.now() - timedelta(hours=2)
+        self.competition = Competition.objects.create(title='Zawody', start_date=self.start)
+        self.task_a = create_task(self.judge, 'A', 'Treść')
+        self.task_b = create_task(self.judge, 'B', 'Treść')
+        self.red = create_team(self.competition, 'Czerwoni')
+        self.blue = create_team(self.competition, 'Niebiescy')
+
+        accepted = Solution.SolutionStatus.ACCEPTED
+        create_solution(self.red, self.task_a, self.judge, accepted, self.start + timedelta(minutes=10))
+        create_solution(self.blue, self.task_a, self.judge, accepted, self.start + timedelta(minutes=5), version=2)
+        create_solution(self.blue, self.task_b, self.judge, accepted, self.start + timedelta(minutes=70))
+
+    def rows_at(self, minute):
+        """
+        Funkcja pomocnicza zwracająca ranking w danej minucie zawodów.
+
+        :param minute: minuta zawodów.
+        :return: lista krotek (pozycja, zespół, zadania rozwiązane, czas).
+        """
+        return [tuple(row) for row in
+                timeline.standings_at(self.competition, self.start + timedelta(minutes=minute, seconds=30))]
+
+    def test_rebuild_and_replay(self):
+        """
+        Test odbudowy historii i odtworzenia rankingu w kolejnych minutach zawodów.
+        """
+        timeline.rebuild(self.competition)
+
+        self.assertEqual(self.rows_at(0), [(1, 'Czerwoni', 0, 0), (1, 'Niebiescy', 0, 0)])
+        self.assertEqual(self.rows_at(12), [(1, 'Czerwoni', 1, 10), (2, 'Niebiescy', 1, 25)])
+        self.assertEqual(self.rows_at(100), [(1, 'Niebiescy', 2, 95), (2, 'Czerwoni', 1, 10)])
+
+    def test_snapshots_and_out_of_order_verdict(self):
+        """
+        Test zapisu migawek co najmniej co SNAPSHOT_INTERVAL minut oraz zmiany zapisanej wstecz.
+        """
+        timeline.rebuild(self.competition)
+        minutes = list(StandingsSnapshot.objects.filter(competition=self.competition)
+                       .order_by('minute').values_list('minute', flat=True))
+        self.assertEqual(minutes, [5, 70])
+
+        timeline.record(self.competition, self.red.id, 30, (2, 60))
+        self.assertEqual(self.rows_at(100), [(1, 'Czerwoni', 2, 60), (2, 'Niebiescy', 2, 95)])
+        self.assertEqual(self.rows_at(20), [(1, 'Czerwoni', 1, 10), (2, 'Niebiescy', 1, 25)])
+
+    def test_verdicts_out_of_order(self):
+        """
+        Test werdyktów zapisywanych przez record_verdict w kolejności innej niż kolejność złożenia rozwiązań:
+        historia musi być zgodna z odbudowaną historią.
+        """
+        timeline.rebuild(self.competition)
+        pending = Solution.SolutionStatus.PENDING
+        late = create_solution(self.red, self.task_b, self.judge, pending, self.start + timedelta(minutes=60))
+        early = create_solution(self.red, self.task_b, self.judge, pending, self.start + timedelta(minutes=30),
+                                version=2)
+        for solution in (late, early):
+            solution.status = Solution.SolutionStatus.ACCEPTED
+            solution.save()
+            timeline.record_verdict(Solution.objects.select_related('author__competition').get(id=solution.id))
+
+        live = [self.rows_at(minute) for minute in (20, 45, 100)]
+        timeline.rebuild(self.competition)
+        self.assertEqual(live, [self.rows_at(minute) for minute in (20, 45, 100)])
+        self.assertEqual(self.rows_at(45)[0], (1, 'Czerwoni', 2, 60))
+
+    def test_history_view(self):
+        """
+        Test widoku historii rankingu dla parametru minute.
+        """
+        timeline.rebuild(self.competition)
+        self.client.login(username=USERNAME, password=PASSWORD)
+
+        response = self.client.get(reverse('rank_history', args=[self.competition.id]), {'minute': 12})
+        self.assertEqual(response.json(), {'minute': 12, 'rows': [[1, 'Czerwoni', 1, 10], [2, 'Niebiescy', 1, 25]]})
+        response = self.client.get(reverse('rank_history', args=[self.competition.id]), {'minute': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ApiTest(TestCase):
+    """
+    Zestaw testów dla API w wersji 1.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=directory.name,
+                                              SCOREBOARD_ROOT=os.path.join(directory.name, 'pub'),
+                                              SCOREBOARD_JUDGE_ROOT=os.path.join(directory.name, 'judges'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(rank_cache.clear)
+
+        self.judge = create_judge()
+        self.competition = Competition.objects.create(title='Zawody', start_date=timezone.now() - timedelta(hours=1))
+        self.task = create_task(self.judge, 'Zadanie', 'Treść')
+        self.task.competition = self.competition
+        self.task.save()
+        self.teams = [create_team(self.competition, name) for name in ('Alfa', 'Beta', 'Gamma')]
+        create_solution(self.teams[0], self.task, self.judge, Solution.SolutionStatus.ACCEPTED)
+        create_solution(self.teams[1], self.task, self.judge, Solution.SolutionStatus.PENDING)
+        update_rank(self.competition)
+
+    def test_fields_and_keyset_pagination(self):
+        """
+        Test wyboru pól i stronicowania listy zawodów oraz odrzucenia nieznanego pola.
+        """
+        Competition.objects.create(title='Inne zawody')
+        url = reverse('api_competitions')
+
+        response = self.client.get(url, {'fields': 'title', 'limit': 1})
+        first = response.json()
+        self.assertEqual(first['results'], [{'title': 'Zawody'}])
+
+        second = self.client.get(url, {'fields': 'title', 'limit': 1, 'after': first['next']}).json()
+        self.assertEqual(second, {'results': [{'title': 'Inne zawody'}], 'next': None})
+
+        self.assertEqual(self.client.get(url, {'fields': 'title,rank'}).status_code, 400)
+
+    def test_scoreboard_etag(self):
+        """
+        Test rankingu z pamięci podręcznej, odpowiedzi 304 dla niezmienionego rankingu i kompresji gzip.
+        """
+        url = reverse('api_scoreboard', args=[self.competition.id])
+        response = self.client.get(url, {'fields': 'position,team'})
+        self.assertEqual(response.json()['results'][0], {'position': 1, 'team': 'Alfa'})
+
+        response = self.client.get(url, {'fields': 'position,team'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        for index in range(20):
+            create_team(self.competition, f'Zespół {index}')
+        update_rank(self.competition)
+        response = self.client.get(url, {'fields': 'position,team'}, HTTP_IF_NONE_MATCH=response['ETag'],
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_solutions_access(self):
+        """
+        Test dostępu do statusu rozwiązań: zespół widzi tylko własne rozwiązania, a gość nie ma dostępu.
+        """
+        url = reverse('api_solutions', args=[self.competition.id])
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        team = self.teams[1]
+        team.user = create_user('zespol', PASSWORD)
+        team.save()
+        self.client.login(username='zespol', password=PASSWORD)
+        results = self.client.get(url, {'fields': 'team,status'}).json()['results']
+        self.assertEqual(results, [{'team': 'Beta', 'status': Solution.SolutionStatus.PENDING}])
+
+    def test_tasks_hidden_before_start(self):
+        """
+        Test ukrycia zadań przed rozpoczęciem zawodów dla użytkowników niebędących sędziami.
+        """
+        self.competition.start_date = timezone.now() + timedelta(days=1)
+        self.competition.save()
+        url = reverse('api_tasks', args=[self.competition.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.login(username=USERNAME, password=PASSWORD)
+        self.assertEqual(self.client.get(url).json()['results'][0]['title'], 'Zadanie')
+
+
+class SubmissionTest(TestCase):
+    """
+    Zestaw testów dla zgłaszania rozwiązań przez zespół.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        cache.clear()
+
+        self.judge = create_judge()
+        self.competition = Competition.objects.create(title='Zawody', start_date=timezone.now() - timedelta(hours=1))
+        self.task = Task.objects.create(title='Zadanie', body='Treść', author=self.judge, competition=self.competition)
+        self.team = create_team(self.competition, 'Zespół')
+        self.team.user = create_user('zespol', PASSWORD)
+        self.team.is_qualified = True
+        self.team.save()
+        self.client.login(username='zespol', password=PASSWORD)
+
+    def post_source(self, content):
+        """
+        Funkcja pomocnicza zgłaszająca rozwiązanie.
+
+        :param content: zawartość pliku kodu źródłowego.
+        :return: odpowiedź HTTP.
+        """
+        source = SimpleUploadedFile('Main.java', content)
+        return self.client.post(reverse('submission'), {'task': self.task.id, 'language': 'JAVA', 'source': source})
+
+    def test_submit(self):
+        """
+        Test zgłoszenia rozwiązań: skrót i rozmiar kodu, kolejne wersje, sędzia - autor zadania i kolejka oceny.
+        """
+        content = b'class Main { public static void main(String[] a) {} }'
+        response = self.post_source(content)
+        self.assertRedirects(response, f"{reverse('submission')}?version=1")
+        self.post_source(content + b'\n')
+
+        first, second = Solution.objects.order_by('id')
+        self.assertEqual((first.version, second.version), (1, 2))
+        self.assertEqual(first.source_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(first.source_size, len(content))
+        self.assertEqual(first.judge, self.judge)
+        self.assertEqual(first.status, Solution.SolutionStatus.PENDING)
+        self.assertEqual(JudgingJob.objects.filter(status=JudgingJob.JobStatus.QUEUED).count(), 2)
+        with first.source_code.open('rb') as source:
+            self.assertEqual(source.read(), content)
+        self.assertTrue(SolutionFingerprint.objects.filter(solution=first).exists())
+
+    def test_not_qualified(self):
+        """
+        Test odrzucenia zgłoszenia zespołu, który nie jest zakwalifikowany na zawody.
+        """
+        Team.objects.filter(id=self.team.id).update(is_qualified=False)
+        response = self.post_source(b'class Main {}')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Solution.objects.exists())
+
+    @override_settings(SOLUTION_MAX_SIZE=100)
+    def test_too_large(self):
+        """
+        Test odrzucenia zbyt dużego pliku kodu źródłowego.
+        """
+        response = self.post_source(b'x' * 1000)
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Solution.objects.exists())
+
+    def test_other_competition_task(self):
+        """
+        Test odrzucenia zgłoszenia zadania spoza zawodów zespołu i zgłoszenia przez użytkownika bez zespołu.
+        """
+        self.task.competition = None
+        self.task.save()
+        self.assertEqual(self.post_source(b'code').status_code, 400)
+
+        self.client.login(username=USERNAME, password=PASSWORD)
+        self.assertEqual(self.client.get(reverse('submission')).status_code, 403)
+
+    @override_settings(RATE_LIMITS={'submission_team': (10, 60), 'submission_task': (1, 60)})
+    def test_rate_limit(self):
+        """
+        Test odpowiedzi 429 z nagłówkiem Retry-After po przekroczeniu limitu zgłoszeń zadania.
+        """
+        self.assertEqual(self.post_source(b'code').status_code, 302)
+        response = self.post_source(b'code')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertEqual(Solution.objects.count(), 1)
+
+    @override_settings(RATE_LIMITS={'submission_team': (1, 60), 'submission_task': (10, 60)}, SOLUTION_MAX_SIZE=100)
+    def test_rejected_not_counted(self):
+        """
+        Test, czy zgłoszenia odrzucone z powodu rozmiaru pliku lub błędnego formularza nie zużywają limitu zespołu.
+        """
+        self.assertEqual(self.post_source(b'x' * 1000).status_code, 413)
+        response = self.client.post(reverse('submission'), {'task': self.task.id, 'language': 'JAVA'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post_source(b'code').status_code, 302)
+        self.assertEqual(self.post_source(b'code').status_code, 429)
+
+    def test_next_version(self):
+        """
+        Test licznika zgłoszeń niezależnego dla każdego zadania.
+        """
+        other = Task.objects.create(title='Inne', body='Treść', author=self.judge, competition=self.competition)
+        versions = [SubmissionCounter.next_version(self.team, task) for task in (self.task, self.task, other)]
+        self.assertEqual(versions, [1, 2, 1])
+
+
+class RateLimiterTest(TestCase):
+    """
+    Zestaw testów dla ogranicznika liczby zapytań.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.now = 1000.0
+        patcher = mock.patch('services.ratelimit.time.time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_and_refill(self):
+        """
+        Test wykorzystania pojemności wiadra, odrzucenia z czasem do kolejnej próby i napełniania wiadra.
+        """
+        limiter = RateLimiter('test', rate=3, period=60)
+        self.assertEqual([limiter.hit(1).allowed for _ in range(4)], [True, True, True, False])
+        self.assertEqual(limiter.hit(1).retry_after, 20)
+        self.assertTrue(limiter.hit(2).allowed)
+
+        self.now += 20
+        self.assertEqual([limiter.hit(1).allowed for _ in range(2)], [True, False])
+
+        self.now += 600
+        self.assertEqual([limiter.hit(1).allowed for _ in range(4)], [True, True, True, False])
+
+    def test_refund(self):
+        """
+        Test zwrotu pobranego żetonu.
+        """
+        limiter = RateLimiter('test', rate=1, period=60)
+        self.assertTrue(limiter.hit(1).allowed)
+        limiter.refund(1)
+        self.assertTrue(limiter.hit(1).allowed)
+        self.assertFalse(limiter.hit(1).allowed)
+
+
+class PlagiarismTest(TestCase):
+    """
+    Zestaw testów dla wykrywania podobnych rozwiązań.
+    """
+
+    SOURCE = '''
+        import java.util.Scanner;
+        public class Main {
+            public static void main(String[] args) {
+                Scanner scanner = new Scanner(System.in);
+                int n = scanner.nextInt();
+                long sum = 0;
+                for (int i = 0; i < n; i++) {
+                    sum += scanner.nextInt() * 2;
+                }
+                System.out.println("Suma: " + sum);
+            }
+        }
+    '''
+
+    OTHER = '''
+        import java.io.*;
+        public class Main {
+            public static void main(String[] args) throws IOException {
+                BufferedReader reader = new BufferedReader(new InputStreamReader(System.in));
+                String line;
+                while ((line = reader.readLine()) != null) {
+                    if (line.isEmpty()) break;
+                    System.out.println(new StringBuilder(line).reverse());
+                }
+            }
+        }
+    '''
+
+    def setUp(self) -> None:
+        self.judge = create_judge()
+        competition = Competition.objects.create(title='Zawody')
+        self.task = Task.objects.create(title='Zadanie', body='Treść', author=self.judge, competition=competition)
+        self.teams = [create_team(competition, name) for name in ('Alfa', 'Beta', 'Gamma')]
+
+    def index(self, team, content, version=1):
+        """
+        Funkcja pomocnicza tworząca rozwiązanie i indeksująca jego odciski.
+
+        :param team: Obiekt zespołu.
+        :param content: Kod źródłowy.
+        :param version: Wersja rozwiązania.
+        :return: Obiekt rozwiązania.
+        """
+        solution = create_solution(team, self.task, self.judge, version=version)
+        plagiarism.index_solution(solution, content.encode())
+        return solution
+
+    def test_normalization(self):
+        """
+        Test niezależności odcisków od nazw zmiennych, komentarzy i formatowania.
+        """
+        copy = self.SOURCE.replace('scanner', 'sc').replace('sum', 'total').replace('{\n', '{ // kopia\n')
+        self.assertEqual(plagiarism.fingerprint(copy, 'JAVA'), plagiarism.fingerprint(self.SOURCE, 'JAVA'))
+        source, other = plagiarism.fingerprint(self.SOURCE, 'JAVA'), plagiarism.fingerprint(self.OTHER, 'JAVA')
+        self.assertLess(len(source & other), len(source) / 4)
+
+    def test_find_candidates(self):
+        """
+        Test wyszukiwania par rozwiązań różnych zespołów uporządkowanych według podobieństwa.
+        """
+        original = self.index(self.teams[0], self.SOURCE)
+        self.index(self.teams[0], self.SOURCE, version=2)
+        copy = self.index(self.teams[1], self.SOURCE.replace('scanner', 'in').replace('* 2', '* 3'))
+        self.index(self.teams[2], self.OTHER)
+
+        pairs = plagiarism.find_candidates(self.task)
+        self.assertEqual(len(pairs), 1)
+        self.assertEqual(pairs[0].second, copy.id)
+        self.assertGreater(pairs[0].similarity, 0.5)
+        self.assertIn(pairs[0].first, {original.id, original.id + 1})
+
+    def test_report_view(self):
+        """
+        Test raportu podobnych rozwiązań dostępnego wyłącznie dla sędziego głównego.
+        """
+        self.index(self.teams[0], self.SOURCE)
+        self.index(self.teams[1], self.SOURCE)
+        self.client.login(username=USERNAME, password=PASSWORD)
+        self.assertEqual(self.client.get(reverse('plagiarism')).status_code, 403)
+
+        self.judge.is_chief = True
+        self.judge.save()
+        response = self.client.get(reverse('plagiarism', args=[self.task.id]))
+        self.assertEqual(response.context['pairs'][0][0], 100)
+        self.assertContains(response, 'Beta (wersja 1)')
+
+
+class ClarificationsTest(TestCase):
+    """
+    Zestaw testów dla wyjaśnień zawodów.
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.judge = create_judge()
+        self.start = timezone.now() - timedelta(hours=1)
+        self.competition = Competition.objects.create(title='Zawody', start_date=self.start)
+        self.task = Task.objects.create(title='Zadanie', body='Treść', author=self.judge, competition=self.competition)
+        self.team = create_team(self.competition, 'Zespół')
+
+    def explain(self, number):
+        """
+        Funkcja pomocnicza tworząca uwagę zespołu i wyjaśnienie opublikowane w danej minucie zawodów.
+
+        :param number: numer uwagi - minuta opublikowania wyjaśnienia.
+        :return: Obiekt wyjaśnienia.
+        """
+        notice = Notice.objects.create(title=f'Pytanie {number}', body='Treść pytania', task=self.task,
+                                       author=self.team)
+        return Explanation.objects.create(body=f'Odpowiedź {number}', judge=self.judge, notice=notice,
+                                          publication_date=self.start + timedelta(minutes=number))
+
+    def test_pagination(self):
+        """
+        Test stronicowania wyjaśnień od najnowszych bez powtórzeń i pominięć.
+        """
+        for number in range(25):
+            self.explain(number)
+
+        first = clarifications.page(self.competition.id)
+        second = clarifications.page(self.competition.id, before=first.next)
+        self.assertIn('Odpowiedź 24', first.html)
+        self.assertIn('Odpowiedź 5', first.html)
+        self.assertNotIn('Odpowiedź 4<', first.html)
+        self.assertEqual(second.html.count('clarification__answer'), 5)
+        self.assertIsNone(second.next)
+
+    def test_cached_page_invalidation(self):
+        """
+        Test strony wyjaśnień z pamięci podręcznej i jej unieważnienia po dodaniu wyjaśnienia.
+        """
+        self.explain(1)
+        clarifications.page(self.competition.id)
+        with self.assertNumQueries(0):
+            clarifications.page(self.competition.id)
+
+        self.explain(2)
+        self.assertIn('Odpowiedź 2', clarifications.page(self.competition.id).html)
+
+    def test_stream(self):
+        """
+        Test powiadomienia o nowym wyjaśnieniu oraz zdarzenia reload przy zbyt wielu nowych wyjaśnieniach.
+        """
+        self.explain(1)
+        head = clarifications.page(self.competition.id).head
+        explanation = self.explain(2)
+
+        events = ''.join(clarifications.stream(self.competition.id, None, head, duration=0, interval=0))
+        self.assertIn(f'id: {clarifications.encode_cursor(explanation.publication_date, explanation.id)}', events)
+        self.assertIn('data: ', events)
+        self.assertIn('Odpowiedź 2', events)
+        self.assertNotIn('Odpowiedź 1', events)
+
+        for number in range(3, 3 + clarifications.PAGE_SIZE):
+            self.explain(number)
+        events = ''.join(clarifications.stream(self.competition.id, None, head, duration=0, interval=0))
+        self.assertIn('event: reload', events)
+
+    def test_views(self):
+        """
+        Test widoku wyjaśnień wybranego zadania i kanału powiadomień.
+        """
+        self.explain(1)
+        self.client.login(username=USERNAME, password=PASSWORD)
+        response = self.client.get(reverse('clarifications', args=[self.competition.id]), {'task': self.task.id})
+        self.assertContains(response, 'Odpowiedź 1')
+
+        url = reverse('clarifications_stream', args=[self.competition.id])
+        self.assertEqual(self.client.get(url, {'after': 'x'}).status_code, 400)
+        response = self.client.get(url, HTTP_LAST_EVENT_ID=response.context['page'].head)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        response.close()
+
+    def test_stream_other_competition(self):
+        """
+        Test strony wyjaśnień i kanału powiadomień zawodów, w których zespół użytkownika nie bierze udziału.
+        """
+        other = Competition.objects.create(title='Inne zawody', start_date=self.start)
+        self.team.user = User.objects.create_user('zespol', password=PASSWORD)
+        self.team.save()
+        self.client.login(username='zespol', password=PASSWORD)
+
+        self.explain(1)
+        other_task = Task.objects.create(title='Inne', body='Treść', author=self.judge, competition=other)
+        notice = Notice.objects.create(title='Cudze pytanie', body='Treść', task=other_task, author=self.team)
+        Explanation.objects.create(body='Cudza odpowiedź', judge=self.judge, notice=notice,
+                                   publication_date=self.start)
+        self.assertEqual(self.client.get(reverse('clarifications', args=[other.id])).status_code, 404)
+        response = self.client.get(reverse('clarifications'))
+        self.assertContains(response, 'Odpowiedź 1')
+        self.assertNotContains(response, 'Cudza odpowiedź')
+        self.assertEqual(response.context['competitions'], [self.competition])
+
+        self.assertEqual(self.client.get(reverse('clarifications_stream', args=[other.id])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('clarifications_stream', args=[other.id + 1])).status_code, 404)
+        response = self.client.get(reverse('clarifications_stream', args=[self.competition.id]))
+        self.assertEqual(response.status_code, 200)
+        response.close()
+
+
+class SearchTest(TestCase):
+    """
+    Zestaw testów dla wyszukiwania pełnotekstowego.
+    """
+
+    def setUp(self) -> None:
+        self.judge = create_judge()
+        competition = Competition.objects.create(title='Zawody')
+        self.task = Task.objects.create(title='Drzewa przedziałowe', body='Zbuduj drzewo <b>przedziałowe</b> '
+                                        'i odpowiadaj na zapytania o sumę.', author=self.judge,
+                                        competition=competition)
+        create_task(self.judge, 'Grafy', 'Znajdź najkrótszą ścieżkę w grafie.')
+        team = create_team(competition, 'Zespół')
+        self.notice = Notice.objects.create(title='Zakres danych', body='Czy liczby mogą być ujemne?', task=self.task,
+                                            author=team)
+        Explanation.objects.create(body='Tak, wartości mieszczą się w zakresie int.', judge=self.judge,
+                                   notice=self.notice)
+
+    def test_incremental_index(self):
+        """
+        Test aktualizacji indeksu po zapisaniu i usunięciu modeli oraz zaznaczania słów we fragmentach treści.
+        """
+        backend = search.get_backend()
+        results = backend.search('drzew')
+        self.assertEqual([(result.kind, result.object_id) for result in results], [('task', self.task.id)])
+        self.assertIn('<mark>drzewo</mark>', results[0].snippet)
+        self.assertIn('&lt;b&gt;', results[0].snippet)
+
+        self.assertEqual([result.kind for result in backend.search('zakres')], ['notice', 'explanation'])
+        self.notice.title = 'Ograniczenia'
+        self.notice.save()
+        self.assertEqual({result.title for result in backend.search('int')}, {'Ograniczenia'})
+
+        self.task.delete()
+        self.assertEqual(backend.search('drzew'), [])
+
+    def test_rebuild(self):
+        """
+        Test odbudowy indeksu komendą rebuild_search_index.
+        """
+        search.get_backend().clear()
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('4', out.getvalue())
+        self.assertEqual(len(search.get_backend().search('grafie')), 1)
+
+    def test_view(self):
+        """
+        Test widoku wyszukiwania dostępnego dla sędziów.
+        """
+        self.client.login(username=USERNAME, password=PASSWORD)
+        response = self.client.get(reverse('search'), {'q': 'ścieżk'})
+        self.assertContains(response, 'Grafy')
+        self.assertContains(response, '<mark>ścieżkę</mark>')
+
+
+class StatementTest(TestCase):
+    """
+    Zestaw testów dla renderowania treści zadań.
+    """
+
+    def setUp(self) -> None:
+        statements.statement_cache.clear()
+        self.judge = create_judge()
+        self.competition = Competition.objects.create(title='Zawody', start_date=timezone.now() + timedelta(days=1))
+        self.task = Task.objects.create(title='Suma', body='Policz **sumę** $\\sum a_i$.', author=self.judge,
+                                        competition=self.competition)
+
+    def test_render(self):
+        """
+        Test renderowania Markdown: escapowanie HTML, pozostawienie wzorów i pomijanie niebezpiecznych odnośników.
+        """
+        html = statements.render_markdown('# Zadanie\n\nDane <script>alert(1)</script> i $a_i < b_i$, '
+                                          '[wiki](https://example.com/a_b_c) i [x](javascript:alert(1)).\n\n'
+                                          '- `x*y*z`\n- *kursywa*\n\n$$\nx^2\n$$')
+        self.assertIn('<h1>Zadanie</h1>', html)
+        self.assertIn('&lt;script&gt;', html)
+        self.assertNotIn('<script>', html)
+        self.assertIn('<span class="math">\\(a_i &lt; b_i\\)</span>', html)
+        self.assertIn('<a href="https://example.com/a_b_c" rel="nofollow noopener">wiki</a>', html)
+        self.assertNotIn('href="javascript', html)
+        self.assertIn('<ul><li><code>x*y*z</code></li><li><em>kursywa</em></li></ul>', html)
+        self.assertIn('<div class="math">\\[x^2\\]</div>', html)
+
+    def test_render_link_label_literals(self):
+        """
+        Test renderowania kodu i wzorów w etykietach odnośników.
+        """
+        self.assertEqual(statements.render_markdown('See [`foo`](http://x.y)'),
+                         '<p>See <a href="http://x.y" rel="nofollow noopener"><code>foo</code></a></p>')
+        html = statements.render_markdown('[$a_i$ i `b`](https://example.com) `c`')
+        self.assertIn('<a href="https://example.com" rel="nofollow noopener"><span class="math">\\(a_i\\)</span> i '
+                      '<code>b</code></a> <code>c</code>', html)
+        self.assertNotIn('\x00', html)
+
+    def test_render_on_edit(self):
+        """
+        Test renderowania treści tylko po jej zmianie w widoku edycji zadania.
+        """
+        self.client.login(username=USERNAME, password=PASSWORD)
+        self.client.post(reverse('task_edit', args=[self.task.id]), {'title': 'Suma', 'body': 'Stara treść'})
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.body_html, '<p>Stara treść</p>')
+        self.assertEqual(self.task.body_hash, statements.body_hash('Stara treść'))
+
+        with mock.patch('services.statements.render_markdown') as render:
+            self.client.post(reverse('task_edit', args=[self.task.id]), {'title': 'Nowy tytuł', 'body': 'Stara treść'})
+            render.assert_not_called()
+
+        self.client.post(reverse('task_create'), {'title': 'Nowe', 'body': '**Nowa** treść'})
+        self.assertEqual(Task.objects.get(title='Nowe').body_html, '<p><strong>Nowa</strong> treść</p>')
+
+    def test_view(self):
+        """
+        Test widoku treści zadania: lazy renderowanie zadań bez HTML, pamięć podręczna, ETag i dostęp przed
+        rozpoczęciem zawodów.
+        """
+        create_user('zawodnik')
+        self.client.login(username='zawodnik', password=PASSWORD)
+        url = reverse('task_statement', args=[self.task.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.login(username=USERNAME, password=PASSWORD)
+        response = self.client.get(url)
+        self.assertContains(response, '<strong>sumę</strong>')
+        self.task.refresh_from_db()
+        self.assertEqual(response['ETag'], f'"{self.task.body_hash}"')
+
+        with mock.patch('services.statements.render_markdown') as render:
+            self.assertContains(self.client.get(url), '<strong>sumę</strong>')
+            render.assert_not_called()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        self.competition.start_date = timezone.now() - timedelta(minutes=1)
+        self.competition.save()
+        self.client.login(username='zawodnik', password=PASSWORD)
+        self.assertContains(self.client.get(url), '<strong>sumę</strong>')
+
+
+class TaskPackageTest(TestCase):
+    """
+    Zestaw testów dla eksportu i importu pakietów zadań.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.directory = directory.name
+
+        self.judge = create_judge()
+        self.task = create_task(self.judge, 'Suma', 'Policz **sumę**.')
+        for number, (data, expected) in enumerate([(b'1 2\n', b'3\n'), (b'2 2\n' * 50000, b'4\n')], 1):
+            test = AutomatedTest(title=f'Test {number}', task=self.task, max_time=timedelta(seconds=number))
+            test.input.save(f'{number}.in', ContentFile(data), save=False)
+            test.expected_output.save(f'{number}.out', ContentFile(expected), save=False)
+            test.save()
+
+    def export(self):
+        """
+        Funkcja pomocnicza eksportująca zadanie widokiem eksportu pakietu.
+
+        :return: ścieżka zapisanego archiwum.
+        """
+        self.client.login(username=USERNAME, password=PASSWORD)
+        response = self.client.get(reverse('task_package', args=[self.task.id]))
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        path = os.path.join(self.directory, 'package.zip')
+        with open(path, 'wb') as package:
+            package.writelines(response.streaming_content)
+        return path
+
+    def test_round_trip(self):
+        """
+        Test eksportu i importu pakietu: testy, limity czasu i skróty plików są przenoszone, a pliki identyczne
+        z już zapisanymi nie są zapisywane ponownie.
+        """
+        path = self.export()
+
+        task = packages.import_package(path, self.judge, title='Suma (kopia)', batch_size=1)
+        self.assertEqual(task.body, 'Policz **sumę**.')
+        self.assertEqual(task.body_html, '<p>Policz <strong>sumę</strong>.</p>')
+        tests = list(task.automatedtest_set.order_by('id'))
+        self.assertEqual([(test.title, test.max_time.total_seconds()) for test in tests],
+                         [('Test 1', 1.0), ('Test 2', 2.0)])
+        self.assertEqual(tests[1].input_hash, hashlib.sha256(b'2 2\n' * 50000).hexdigest())
+        self.assertEqual(list(StoredBlob.objects.values_list('references', flat=True)), [2, 2, 2, 2])
+        with tests[1].input.open('rb') as data:
+            self.assertEqual(data.read(), b'2 2\n' * 50000)
+
+        packages.import_package(path, self.judge, title='Suma (druga kopia)')
+        self.assertEqual(list(StoredBlob.objects.values_list('references', flat=True)), [3, 3, 3, 3])
+
+    def test_invalid_package(self):
+        """
+        Test odrzucenia pakietu o istniejącym tytule zadania lub pliku niezgodnym z manifestem bez tworzenia
+        zadania i odwołań do plików.
+        """
+        path = self.export()
+        with self.assertRaisesMessage(packages.PackageError, 'już istnieje'):
+            packages.import_package(path, self.judge)
+
+        corrupted = path + '.corrupted'
+        with zipfile.ZipFile(path) as source, zipfile.ZipFile(corrupted, 'w') as target:
+            for info in source.infolist():
+                data = source.read(info)
+                target.writestr(info.filename, b'5\n' if info.filename == 'tests/2.out' else data)
+        with self.assertRaisesMessage(packages.PackageError, 'tests/2.out'):
+            packages.import_package(corrupted, self.judge, title='Suma (kopia)')
+        self.assertFalse(Task.objects.filter(title='Suma (kopia)').exists())
+        self.assertEqual(list(StoredBlob.objects.values_list('references', flat=True)), [1, 1, 1, 1])
+
+    def test_command(self):
+        """
+        Test komend export_task_package i import_task_package.
+        """
+        path = os.path.join(self.directory, 'command.zip')
+        call_command('export_task_package', self.task.id, output=path)
+        out = StringIO()
+        call_command('import_task_package', path, USERNAME, title='Suma (kopia)', stdout=out)
+        self.assertIn('testy: 2', out.getvalue())
+
+
+class ContentAddressedStorageTest(TestCase):
+    """
+    Zestaw testów dla magazynu plików według skrótu treści.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.directory = directory.name
+
+        self.task = create_task(create_judge(), 'Zadanie', 'Treść')
+
+    def create_test(self, expected):
+        """
+        Funkcja pomocnicza tworząca test automatyczny z plikiem oczekiwanego wyjścia.
+
+        :param expected: zawartość pliku.
+        :return: Obiekt testu.
+        """
+        test = AutomatedTest(task=self.task)
+        test.expected_output.save('test.out', ContentFile(expected))
+        return test
+
+    def test_deduplication(self):
+        """
+        Test zapisywania identycznych plików raz i liczenia odwołań.
+        """
+        first, second = self.create_test(b'42\n'), self.create_test(b'42\n')
+        self.assertEqual(first.expected_output.name, second.expected_output.name)
+        self.assertTrue(first.expected_output.name.startswith('blobs/'))
+        self.assertEqual(StoredBlob.objects.get().references, 2)
+
+        first.delete()
+        self.assertEqual(StoredBlob.objects.get().references, 1)
+        with second.expected_output.open('r') as file:
+            self.assertEqual(file.read(), '42\n')
+
+    def test_compression(self):
+        """
+        Test przezroczystej kompresji dużych plików tekstowych.
+        """
+        content = b'1 2 3 4 5\n' * 10000
+        test = self.create_test(content)
+        blob = StoredBlob.objects.get()
+        self.assertEqual((blob.size, test.expected_output.size), (len(content), len(content)))
+        self.assertLess(blob.stored_size, len(content) / 10)
+        self.assertEqual(os.listdir(os.path.join(self.directory, 'blobs', 'tmp')), [])
+        with test.expected_output.open('rb') as file:
+            self.assertEqual(file.read(), content)
+        with self.assertRaises(NotImplementedError):
+            test.expected_output.path
+
+    def test_gc(self):
+        """
+        Test usuwania nieużywanych plików komendą gc_blobs: pliki z odwołaniami i zmienione w okresie ochronnym
+        nie są usuwane, a liczby odwołań są wyliczane od nowa.
+        """
+        kept, removed = self.create_test(b'kept'), self.create_test(b'removed')
+        removed_name = removed.expected_output.name
+        removed.delete()
+        AutomatedTest.objects.filter(id=kept.id).update(expected_output='')
+
+        call_command('gc_blobs', stdout=StringIO())
+        self.assertTrue(content_storage.exists(removed_name))
+
+        out = StringIO()
+        call_command('gc_blobs', grace=0, recount=True, stdout=out)
+        self.assertIn('Poprawione liczby odwołań: 1', out.getvalue())
+        self.assertIn('Usunięte pliki: 2', out.getvalue())
+        self.assertFalse(content_storage.exists(removed_name))
+        self.assertFalse(StoredBlob.objects.exists())
+
+        test = self.create_test(b'orphan')
+        StoredBlob.objects.all().delete()
+        self.assertEqual(blobs.collect_orphans(timedelta(0)), (1, 6))
+        self.assertFalse(content_storage.exists(test.expected_output.name))
+
+    def test_save_after_collect(self):
+        """
+        Test zapisu pliku, którego wpis został usunięty przez komendę gc_blobs przed usunięciem pliku z dysku:
+        plik jest zapisywany ponownie z pliku tymczasowego, a nie odczytywany jako istniejący.
+        """
+        content = b'1 2 3 4 5\n' * 10000
+        name = self.create_test(content).expected_output.name
+        StoredBlob.objects.all().delete()
+
+        with mock.patch.object(ContentAddressedStorage, '_store', wraps=content_storage._store) as store:
+            self.create_test(content)
+        store.assert_called_once()
+        blob = StoredBlob.objects.get()
+        self.assertEqual(blob.references, 1)
+        self.assertLess(blob.stored_size, len(content) / 10)
+
+        content_storage.purge(name)
+        self.create_test(content)
+        self.assertEqual(StoredBlob.objects.get().references, 2)
+        with content_storage.open(name) as file:
+            self.assertEqual(file.read(), content)
+
+
+class TestOutputTest(TestCase):
+    """
+    Zestaw testów dla przechowywania wyjść programów w wierszach wyników testów.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=directory.name, TEST_OUTPUT_INLINE_MAX_SIZE=64)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        outputs.expected_output_cache.clear()
+
+        self.judge = create_judge()
+        competition = Competition.objects.create(title='Zawody')
+        self.task = create_task(self.judge, 'Zadanie', 'Treść')
+        self.solution = create_solution(create_team(competition, 'Zespół'), self.task, self.judge)
+        self.test = AutomatedTest(title='Test 1', task=self.task)
+        self.test.expected_output.save('1.out', ContentFile(b'42\n'))
+
+    def create_result(self, content):
+        """
+        Funkcja pomocnicza tworząca wynik testu z wyjściem programu.
+
+        :param content: wyjście programu.
+        :return: Obiekt wyniku testu.
+        """
+        result = AutomatedTestResult(test=self.test, solution=self.solution, runtime=timedelta(milliseconds=5))
+        result.set_output(content)
+        result.save()
+        return AutomatedTestResult.objects.get(id=result.id)
+
+    def test_inline_and_file(self):
+        """
+        Test przechowywania małych wyjść w wierszu (z kompresją, jeżeli jest opłacalna) i dużych w pliku.
+        """
+        small, repeated, large = self.create_result(b'42\n'), self.create_result(b'7 ' * 30), \
+            self.create_result(b'1\n' * 100)
+        self.assertEqual((small.output.name, bytes(small.output_inline)), ('', b'\x0042\n'))
+        self.assertEqual(bytes(repeated.output_inline)[:1], b'\x01')
+        self.assertIsNone(large.output_inline)
+        self.assertTrue(large.output.name.startswith('blobs/'))
+        self.assertEqual([result.read_output() for result in (small, repeated, large)],
+                         [b'42\n', b'7 ' * 30, b'1\n' * 100])
+
+    def test_view_without_file_io(self):
+        """
+        Test wyświetlania wyników testów bez odczytu plików dla małych wyjść.
+        """
+        self.create_result(b'41\n')
+        self.client.login(username=USERNAME, password=PASSWORD)
+        url = reverse('solution_results', args=[self.solution.id])
+        self.assertContains(self.client.get(url), '41')
+
+        with mock.patch.object(content_storage, '_open') as storage_open:
+            response = self.client.get(url)
+            storage_open.assert_not_called()
+        self.assertEqual(response.context['results'], [('Test 1', '42\n', '41\n')])
+
+    def test_expected_output_head(self):
+        """
+        Test wyświetlania początku dużego oczekiwanego wyjścia bez odczytu całego pliku.
+        """
+        test = AutomatedTest(title='Test 2', task=self.task)
+        test.expected_output.save('2.out', ContentFile(b'1\n' * outputs.EXPECTED_OUTPUT_HEAD_SIZE))
+
+        content = outputs.expected_output(test)
+        self.assertTrue(content.startswith(b'1\n' * (outputs.EXPECTED_OUTPUT_HEAD_SIZE // 2)))
+        self.assertTrue(content.endswith(f'[... pominięto {outputs.EXPECTED_OUTPUT_HEAD_SIZE} B ...]\n'.encode()))
+        with mock.patch.object(content_storage, '_open') as storage_open:
+            self.assertEqual(outputs.expected_output(test), content)
+            storage_open.assert_not_called()
+
+    def test_backfill(self):
+        """
+        Test przenoszenia małych wyjść z plików do wierszy komendą inline_test_outputs.
+        """
+        result = AutomatedTestResult(test=self.test, solution=self.solution, runtime=timedelta(milliseconds=5))
+        result.output.save('output.txt', ContentFile(b'43\n'))
+        large = self.create_result(b'1\n' * 100)
+        blob = StoredBlob.objects.get(digest=os.path.basename(result.output.name))
+
+        out = StringIO()
+        call_command('inline_test_outputs', stdout=out)
+        self.assertIn('Przeniesione wyjścia: 1', out.getvalue())
+        result.refresh_from_db()
+        self.assertEqual((result.output.name, result.read_output()), ('', b'43\n'))
+        blob.refresh_from_db()
+        self.assertEqual(blob.references, 0)
+        large.refresh_from_db()
+        self.assertIsNone(large.output_inline)
+
+
+class JudgeTest(TestCase):
+    """
+    Zestaw testów dla oceny rozwiązań testami automatycznymi.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=directory.name, JUDGE_OUTPUT_LIMIT=1024 * 1024)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.judge = create_judge()
+        self.task = create_task(self.judge, 'Suma', 'Treść')
+        self.team = create_team(Competition.objects.create(title='Zawody'), 'Zespół')
+        test = AutomatedTest(title='Test 1', task=self.task, max_time=timedelta(seconds=2))
+        test.input.save('1.in', ContentFile(b'2 3\n'), save=False)
+        test.expected_output.save('1.out', ContentFile(b'5\n'))
+
+    def judge_source(self, source):
+        """
+        Funkcja pomocnicza oceniająca rozwiązanie w języku Python.
+
+        :param source: kod źródłowy.
+        :return: wynik testu.
+        """
+        solution = Solution(author=self.team, task=self.task, judge=self.judge,
+                            programming_language=Solution.ProgrammingLanguage.PYTHON)
+        solution.source_code.save('main.py', ContentFile(source))
+        judge.judge_solution(solution)
+        return AutomatedTestResult.objects.get(solution=solution)
+
+    def test_statuses(self):
+        """
+        Test statusów wyników: poprawne wyjście (białe znaki są pomijane), błędne wyjście, błąd wykonania
+        i przekroczenie limitu czasu.
+        """
+        statuses = AutomatedTestResult.TestStatus
+        cases = [
+            (b'a, b = map(int, input().split())\nprint(a + b, end="  \\n\\n")', statuses.PASSED),
+            (b'print(6)', statuses.FAILED),
+            (b'print(5 5)', statuses.RUNTIME_ERROR),
+            (b'import time\ntime.sleep(10)', statuses.TIME_EXCEEDED_ERROR),
+        ]
+        for source, status in cases:
+            with self.subTest(source=source):
+                self.assertEqual(self.judge_source(source).status, status)
+
+    def test_output_limit(self):
+        """
+        Test przerwania programu wypisującego dane w nieskończonej pętli: status OUTPUT_LIMIT_EXCEEDED
+        i zachowanie tylko początku i końca wyjścia.
+        """
+        result = self.judge_source(b'while True:\n    print("x" * 99)')
+        self.assertEqual(result.status, AutomatedTestResult.TestStatus.OUTPUT_LIMIT_EXCEEDED)
+        self.assertLess(result.runtime, timedelta(seconds=2))
+        output = result.read_output()
+        self.assertTrue(output.startswith(b'x' * 99 + b'\n'))
+        self.assertIn('pominięto'.encode(), output)
+        self.assertIn('przekroczono limit wyjścia 1048576 B'.encode(), output)
+        self.assertLess(len(output), judge.HEAD_SIZE + judge.TAIL_SIZE + 200)
+
+    def test_capture(self):
+        """
+        Test bufora wyjścia programu: zachowanie początku i końca wyjścia oraz limitu.
+        """
+        capture = judge.OutputCapture(10000, spool=False)
+        for index in range(100):
+            self.assertTrue(capture.write(f'{index:03}'.encode() * 30))
+        excerpt = capture.excerpt()
+        self.assertEqual(excerpt[:judge.HEAD_SIZE], b''.join(f'{index:03}'.encode() * 30 for index in range(100))[
+                                                    :judge.HEAD_SIZE])
+        self.assertTrue(excerpt.endswith(b'099' * 30))
+        self.assertIn('pominięto 5928 B'.encode(), excerpt)
+        self.assertFalse(capture.write(b'y' * 2000))
+        self.assertEqual(capture.size, 10000)
+
+
+class CheckerTest(TestCase):
+    """
+    Zestaw testów dla programów sprawdzających i interaktorów zadań.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_root = os.path.join(directory.name, 'checkers')
+        settings_override = override_settings(MEDIA_ROOT=directory.name, CHECKER_CACHE_ROOT=self.cache_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.judge = create_judge()
+        self.task = create_task(self.judge, 'Dzielnik', 'Treść')
+        self.team = create_team(Competition.objects.create(title='Zawody'), 'Zespół')
+        test = AutomatedTest(title='Test 1', task=self.task, max_time=timedelta(seconds=2))
+        test.input.save('1.in', ContentFile(b'12\n'), save=False)
+        test.expected_output.save('1.out', ContentFile(b'2\n'))
+
+    def set_checker(self, checker_type, source):
+        """
+        Funkcja pomocnicza ustawiająca program sprawdzający zadania w języku Python.
+
+        :param checker_type: Task.CheckerType.
+        :param source: kod źródłowy.
+        """
+        self.task.checker_type = checker_type
+        self.task.checker_language = Solution.ProgrammingLanguage.PYTHON
+        self.task.checker.save('checker.py', ContentFile(source))
+
+    def judge_source(self, source):
+        """
+        Funkcja pomocnicza oceniająca rozwiązanie w języku Python.
+
+        :param source: kod źródłowy.
+        :return: wynik testu.
+        """
+        solution = Solution(author=self.team, task=self.task, judge=self.judge,
+                            programming_language=Solution.ProgrammingLanguage.PYTHON)
+        solution.source_code.save('main.py', ContentFile(source))
+        judge.judge_solution(solution)
+        return AutomatedTestResult.objects.get(solution=solution)
+
+    def test_checker(self):
+        """
+        Test programu sprawdzającego akceptującego każdy dzielnik liczby z wejścia: poprawne odpowiedzi różne od
+        oczekiwanego wyjścia, odrzucenie z komunikatem, osobny czas działania i jednokrotna kompilacja.
+        """
+        self.set_checker(Task.CheckerType.CHECKER, (
+            'import sys\n'
+            'n = int(open(sys.argv[1]).read())\n'
+            'answer = int(open(sys.argv[2]).read())\n'
+            'if answer < 2 or n % answer:\n'
+            '    print(f"{answer} nie jest dzielnikiem", file=sys.stderr)\n'
+            '    sys.exit(1)\n').encode())
+        statuses = AutomatedTestResult.TestStatus
+        for answer, status in ((2, statuses.PASSED), (3, statuses.PASSED), (5, statuses.FAILED)):
+            with self.subTest(answer=answer):
+                result = self.judge_source(f'print({answer})'.encode())
+                self.assertEqual(result.status, status)
+                self.assertGreater(result.checker_runtime, timedelta(0))
+        self.assertEqual(result.checker_message, '5 nie jest dzielnikiem')
+        self.assertEqual(len(os.listdir(self.cache_root)), 1)
+
+    def test_expected_output_hidden(self):
+        """
+        Test braku dostępu rozwiązania do oczekiwanego wyjścia w katalogu roboczym dla zadań z programem
+        sprawdzającym i interaktorem.
+        """
+        source = b'print(open("expected.txt").read())'
+        self.set_checker(Task.CheckerType.CHECKER, b'import sys\nsys.exit(0 if open(sys.argv[2]).read() else 1)')
+        self.assertEqual(self.judge_source(source).status, AutomatedTestResult.TestStatus.RUNTIME_ERROR)
+        self.set_checker(Task.CheckerType.INTERACTOR, b'import sys\nsys.exit(0 if input() == "2" else 1)')
+        self.assertEqual(self.judge_source(source).status, AutomatedTestResult.TestStatus.FAILED)
+
+    @skipUnless(os.geteuid() == 0, 'Uruchamianie rozwiązań jako inny użytkownik wymaga uprawnień roota')
+    def test_sandbox_user(self):
+        """
+        Test braku dostępu rozwiązania uruchomionego jako JUDGE_SANDBOX_USER do oczekiwanego wyjścia (pełną ścieżką
+        katalogu testu) i do plików magazynu.
+        """
+        blob = content_storage.path(AutomatedTest.objects.get(task=self.task).expected_output.name)
+        source = f"""import os, tempfile
+root = tempfile.gettempdir()
+paths = [os.path.join(root, name, 'expected.txt') for name in os.listdir(root) if name.startswith('test-')]
+leaked = []
+for path in paths + [{blob!r}]:
+    try:
+        leaked.append(open(path).read())
+    except OSError:
+        pass
+print(leaked or ('2' if paths else 'brak katalogu testu'))
+""".encode()
+        self.set_checker(Task.CheckerType.CHECKER,
+                         b'import sys\nsys.exit(0 if open(sys.argv[2]).read() == "2\\n" else 1)')
+        with override_settings(JUDGE_SANDBOX_USER='nobody'):
+            result = self.judge_source(source)
+        self.assertEqual(result.status, AutomatedTestResult.TestStatus.PASSED, result.read_output())
+
+    def test_checker_error(self):
+        """
+        Test błędu programu sprawdzającego (nieoczekiwany kod wyjścia) i braku programu sprawdzającego.
+        """
+        self.set_checker(Task.CheckerType.CHECKER, b'import sys\nsys.exit(3)')
+        self.assertEqual(self.judge_source(b'print(2)').status, AutomatedTestResult.TestStatus.CHECKER_ERROR)
+        self.task.checker = ''
+        self.task.save()
+        result = self.judge_source(b'print(2)')
+        self.assertEqual(result.status, AutomatedTestResult.TestStatus.CHECKER_ERROR)
+        self.assertEqual(result.checker_message, 'Zadanie nie ma programu sprawdzającego')
+
+    def test_interactor(self):
+        """
+        Test interaktora zgadującego liczbę: poprawne rozwiązanie, błędna odpowiedź i przekroczenie limitu czasu.
+        """
+        self.set_checker(Task.CheckerType.INTERACTOR, (
+            'import sys\n'
+            'secret = int(open(sys.argv[1]).read())\n'
+            'for query in range(10):\n'
+            '    guess = int(input())\n'
+            '    if guess == secret:\n'
+            '        print("OK", flush=True)\n'
+            '        sys.exit(0)\n'
+            '    print("<" if secret < guess else ">", flush=True)\n'
+            'print("Zbyt wiele pytań", file=sys.stderr)\n'
+            'sys.exit(1)\n').encode())
+        statuses = AutomatedTestResult.TestStatus
+        search = (b'low, high = 1, 100\n'
+                  b'while True:\n'
+                  b'    middle = (low + high) // 2\n'
+                  b'    print(middle, flush=True)\n'
+                  b'    answer = input()\n'
+                  b'    if answer == "OK":\n'
+                  b'        break\n'
+                  b'    low, high = (low, middle - 1) if answer == "<" else (middle + 1, high)\n')
+        self.assertEqual(self.judge_source(search).status, statuses.PASSED)
+
+        result = self.judge_source(b'while True:\n    print(1, flush=True)\n    input()')
+        self.assertEqual(result.status, statuses.FAILED)
+        self.assertEqual(result.checker_message, 'Zbyt wiele pytań')
+
+        result = self.judge_source(b'import time\ntime.sleep(10)')
+        self.assertEqual(result.status, statuses.TIME_EXCEEDED_ERROR)
+        self.assertLess(result.checker_runtime, timedelta(seconds=1))
+
+
+class CalibrationTest(TestCase):
+    """
+    Zestaw testów dla wyznaczania limitów czasu testów z rozwiązań wzorcowych.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.judge = create_judge()
+        self.task = create_task(self.judge, 'Suma', 'Treść')
+        self.test = AutomatedTest(title='Test 1', task=self.task, max_time=timedelta(seconds=2))
+        self.test.input.save('1.in', ContentFile(b'2 3\n'), save=False)
+        self.test.expected_output.save('1.out', ContentFile(b'5\n'))
+
+    def add_reference(self, title, source):
+        """
+        Funkcja pomocnicza dodająca rozwiązanie wzorcowe w języku Python.
+
+        :param title: tytuł rozwiązania.
+        :param source: kod źródłowy.
+        """
+        reference = ReferenceSolution(task=self.task, title=title,
+                                      programming_language=Solution.ProgrammingLanguage.PYTHON)
+        reference.source_code.save('main.py', ContentFile(source))
+
+    def test_time_limit(self):
+        """
+        Test wyznaczania limitu z mediany: mnożnik, zapas i zaokrąglenie w górę do 10 ms.
+        """
+        self.assertEqual(calibration.time_limit(timedelta(milliseconds=201)), timedelta(milliseconds=510))
+        self.assertEqual(calibration.time_limit(timedelta(0), 3, timedelta(milliseconds=5)),
+                         timedelta(milliseconds=10))
+
+    def test_calibrate(self):
+        """
+        Test kalibracji: zapis limitu dla języka rozwiązań wzorcowych, pominięcie niepoprawnego rozwiązania
+        wzorcowego i tryb bez zapisu.
+        """
+        self.add_reference('Wzorcowe', b'print(sum(map(int, input().split())))')
+        self.add_reference('Błędne', b'print(0)')
+
+        result = calibration.calibrate(self.task, runs=2, warmup=0, dry_run=True)
+        self.assertFalse(TestTimeLimit.objects.exists())
+        self.assertEqual([(failure.reference.title, failure.status) for failure in result.failures],
+                         [('Błędne', AutomatedTestResult.TestStatus.FAILED)])
+
+        result = calibration.calibrate(self.task, runs=2, warmup=0)
+        measurement, = result.measurements
+        limit = TestTimeLimit.objects.get(test=self.test)
+        self.assertEqual(limit.programming_language, Solution.ProgrammingLanguage.PYTHON)
+        self.assertEqual(limit.max_time, calibration.time_limit(measurement.median))
+        self.assertEqual(limit.runs, 2)
+        self.assertEqual(measurement.previous, timedelta(seconds=2))
+
+        output = StringIO()
+        call_command('calibrate_time_limits', self.task.id, '--runs', '1', '--dry-run', stdout=output,
+                     stderr=StringIO())
+        self.assertIn('Wyznaczone limity: 1 (nie zapisano)', output.getvalue())
+
+    def test_language_limit(self):
+        """
+        Test oceny rozwiązania z limitem czasu dla języka rozwiązania zamiast AutomatedTest.max_time.
+        """
+        TestTimeLimit.objects.create(test=self.test, programming_language=Solution.ProgrammingLanguage.PYTHON,
+                                     max_time=timedelta(milliseconds=200), median=timedelta(milliseconds=50),
+                                     deviation=timedelta(0), runs=1)
+        team = create_team(Competition.objects.create(title='Zawody'), 'Zespół')
+        solution = Solution(author=team, task=self.task, judge=self.judge,
+                            programming_language=Solution.ProgrammingLanguage.PYTHON)
+        solution.source_code.save('main.py', ContentFile(b'import time\ntime.sleep(1)\nprint(5)'))
+        result, = judge.judge_solution(solution)
+        self.assertEqual(result.status, AutomatedTestResult.TestStatus.TIME_EXCEEDED_ERROR)
+
+
+class WorkerTest(TestCase):
+    """
+    Zestaw testów dla pobierania zadań oceny przez procesy oceniające z dzierżawą.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        judge_model = create_judge()
+        task = create_task(judge_model, 'Suma', 'Treść')
+        team = create_team(Competition.objects.create(title='Zawody'), 'Zespół')
+        test = AutomatedTest(title='Test 1', task=task, max_time=timedelta(seconds=2))
+        test.input.save('1.in', ContentFile(b'2 3\n'), save=False)
+        test.expected_output.save('1.out', ContentFile(b'5\n'))
+        self.jobs = []
+        for source in (b'print(5)', b'print(6)'):
+            solution = Solution(author=team, task=task, judge=judge_model,
+                                programming_language=Solution.ProgrammingLanguage.PYTHON)
+            solution.source_code.save('main.py', ContentFile(source))
+            self.jobs.append(JudgingJob.objects.create(solution=solution))
+
+    def test_claim(self):
+        """
+        Test pobierania zadań oceny: kolejność, wyłączność dzierżawy, przejęcie zadania z wygasłą dzierżawą
+        i odrzucenie wyników procesu, który utracił dzierżawę.
+        """
+        first, second = worker.claim('a'), worker.claim('b')
+        self.assertEqual((first.id, first.worker, first.attempts), (self.jobs[0].id, 'a', 1))
+        self.assertEqual(second.id, self.jobs[1].id)
+        self.assertIsNone(worker.claim('c'))
+
+        JudgingJob.objects.filter(id=first.id).update(lease_expires=timezone.now() - timedelta(seconds=1))
+        reclaimed = worker.claim('c')
+        self.assertEqual((reclaimed.id, reclaimed.worker, reclaimed.attempts), (first.id, 'c', 2))
+        with self.assertRaises(worker.LeaseLost):
+            worker.heartbeat(first)
+        with self.assertRaises(worker.LeaseLost):
+            worker.complete(first, [])
+        worker.heartbeat(reclaimed)
+        worker.complete(reclaimed, [])
+        self.assertEqual(JudgingJob.objects.get(id=first.id).status, JudgingJob.JobStatus.DONE)
+
+    def test_compare_and_set(self):
+        """
+        Test pobierania zadania oceny bez blokowania wierszy, gdy inny proces pobrał wybrane zadanie wcześniej.
+        """
+        lease = worker._lease
+
+        def claim_first(*args):
+            JudgingJob.objects.filter(id=self.jobs[0].id, attempts=0).update(status=JudgingJob.JobStatus.RUNNING,
+                                                                             worker='b', attempts=1)
+            return lease(*args)
+
+        with mock.patch('services.worker._lease', side_effect=claim_first):
+            job = worker._claim_compare_and_set('a', timezone.now(), worker.LEASE_DURATION)
+        self.assertEqual(job.id, self.jobs[1].id)
+        self.assertEqual(JudgingJob.objects.get(id=self.jobs[0].id).worker, 'b')
+
+    def test_compare_and_set_renewed_lease(self):
+        """
+        Test pobierania bez blokowania wierszy zadania z wygasłą dzierżawą, którą proces oceniający przedłużył
+        po wybraniu zadania - zadanie nie jest przejmowane.
+        """
+        JudgingJob.objects.filter(id=self.jobs[0].id).update(
+            status=JudgingJob.JobStatus.RUNNING, worker='b', attempts=1,
+            lease_expires=timezone.now() - timedelta(seconds=1))
+        lease = worker._lease
+
+        def renew_first(*args):
+            worker.heartbeat(JudgingJob.objects.get(id=self.jobs[0].id))
+            return lease(*args)
+
+        with mock.patch('services.worker._lease', side_effect=renew_first):
+            job = worker._claim_compare_and_set('a', timezone.now(), worker.LEASE_DURATION)
+        self.assertEqual(job.id, self.jobs[1].id)
+        self.assertEqual(JudgingJob.objects.get(id=self.jobs[0].id).worker, 'b')
+
+    def test_max_attempts(self):
+        """
+        Test oznaczenia zadania oceny z wygasłą dzierżawą jako nieudanego po MAX_ATTEMPTS pobraniach oraz zwrócenia
+        zadania do kolejki po błędzie oceny.
+        """
+        JudgingJob.objects.filter(id=self.jobs[0].id).update(
+            status=JudgingJob.JobStatus.RUNNING, attempts=worker.MAX_ATTEMPTS,
+            lease_expires=timezone.now() - timedelta(seconds=1))
+        job = worker.claim('a')
+        self.assertEqual(job.id, self.jobs[1].id)
+        self.assertEqual(JudgingJob.objects.get(id=self.jobs[0].id).status, JudgingJob.JobStatus.FAILED)
+
+        with mock.patch('services.judge.evaluate_solution', side_effect=RuntimeError), \
+                self.assertLogs('services.worker', 'ERROR'):
+            self.assertFalse(worker.process(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.lease_expires), (JudgingJob.JobStatus.QUEUED, None))
+
+    def test_work(self):
+        """
+        Test pętli procesu oceniającego: ocena wszystkich rozwiązań z kolejki i zapis wyników.
+        """
+        output, errors = StringIO(), StringIO()
+        call_command('judge_worker', '--once', '--name', 'test', stdout=output, stderr=errors)
+        self.assertIn('Ocenione rozwiązania: 2', output.getvalue())
+        self.assertIn('bez izolacji', errors.getvalue())
+        self.assertFalse(JudgingJob.objects.exclude(status=JudgingJob.JobStatus.DONE).exists())
+        statuses = [AutomatedTestResult.objects.get(solution=job.solution).status for job in self.jobs]
+        self.assertEqual(statuses, [AutomatedTestResult.TestStatus.PASSED, AutomatedTestResult.TestStatus.FAILED])
@@ -1,8 +1,13 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.urls import path
+from django.views.decorators.gzip import gzip_page
 from .views import home_view, RankView, SolutionResultsView, SolutionCodeView, SolutionsView, \
     RegistrationView, TaskCreateView, TaskEditView, TasksView, comps_view, SolutionJudgementView, \
-    registration_success_view
+    registration_success_view, institution_search_view, CompetitionExportView, published_scoreboard_view, \
+    RankHistoryView, SubmissionView, PlagiarismReportView, ClarificationsView, clarifications_stream_view, \
+    ApiCompetitionsView, ApiTasksView, ApiScoreboardView, ApiSolutionsView, SearchView, TaskStatementView, \
+    TaskPackageView, judge_scoreboard_view
 
 urlpatterns = [
 
@@ -11,12 +16,39 @@ urlpatterns = [
     path('tasks/', login_required(TasksView.as_view(), login_url='login'), name='tasks'),
     path('tasks/<int:task_id>', login_required(TaskEditView.as_view()), name='task_edit'),
     path('tasks/create/', login_required(TaskCreateView.as_view()), name='task_create'),
+    path('tasks/<int:task_id>/statement', login_required(TaskStatementView.as_view(), login_url='login'),
+         name='task_statement'),
+    path('tasks/<int:task_id>/package', login_required(TaskPackageView.as_view(), login_url='login'),
+         name='task_package'),
+    path('search/', login_required(SearchView.as_view()), name='search'),
     path('rank/', RankView.as_view(), name='rank'),
+    path('rank/<int:competition_id>/', RankView.as_view(), name='rank'),
+    path('rank/<int:competition_id>/history', login_required(RankHistoryView.as_view()), name='rank_history'),
+    path('clarifications/', login_required(ClarificationsView.as_view()), name='clarifications'),
+    path('clarifications/<int:competition_id>/', login_required(ClarificationsView.as_view()), name='clarifications'),
+    path('clarifications/<int:competition_id>/stream', login_required(clarifications_stream_view),
+         name='clarifications_stream'),
+    path('scoreboards/<path:path>', published_scoreboard_view, name='published_scoreboard'),
+    path('scoreboards-judges/<path:path>', login_required(judge_scoreboard_view, login_url='login'),
+         name='judge_scoreboard'),
     path('solutions/', login_required(SolutionsView.as_view()), name='solutions'),
+    path('solutions/<int:competition_id>/', login_required(SolutionsView.as_view()), name='solutions'),
     path('solutions/results/<int:solution_id>', login_required(SolutionResultsView.as_view()), name='solution_results'),
     path('solutions/code/<int:solution_id>', login_required(SolutionCodeView.as_view()), name='solution_code'),
     path('solutions/judgment/<int:solution_id>,<str:decision>', login_required(SolutionJudgementView.as_view()),
          name='solution_judgement'),
+    path('solutions/plagiarism/', login_required(PlagiarismReportView.as_view()), name='plagiarism'),
+    path('solutions/plagiarism/<int:task_id>', login_required(PlagiarismReportView.as_view()), name='plagiarism'),
+    path('solutions/submit', login_required(SubmissionView.as_view()), name='submission'),
     path('registration', RegistrationView.as_view(), name='registration'),
     path('registration/success', registration_success_view, name='registration_success'),
+    path('registration/institutions', institution_search_view, name='institution_search'),
+    path('export/<int:competition_id>/<str:kind>.<str:fmt>', staff_member_required(CompetitionExportView.as_view()),
+         name='competition_export'),
+    path('api/v1/competitions', gzip_page(ApiCompetitionsView.as_view()), name='api_competitions'),
+    path('api/v1/competitions/<int:competition_id>/tasks', gzip_page(ApiTasksView.as_view()), name='api_tasks'),
+    path('api/v1/competitions/<int:competition_id>/scoreboard', gzip_page(ApiScoreboardView.as_view()),
+         name='api_scoreboard'),
+    path('api/v1/competitions/<int:competition_id>/solutions', gzip_page(ApiSolutionsView.as_view()),
+         name='api_solutions'),
 ]
@@ -1,18 +1,59 @@
-import csv
 from datetime import timedelta
-from io import StringIO
 
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.generic import CreateView, UpdateView
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
-from django.views import View
+from django.views import View, static
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.forms import modelformset_factory
-from django.db import transaction
+from django.db import transaction, IntegrityError
 from .forms import TeamForm, EduInstitutionSelectForm, RegistrationComplimentForm, ParticipantForm, TaskEditForm, \
-    CompetitionSelectForm
+    CompetitionSelectForm, search_institution_choices
 from .models import Team, Task, Judge, Competition, Solution, AutomatedTest, AutomatedTestResult, Participant
 from urllib.parse import urlencode
+from services import scoreboard, export, publisher, timeline, api, submission, ratelimit, plagiarism, \
+    clarifications, search, statements, packages, outputs
+
+SESSION_COMPETITION_KEY = 'competition_id'
+"""Klucz sesji przechowujący id zawodów wybranych przez użytkownika."""
+
+
+def select_current_competition(request, competition_id=None):
+    """
+    Wybiera jedne z obecnie odbywających się zawodów dla żądania.
+    Zawody są wybierane na podstawie id przekazanego w URL, a w przypadku jego braku na podstawie id zapisanego
+    w sesji użytkownika. Jeżeli żadne z nich nie wskazuje trwających zawodów, wybierane są pierwsze trwające zawody.
+    Id zawodów przekazane w URL jest zapisywane w sesji.
+
+    :param competition_id: opcjonalne id zawodów przekazane w URL.
+    :return: para (wybrane zawody lub None, lista wszystkich obecnie odbywających się zawodów).
+    """
+    competitions = Competition.get_current_competitions()
+
+    if competition_id is None:
+        competition_id = request.session.get(SESSION_COMPETITION_KEY)
+    elif request.session.get(SESSION_COMPETITION_KEY) != competition_id:
+        request.session[SESSION_COMPETITION_KEY] = competition_id
+
+    for competition in competitions:
+        if competition.id == competition_id:
+            return competition, competitions
+
+    return (competitions[0] if competitions else None), competitions
+
+
+def team_competitions(user):
+    """
+    :param user: zalogowany użytkownik.
+    :return: zbiór id zawodów zespołów użytkownika. Pusty dla sędziów i użytkowników bez zespołu.
+    """
+    return set(Team.objects.filter(user=user).values_list('competition_id', flat=True))
 
 
 def home_view(request):
@@ -72,6 +113,34 @@ class TasksView(View):
         return self.get(request)
 
 
+class SearchView(View):
+    """
+    Klasa widoku wyszukiwania pełnotekstowego w zadaniach, uwagach i wyjaśnieniach (zob. services.search).
+    Dostęp do widoku wymaga zalogowania.
+    """
+    template_name = 'search/search.html'
+
+    def __init__(self, *args, **kwargs):
+        super(SearchView, self).__init__(*args, **kwargs)
+        self.context = {}
+
+    def get(self, request):
+        """
+        Przygotowuje dla template wyniki wyszukiwania frazy z parametru q w query string.
+        Jeżeli zalogowany użytkownik nie jest sędzią, zwraca odpowiedź HTTP o statusie 404.
+
+        :return: odpowiedź HTTP z templatem określonym w template_name i wynikami wyszukiwania.
+        """
+        get_object_or_404(Judge, user=request.user)
+
+        query = request.GET.get('q', '')
+        backend = search.get_backend()
+        self.context['query'] = query
+        self.context['results'] = backend.search(query) if backend is not None else []
+
+        return render(request, self.template_name, self.context)
+
+
 class TaskEditView(UpdateView):
     """
     Klasa widoku dla edycji zadania.
@@ -91,6 +160,17 @@ class TaskEditView(UpdateView):
         """
         return get_object_or_404(Task, id=self.kwargs.get("task_id"), author=self.request.user.id)
 
+    def form_valid(self, form):
+        """
+        Renderuje treść zadania do HTML, jeżeli treść została zmieniona. Zapisuje model.
+
+        :param form: formularz widoku określony w form_class.
+        :return: odpowiedź HTTP przekierowująca na success_url
+        """
+        statements.update_statement(form.instance)
+
+        return super().form_valid(form)
+
 
 class TaskCreateView(CreateView):
     """
@@ -104,7 +184,7 @@ class TaskCreateView(CreateView):
     def form_valid(self, form):
         """
         Tworzy model zadania. Przypisuje aktualnie zalogowanego sędziego jako autora zadania.
-        Zapisuje model.
+        Renderuje treść zadania do HTML. Zapisuje model.
 
         :param form: formularz widoku określony w form_class.
         :return: odpowiedź HTTP przekierowująca na success_url
@@ -113,14 +193,80 @@ class TaskCreateView(CreateView):
 
         obj = form.save(commit=False)
         obj.author = author
+        statements.update_statement(obj)
         obj.save()
 
         return super().form_valid(form)
 
 
+class TaskPackageView(View):
+    """
+    Klasa widoku eksportu zadania z testami automatycznymi do pakietu zadania (zob. services.packages).
+    Dostęp do widoku wymaga zalogowania.
+    """
+
+    def get(self, request, task_id):
+        """
+        Strumieniuje archiwum zip pakietu zadania. Pliki testów są kompresowane i wysyłane fragmentami,
+        więc zużycie pamięci nie zależy od rozmiaru testów.
+        Jeżeli zadanie nie istnieje lub autorem nie jest zalogowany użytkownik, zwraca odpowiedź HTTP o statusie 404.
+
+        :param task_id: id zadania.
+        :return: odpowiedź HTTP z archiwum zip.
+        """
+        task = get_object_or_404(Task, id=task_id, author=request.user.id)
+
+        response = StreamingHttpResponse(packages.export_package(task), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="task-{task.id}.zip"'
+        return response
+
+
+class TaskStatementView(View):
+    """
+    Klasa widoku treści zadania wyrenderowanej do HTML (zob. services.statements).
+    Przed rozpoczęciem zawodów treść jest dostępna tylko dla sędziów.
+    Dostęp do widoku wymaga zalogowania.
+    """
+    template_name = 'tasks/statement.html'
+
+    def __init__(self, *args, **kwargs):
+        super(TaskStatementView, self).__init__(*args, **kwargs)
+        self.context = {}
+
+    def get(self, request, task_id):
+        """
+        Przygotowuje dla template tytuł i wyrenderowaną treść zadania. Treść pobierana jest z pamięci podręcznej
+        według skrótu treści, więc z bazy danych czytany jest tylko tytuł, skrót i data rozpoczęcia zawodów.
+        Odpowiedź ma nagłówek ETag zależny od treści zadania - zapytanie z nagłówkiem If-None-Match zgodnym
+        z aktualnym ETag otrzymuje odpowiedź 304 bez treści.
+        Jeżeli zadanie nie istnieje albo nie jest przypisane do rozpoczętych zawodów, a użytkownik nie jest
+        sędzią, zwraca odpowiedź HTTP o statusie 404.
+
+        :param task_id: id zadania.
+        :return: odpowiedź HTTP z templatem określonym w template_name i treścią zadania.
+        """
+        title, digest, start_date = get_object_or_404(
+            Task.objects.values_list('title', 'body_hash', 'competition__start_date'), id=task_id)
+        if (start_date is None or start_date > timezone.now()) and \
+                not Judge.objects.filter(user_id=request.user.id).exists():
+            return HttpResponse(status=404)
+
+        response = get_conditional_response(request, etag=quote_etag(digest)) if digest else None
+        if response is None:
+            digest, self.context['statement'] = statements.statement_html(task_id, digest)
+            self.context['title'] = title
+            response = render(request, self.template_name, self.context)
+
+        response['ETag'] = quote_etag(digest)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
 class RankView(View):
     """
     Klasa widoku rankingu.
+    Widok jest powłoką dla rankingów opublikowanych jako pliki statyczne (zob. services.publisher) - nie czyta
+    danych rankingu, a jedynie przekazuje adresy opublikowanych plików.
     """
     template_name = 'rank/rank.html'
 
@@ -128,38 +274,180 @@ class RankView(View):
         super(RankView, self).__init__()
         self.context = {}
 
-    def get(self, request):
+    def get(self, request, competition_id=None):
         """
-        Przygotowuje dla template czas zakończenia zawodów i tablice rankingu dla aktualnie trwających zawodów.
-        Jeżeli aktualnie nie odbywają się zawody, przekazuje pustą tablicę danych.
-        Dane rankingów odczytuje z plików csv przypisanych zawodom.
-        Jeżeli użytkownik wyświetlający ranking jest sędzią, przekazuje dane rankingu aktualnego i zamrożonego.
-        W przeciwnym wypadku przekazuje dane jednego z nich, w zależności czy ranking jest zamrożony.
-
+        Przygotowuje dla template czas zakończenia zawodów i adresy opublikowanych rankingów dla wybranych, aktualnie
+        trwających zawodów. Zawody wybierane są funkcją select_current_competition.
+        Jeżeli aktualnie nie odbywają się zawody, nie przekazuje adresów rankingów.
+        Jeżeli użytkownik wyświetlający ranking jest sędzią, przekazuje adresy rankingu aktualnego i zamrożonego.
+        W przeciwnym wypadku przekazuje adres rankingu publicznego (aktualnego lub zamrożonego, w zależności
+        czy ranking jest zamrożony).
+
+        :param competition_id: opcjonalne id zawodów.
         :return: odpowiedź HTTP z templatem określonym w template_name.
         """
-        competition = Competition.get_current_competition()
+        competition, self.context['competitions'] = select_current_competition(request, competition_id)
 
         if competition:
             end_date = competition.start_date + competition.duration - timedelta(hours=1)
             self.context['end_date'] = int(end_date.timestamp() * 1000)
 
             self.context['competition'] = competition
-            rank = csv.reader(StringIO(competition.rank.read().decode('utf-8')), delimiter=',')
-            rank_frozen = csv.reader(StringIO(competition.rank_frozen.read().decode('utf-8')), delimiter=',')
 
-            if request.user.is_authenticated:
-                self.context['rank'] = rank
-                self.context['rank_frozen'] = rank_frozen
+            if Judge.objects.filter(user_id=request.user.id).exists():
+                self.context['rank_url'] = publisher.competition_url(competition.id, 'rank.html')
+                self.context['rank_frozen_url'] = publisher.competition_url(competition.id, 'rank_frozen.html')
             else:
-                if competition.is_frozen:
-                    self.context['rank_frozen'] = rank_frozen
-                else:
-                    self.context['rank'] = rank
+                self.context['public_url'] = publisher.competition_url(competition.id, 'public.html')
+
+        return render(request, self.template_name, self.context)
+
+
+class RankHistoryView(View):
+    """
+    Klasa widoku historii rankingu - zwraca ranking zawodów w wybranej chwili.
+    Dostęp do widoku wymaga zalogowania.
+    """
+
+    def get(self, request, competition_id):
+        """
+        Odtwarza ranking zawodów w chwili przekazanej w query string: parametrem minute (minuta zawodów)
+        lub at (data w formacie ISO 8601). Bez parametrów zwraca ranking w bieżącej chwili.
+        Jeżeli zawody nie istnieją lub parametr jest niepoprawny, zwraca odpowiedź HTTP o statusie 404 lub 400.
+
+        :param competition_id: id zawodów.
+        :return: odpowiedź JSON z minutą zawodów i wierszami rankingu.
+        """
+        competition = get_object_or_404(Competition, id=competition_id)
+
+        try:
+            if 'minute' in request.GET:
+                moment = competition.start_date + timedelta(minutes=int(request.GET['minute']), seconds=59)
+            elif 'at' in request.GET:
+                moment = parse_datetime(request.GET['at'])
+                if moment is None:
+                    raise ValueError(request.GET['at'])
+            else:
+                moment = timezone.now()
+        except ValueError:
+            return HttpResponse(status=400)
+
+        rows = timeline.standings_at(competition, moment)
+        return JsonResponse({'minute': timeline.minute_of(competition, moment), 'rows': [list(row) for row in rows]})
+
+
+class ClarificationsView(View):
+    """
+    Klasa widoku wyjaśnień zawodów (odpowiedzi sędziów na uwagi zespołów).
+    Dostęp do widoku wymaga zalogowania.
+    """
+    template_name = 'clarifications/clarifications.html'
+
+    def __init__(self, *args, **kwargs):
+        super(ClarificationsView, self).__init__(*args, **kwargs)
+        self.context = {}
+
+    def get(self, request, competition_id=None):
+        """
+        Przygotowuje dla template stronę wyjaśnień wybranych, obecnie trwających zawodów
+        (zob. services.clarifications) oraz zadania zawodów. Zawody wybierane są funkcją
+        select_current_competition. Zadanie można wybrać parametrem task, a kolejną stronę - parametrem before
+        (kursor) w query string.
+        Zespół widzi tylko wyjaśnienia swoich zawodów - dla zawodów innych zespołów zwraca odpowiedź HTTP o statusie
+        404. Jeżeli kursor jest niepoprawny, zwraca odpowiedź HTTP o statusie 400.
+
+        :param competition_id: opcjonalne id zawodów.
+        """
+        competition, competitions = select_current_competition(request, competition_id)
+        allowed = team_competitions(request.user)
+        if allowed:
+            competitions = [current for current in competitions if current.id in allowed]
+            if competition is not None and competition.id not in allowed:
+                if competition_id is not None:
+                    return HttpResponse(status=404)
+                competition = competitions[0] if competitions else None
+        self.context['competitions'] = competitions
+        if competition is None:
+            return render(request, self.template_name, self.context)
+
+        task_id = request.GET.get('task')
+        task_id = int(task_id) if task_id and task_id.isdigit() else None
+        try:
+            page = clarifications.page(competition.id, task_id, request.GET.get('before'))
+        except ValueError:
+            return HttpResponse(status=400)
 
+        self.context['competition'] = competition
+        self.context['tasks'] = Task.objects.filter(competition=competition).order_by('title').values_list('id', 'title')
+        self.context['task_id'] = task_id
+        self.context['page'] = page
+        self.context['is_first_page'] = 'before' not in request.GET
         return render(request, self.template_name, self.context)
 
 
+def clarifications_stream_view(request, competition_id):
+    """
+    Metoda widoku kanału powiadomień o nowych wyjaśnieniach (Server-Sent Events).
+    Kursor ostatniego otrzymanego wyjaśnienia pobierany jest z nagłówka Last-Event-ID (ponowne połączenie)
+    lub parametru after, a zadanie - z parametru task w query string.
+    Połączenie jest długotrwałe - serwer powinien używać asynchronicznych workerów (zob. Procfile
+    i gunicorn_gevent.conf.py), a pamięć podręczna wyjaśnień musi być wspólna dla workerów
+    (zob. settings.CLARIFICATIONS_CACHE).
+    Zespół może otrzymywać powiadomienia tylko o wyjaśnieniach swoich zawodów - dla pozostałych zawodów
+    (i zawodów, które nie istnieją) zwraca odpowiedź HTTP o statusie 404.
+
+    :param competition_id: id zawodów.
+    :return: strumieniowana odpowiedź text/event-stream.
+    """
+    if not Competition.objects.filter(id=competition_id).exists():
+        return HttpResponse(status=404)
+    allowed = team_competitions(request.user)
+    if allowed and competition_id not in allowed:
+        return HttpResponse(status=404)
+
+    after = request.META.get('HTTP_LAST_EVENT_ID') or request.GET.get('after') or None
+    task_id = request.GET.get('task')
+    task_id = int(task_id) if task_id and task_id.isdigit() else None
+    try:
+        if after is not None:
+            clarifications.decode_cursor(after)
+    except ValueError:
+        return HttpResponse(status=400)
+
+    response = StreamingHttpResponse(clarifications.stream(competition_id, task_id, after),
+                                     content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def published_scoreboard_view(request, path):
+    """
+    Metoda widoku serwująca opublikowane pliki rankingów z katalogu SCOREBOARD_ROOT bez zapytań do bazy danych.
+    Używana, gdy pliki nie są serwowane bezpośrednio przez serwer proxy.
+
+    :param path: ścieżka pliku względem SCOREBOARD_ROOT.
+    """
+    response = static.serve(request, path, document_root=settings.SCOREBOARD_ROOT)
+    response['Cache-Control'] = 'public, max-age=5'
+    return response
+
+
+def judge_scoreboard_view(request, path):
+    """
+    Metoda widoku serwująca opublikowane pliki rankingu aktualnego i zamrożonego z katalogu SCOREBOARD_JUDGE_ROOT.
+    Ranking aktualny zawiera wyniki ukryte podczas zamrożenia, więc dostęp mają tylko sędziowie - dla pozostałych
+    użytkowników zwraca odpowiedź HTTP o statusie 404.
+
+    :param path: ścieżka pliku względem SCOREBOARD_JUDGE_ROOT.
+    """
+    if not Judge.objects.filter(user_id=request.user.id).exists():
+        return HttpResponse(status=404)
+    response = static.serve(request, path, document_root=settings.SCOREBOARD_JUDGE_ROOT)
+    response['Cache-Control'] = 'private, max-age=5'
+    return response
+
+
 class SolutionsView(View):
     """
     Klasa widoku dla rozwiązań oczekujących na zaakceptowanie.
@@ -171,12 +459,16 @@ class SolutionsView(View):
         super(SolutionsView, self).__init__(*args, **kwargs)
         self.context = {}
 
-    def get(self, request):
+    def get(self, request, competition_id=None):
         """
-        Przygotowuje dla template listę oczekujących rozwiązań przypisanych do sędziego oraz obecnie trwających zawodów.
+        Przygotowuje dla template listę oczekujących rozwiązań przypisanych do sędziego oraz wybranych, obecnie
+        trwających zawodów. Zawody wybierane są funkcją select_current_competition.
+
+        :param competition_id: opcjonalne id zawodów.
         """
-        competition = Competition.get_current_competition()
+        competition, self.context['competitions'] = select_current_competition(request, competition_id)
         if competition:
+            self.context['competition_id'] = competition.id
             self.context['competition_title'] = competition.title
         else:
             return render(request, self.template_name, self.context)
@@ -222,8 +514,9 @@ class SolutionResultsView(View):
 
     def __unpack_results(self, results):
         """
-        Czyta zawartość plików przechowujących oczekiwane wyjście oraz aktualne wyjście progragramu po wykonanym teście.
-        Przepakowuje zawartości plików do kontekstu widoku.
+        Przepakowuje do kontekstu widoku oczekiwane wyjście oraz aktualne wyjście programu po wykonanym teście.
+        Małe wyjścia programu przechowywane są w wierszu wyniku, a oczekiwane wyjścia w pamięci podręcznej
+        (zob. services.outputs), więc zwykle pliki nie są czytane.
 
         :param results: lista wyników testów automatycznych.
         """
@@ -232,16 +525,12 @@ class SolutionResultsView(View):
             title = result.test.title
 
             try:
-                result.test.expected_output.open('r')
-                expected_output = result.test.expected_output.read()
-                result.test.expected_output.close()
+                expected_output = outputs.expected_output(result.test).decode('utf-8', errors='replace')
             except FileNotFoundError:
                 expected_output = 'Brak pliku!'
 
             try:
-                result.output.open('r')
-                output = result.output.read()
-                result.output.close()
+                output = result.read_output().decode('utf-8', errors='replace')
             except FileNotFoundError:
                 output = 'Brak pliku!'
 
@@ -285,6 +574,49 @@ class SolutionCodeView(View):
         return render(request, self.template_name, self.context)
 
 
+class PlagiarismReportView(View):
+    """
+    Klasa widoku raportu podobnych rozwiązań (zob. services.plagiarism).
+    Dostęp do widoku ma wyłącznie sędzia główny.
+    """
+    template_name = 'solutions/plagiarism.html'
+
+    def __init__(self, *args, **kwargs):
+        super(PlagiarismReportView, self).__init__(*args, **kwargs)
+        self.context = {}
+
+    def get(self, request, task_id=None):
+        """
+        Przygotowuje dla template listę zadań zawodów oraz pary podobnych rozwiązań różnych zespołów dla wybranego
+        zadania (domyślnie pierwszego zadania najpóźniejszych zawodów), uporządkowane malejąco według podobieństwa.
+        Minimalne podobieństwo w procentach można podać parametrem threshold w query string (domyślnie 50).
+        Jeżeli użytkownik nie jest sędzią głównym, zwraca odpowiedź HTTP o statusie 403.
+
+        :param task_id: opcjonalne id zadania.
+        """
+        if not Judge.objects.filter(user_id=request.user.id, is_chief=True).exists():
+            return HttpResponse(status=403)
+
+        tasks = list(Task.objects.filter(competition__isnull=False).select_related('competition')
+                     .order_by('-competition__start_date', 'title'))
+        task = next((task for task in tasks if task.id == task_id), None) if task_id else next(iter(tasks), None)
+        self.context['tasks'] = tasks
+        self.context['task'] = task
+        if task is None:
+            return render(request, self.template_name, self.context)
+
+        threshold = request.GET.get('threshold', '50')
+        self.context['threshold'] = int(threshold) if threshold.isdigit() else 50
+        pairs = plagiarism.find_candidates(task, threshold=self.context['threshold'] / 100)
+
+        solutions = Solution.objects.select_related('author').only('id', 'version', 'author__name') \
+            .in_bulk([solution_id for pair in pairs for solution_id in (pair.first, pair.second)])
+        self.context['pairs'] = [(round(pair.similarity * 100), solutions[pair.first], solutions[pair.second])
+                                 for pair in pairs]
+
+        return render(request, self.template_name, self.context)
+
+
 class SolutionJudgementView(View):
     """
     Klasa widoku dla oceny wybranego rozwiązania.
@@ -294,30 +626,159 @@ class SolutionJudgementView(View):
     def get(self, request, solution_id, decision):
         """
         Na podstawie parametru decision akceptuje, odrzuca lub dyskwalifikuje rozwiązanie o podanym id.
-        Jeżeli rozwiązanie nie istnieje lub wartość decision nie jest jedną z dozwolonych wartości,
-        zwraca odpowiedź HTTP o statusie 404.
+        Akceptacja rozwiązania dolicza jego ocenę do oceny zespołu oraz aktualizuje i publikuje ranking zawodów.
+        Akceptować i odrzucać można tylko rozwiązania oczekujące - zmiana statusu jest warunkowa (UPDATE z filtrem
+        statusu w transakcji), więc ponowna lub równoczesna akceptacja nie dolicza oceny drugi raz.
+        Jeżeli rozwiązanie nie istnieje, nie jest przypisane do zalogowanego sędziego lub wartość decision nie jest
+        jedną z dozwolonych wartości, zwraca odpowiedź HTTP o statusie 404.
 
         :param solution_id: id rozwiązania.
         :param decision: "accept" lub "reject" lub "disqualify".
         """
         try:
-            solution = Solution.objects.select_related('author').get(id=solution_id)
+            solution = Solution.objects.select_related('author__competition') \
+                .get(id=solution_id, judge_id=request.user.id)
         except Solution.DoesNotExist:
             return HttpResponse(status=404)
 
+        pending = Solution.objects.filter(id=solution.id, status=Solution.SolutionStatus.PENDING)
         if decision == 'accept':
-            solution.status = Solution.SolutionStatus.ACCEPTED
-            solution.author.score += solution.score
+            with transaction.atomic():
+                accepted = pending.update(status=Solution.SolutionStatus.ACCEPTED)
+                if accepted:
+                    author = Team.objects.select_for_update().get(id=solution.author_id)
+                    author.score += solution.score
+                    author.save(update_fields=['score'])
+            if accepted:
+                solution.status = Solution.SolutionStatus.ACCEPTED
+                scoreboard.update_rank(solution.author.competition)
+                timeline.record_verdict(solution)
         elif decision == 'reject':
-            solution.status = Solution.SolutionStatus.REJECTED
+            pending.update(status=Solution.SolutionStatus.REJECTED)
         elif decision == 'disqualify':
             # disqualification procedure - not implemented
             pass
         else:
             return HttpResponse(status=404)
 
-        solution.save()
-        return redirect('solutions')
+        return redirect('solutions', competition_id=solution.author.competition_id)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class SubmissionView(View):
+    """
+    Klasa widoku zgłaszania rozwiązań przez zespół.
+    Dostęp do widoku wymaga zalogowania na konto zespołu zakwalifikowanego na trwające zawody.
+    Ochrona CSRF sprawdzana jest w metodzie post - dopiero po ustawieniu handlera przesyłania pliku
+    (sprawdzenie tokenu przez middleware odczytałoby plik domyślnymi handlerami).
+    """
+    template_name = 'solutions/submit.html'
+
+    def __init__(self, *args, **kwargs):
+        super(SubmissionView, self).__init__(*args, **kwargs)
+        self.context = {}
+
+    def get(self, request):
+        """
+        Przygotowuje dla template zadania trwających zawodów zespołu i dostępne języki programowania.
+        Jeżeli użytkownik nie jest zespołem trwających zawodów, zwraca odpowiedź HTTP o statusie 403.
+        Po zgłoszeniu rozwiązania przekazuje dla template jego wersję z query string.
+        """
+        team = self.__get_team(request)
+        if team is None:
+            return HttpResponse(status=403)
+
+        self.context['submitted_version'] = request.GET.get('version')
+        return self.__render(request, team)
+
+    def post(self, request):
+        """
+        Ustawia handler przesyłania pliku SourceUploadHandler i przekazuje zapytanie do metody submit
+        chronionej przed CSRF.
+        """
+        request.upload_handlers = [submission.SourceUploadHandler(request)]
+        return self.submit(request)
+
+    @method_decorator(csrf_protect)
+    def submit(self, request):
+        """
+        Zapisuje rozwiązanie zespołu (zob. services.submission.submit) i zwraca przekierowanie HTTP na formularz
+        z numerem wersji.
+        Jeżeli plik jest zbyt duży, zwraca formularz z odpowiedzią HTTP o statusie 413.
+        Jeżeli zadanie nie należy do zawodów zespołu, język jest nieznany lub brak pliku, zwraca formularz
+        z odpowiedzią HTTP o statusie 400.
+        Liczba zgłoszeń jest ograniczona dla zespołu oraz dla zespołu i zadania (zob. services.ratelimit,
+        settings.RATE_LIMITS). Po przekroczeniu limitu zwraca formularz z odpowiedzią HTTP o statusie 429
+        i nagłówkiem Retry-After. Odrzucone zgłoszenia (413, 400) nie zużywają limitu zespołu.
+        """
+        team = self.__get_team(request)
+        if team is None:
+            return HttpResponse(status=403)
+
+        team_limiter = ratelimit.get_limiter('submission_team')
+        limit = team_limiter.hit(team.id)
+        if not limit.allowed:
+            return self.__too_many_requests(request, team, limit.retry_after)
+
+        handler = request.upload_handlers[0]
+        source = request.FILES.get('source')
+        if handler.too_large:
+            team_limiter.refund(team.id)
+            self.context['error'] = f'Plik przekracza dopuszczalny rozmiar {handler.max_size // 1024} KB'
+            return self.__render(request, team, status=413)
+
+        task_id = request.POST.get('task', '')
+        task = Task.objects.filter(id=task_id, competition_id=team.competition_id).only('id', 'author_id').first() \
+            if task_id.isdigit() else None
+        language = request.POST.get('language')
+        if source is None or task is None or language not in submission.EXTENSIONS:
+            team_limiter.refund(team.id)
+            self.context['error'] = 'Wybierz zadanie, język programowania i plik z kodem źródłowym'
+            return self.__render(request, team, status=400)
+
+        limit = ratelimit.get_limiter('submission_task').hit(team.id, task.id)
+        if not limit.allowed:
+            team_limiter.refund(team.id)
+            return self.__too_many_requests(request, team, limit.retry_after)
+
+        solution = submission.submit(team, task, language, source)
+        return redirect(f"{reverse('submission')}?{urlencode({'version': solution.version})}")
+
+    def __get_team(self, request):
+        """
+        Zwraca zespół zalogowanego użytkownika zakwalifikowany na trwające zawody.
+
+        :return: model zespołu lub None.
+        """
+        competitions = [competition.id for competition in Competition.get_current_competitions()]
+        return Team.objects.filter(user_id=request.user.id, competition_id__in=competitions, is_qualified=True,
+                                   is_disqualified=False, is_waitlisted=False).first()
+
+    def __too_many_requests(self, request, team, retry_after):
+        """
+        Zwraca formularz zgłoszenia z odpowiedzią HTTP o statusie 429.
+
+        :param team: model zespołu.
+        :param retry_after: czas w sekundach do kolejnej próby.
+        """
+        self.context['error'] = f'Zbyt wiele zgłoszeń - spróbuj ponownie za {retry_after} s'
+        response = self.__render(request, team, status=429)
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    def __render(self, request, team, status=200):
+        """
+        Zwraca formularz zgłoszenia z zadaniami zawodów zespołu.
+
+        :param team: model zespołu.
+        :param status: status odpowiedzi HTTP.
+        """
+        self.context['team'] = team
+        self.context['tasks'] = Task.objects.filter(competition_id=team.competition_id).order_by('title') \
+            .values_list('id', 'title')
+        self.context['languages'] = Solution.ProgrammingLanguage.choices
+        self.context['max_size'] = settings.SOLUTION_MAX_SIZE
+        return render(request, self.template_name, self.context, status=status)
 
 
 class RegistrationView(View):
@@ -364,8 +825,12 @@ class RegistrationView(View):
         compliment_form = RegistrationComplimentForm(request.POST)
 
         if self.__is_valid(formset, team_form, institution_form, competition_form, compliment_form):
-            self.__save_models(formset.save(commit=False), team_form.save(commit=False), compliment_form)
-            return redirect(f"{reverse('registration_success')}?{urlencode(self.redirect_context)}")
+            try:
+                self.__save_models(formset.save(commit=False), team_form.save(commit=False), compliment_form)
+                return redirect(f"{reverse('registration_success')}?{urlencode(self.redirect_context)}")
+            except IntegrityError:
+                # zespół o tej samej nazwie został zapisany równolegle po walidacji formularza
+                team_form.add_error('name', TeamForm.Meta.error_messages['name']['unique'])
 
         self.__load_forms(formset, team_form, institution_form, competition_form, compliment_form)
         return render(request, self.template_name, self.context)
@@ -422,7 +887,9 @@ class RegistrationView(View):
         """
         Tworzy modele uczestników i drużyny. Przypisuje drużynie wybrane zawody, placówkę edukacyjną oraz zawodników.
         Jeżeli wybrano szkołę średnią, przypisuje drużynie priorytet oraz opiekuna.
-        Zapisuje modele.
+        Zapisuje modele w jednej transakcji: zespół, uczestników (jednym zapytaniem bulk_create), a na końcu
+        rezerwuje miejsce na zawodach. Rezerwacja jest ostatnia, aby blokada wiersza zawodów trwała jak najkrócej.
+        Jeżeli brak wolnych miejsc, zespół trafia na listę rezerwową.
 
         :param participants: lista modeli zawodników. Pierwszy zawodnik jest kapitanem.
         :param team: model drużyny.
@@ -441,21 +908,29 @@ class RegistrationView(View):
             team.save()
             for participant in participants:
                 participant.team = team
-                participant.save()
+            Participant.objects.bulk_create(participants)
+
+            if not self.competition.reserve_slot():
+                team.is_waitlisted = True
+                Team.objects.filter(id=team.id).update(is_waitlisted=True)
 
         self.redirect_context['team_name'] = team.name
+        if team.is_waitlisted:
+            self.redirect_context['waitlisted'] = 1
         self.redirect_context['competition_title'] = self.competition.title
         self.redirect_context['competition_start_date'] = self.competition.start_date
         self.redirect_context['captain_email'] = participants[0].email
 
-    def __load_forms(self, participants,
-                     team=TeamForm(),
-                     institution=EduInstitutionSelectForm(),
-                     competition=CompetitionSelectForm(),
-                     compliment=RegistrationComplimentForm()):
+    def __load_forms(self, participants, team=None, institution=None, competition=None, compliment=None):
         """
         Przepakowuje formularze do kontekstu widoku.
+        Brakujące formularze są tworzone jako puste dla bieżącego żądania.
         """
+        team = team or TeamForm()
+        institution = institution or EduInstitutionSelectForm()
+        competition = competition or CompetitionSelectForm()
+        compliment = compliment or RegistrationComplimentForm()
+
         self.context['management_form'] = participants.management_form
         self.context['captain'] = participants[0]
         self.context['participant1'] = participants[1]
@@ -476,3 +951,202 @@ def registration_success_view(request):
         print(type(request.GET[key]), request.GET[key])
         context[key] = request.GET[key]
     return render(request, 'registration/success.html', context)
+
+
+def institution_search_view(request):
+    """
+    Metoda widoku wyszukiwania placówek edukacyjnych dla formularza rejestracji.
+    Fraza pobierana jest z parametru q w query string. Liczba wyników jest ograniczona.
+
+    :return: odpowiedź JSON z listą wyników w postaci {"id": id placówki, "label": "nazwa, rejon"}.
+    """
+    choices = search_institution_choices(request.GET.get('q', ''))
+    return JsonResponse({'results': [{'id': value, 'label': label} for value, label in choices]})
+
+
+class CompetitionExportView(View):
+    """
+    Klasa widoku eksportu danych zawodów (ranking, werdykty rozwiązań, wyniki testów) do pliku csv lub JSON.
+    Dostęp do widoku wymaga uprawnień administratora.
+    """
+
+    def get(self, request, competition_id, kind, fmt):
+        """
+        Strumieniuje eksport danych zawodów. Wiersze pobierane są z bazy danych iteratorem i od razu wysyłane,
+        więc zużycie pamięci nie zależy od rozmiaru eksportu.
+        Jeżeli zawody nie istnieją lub rodzaj albo format eksportu są nieznane, zwraca odpowiedź HTTP o statusie 404.
+
+        :param competition_id: id zawodów.
+        :param kind: rodzaj eksportu: "standings", "solutions" lub "test_results".
+        :param fmt: format: "csv" lub "json".
+        """
+        competition = get_object_or_404(Competition, id=competition_id)
+        if kind not in export.EXPORTS or fmt not in export.FORMATS:
+            return HttpResponse(status=404)
+
+        response = StreamingHttpResponse(export.export(competition, kind, fmt), content_type=export.FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="competition-{competition.id}-{kind}.{fmt}"'
+        return response
+
+
+class ApiView(View):
+    """
+    Bazowa klasa widoków API w wersji 1 (prefiks api/v1/).
+    Odpowiedzi są w formacie JSON: {"results": lista obiektów, "next": kursor następnej strony lub null}.
+    Parametry zapytania: fields (wybrane pola oddzielone przecinkami), after (kursor z poprzedniej strony)
+    i limit (liczba obiektów na stronie, najwyżej api.MAX_LIMIT). Odpowiedzi mają nagłówek ETag - zapytanie
+    z nagłówkiem If-None-Match zgodnym z aktualnym ETag otrzymuje odpowiedź 304 bez treści.
+    Kompresja gzip włączana jest w urls.py.
+    """
+
+    def respond(self, request, build, etag=None):
+        """
+        Buduje odpowiedź API. Jeżeli ETag jest znany przed zbudowaniem odpowiedzi, odpowiedź 304 zwracana jest
+        bez wykonywania funkcji build. W przeciwnym wypadku ETag wyliczany jest z treści odpowiedzi.
+        Jeżeli parametry zapytania są niepoprawne, zwraca odpowiedź HTTP o statusie 400 z opisem błędu.
+
+        :param build: bezargumentowa funkcja zwracająca krotkę (lista obiektów, kursor następnej strony).
+        :param etag: opcjonalny ETag wyliczony bez budowania odpowiedzi.
+        :return: odpowiedź HTTP.
+        """
+        if etag is not None:
+            etag = quote_etag(etag)
+            response = get_conditional_response(request, etag=etag)
+        else:
+            response = None
+
+        if response is None:
+            try:
+                results, cursor = build()
+            except api.ApiError as error:
+                return JsonResponse({'error': str(error)}, status=400)
+
+            content = api.dumps({'results': results, 'next': cursor})
+            etag = etag or quote_etag(api.content_etag(content))
+            response = get_conditional_response(request, etag=etag) or \
+                HttpResponse(content, content_type='application/json')
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def is_judge(self, request):
+        """
+        Sprawdza, czy zalogowany użytkownik jest sędzią.
+
+        :return: True dla sędziego.
+        """
+        return request.user.is_authenticated and Judge.objects.filter(user_id=request.user.id).exists()
+
+
+class ApiCompetitionsView(ApiView):
+    """
+    Klasa widoku API listy zawodów.
+    """
+
+    def get(self, request):
+        """
+        Zwraca stronę listy zawodów.
+
+        :return: odpowiedź JSON.
+        """
+        def build():
+            fields = api.parse_fields(request.GET.get('fields'), api.RESOURCES['competitions'])
+            after, limit = api.parse_cursor(request.GET.get('after'), request.GET.get('limit'))
+            return api.page(api.competitions(), 'competitions', fields, after, limit)
+
+        return self.respond(request, build)
+
+
+class ApiTasksView(ApiView):
+    """
+    Klasa widoku API listy zadań zawodów.
+    Przed rozpoczęciem zawodów zadania są dostępne tylko dla sędziów.
+    """
+
+    def get(self, request, competition_id):
+        """
+        Zwraca stronę listy zadań zawodów.
+        Jeżeli zawody nie istnieją lub jeszcze się nie rozpoczęły, a użytkownik nie jest sędzią, zwraca odpowiedź
+        HTTP o statusie 404.
+
+        :param competition_id: id zawodów.
+        :return: odpowiedź JSON.
+        """
+        competition = get_object_or_404(Competition, id=competition_id)
+        if competition.start_date > timezone.now() and not self.is_judge(request):
+            return HttpResponse(status=404)
+
+        def build():
+            fields = api.parse_fields(request.GET.get('fields'), api.RESOURCES['tasks'])
+            after, limit = api.parse_cursor(request.GET.get('after'), request.GET.get('limit'))
+            return api.page(api.tasks(competition), 'tasks', fields, after, limit)
+
+        return self.respond(request, build)
+
+
+class ApiScoreboardView(ApiView):
+    """
+    Klasa widoku API rankingu zawodów.
+    Sędziowie otrzymują ranking aktualny (lub zamrożony z parametrem frozen=1), pozostali użytkownicy - ranking
+    publiczny, tak jak w opublikowanych rankingach (zob. services.publisher).
+    """
+
+    def get(self, request, competition_id):
+        """
+        Zwraca stronę wierszy rankingu zawodów. ETag wyliczany jest z nazwy pliku rankingu, więc niezmieniony
+        ranking nie jest czytany ani serializowany.
+
+        :param competition_id: id zawodów.
+        :return: odpowiedź JSON.
+        """
+        competition = get_object_or_404(Competition, id=competition_id)
+        if self.is_judge(request):
+            frozen = request.GET.get('frozen') == '1'
+        else:
+            frozen = competition.is_frozen
+
+        def build():
+            fields = api.parse_fields(request.GET.get('fields'), api.SCOREBOARD_FIELDS)
+            after, limit = api.parse_cursor(request.GET.get('after'), request.GET.get('limit'))
+            return api.scoreboard_page(competition, frozen, fields, after, limit)
+
+        etag = api.scoreboard_etag(competition, frozen, request.GET.urlencode())
+        return self.respond(request, build, etag)
+
+
+class ApiSolutionsView(ApiView):
+    """
+    Klasa widoku API statusu rozwiązań zawodów.
+    Sędziowie widzą rozwiązania wszystkich zespołów (opcjonalnie jednego zespołu - parametr team),
+    zespoły - wyłącznie własne rozwiązania. Kod źródłowy nie jest udostępniany.
+    """
+
+    def get(self, request, competition_id):
+        """
+        Zwraca stronę listy rozwiązań zawodów.
+        Jeżeli zawody nie istnieją, zwraca odpowiedź HTTP o statusie 404. Jeżeli użytkownik nie jest sędzią
+        ani zespołem zawodów, zwraca odpowiedź HTTP o statusie 403.
+
+        :param competition_id: id zawodów.
+        :return: odpowiedź JSON.
+        """
+        competition = get_object_or_404(Competition, id=competition_id)
+        if self.is_judge(request):
+            team_id = request.GET.get('team')
+        else:
+            team = Team.objects.filter(competition=competition, user_id=request.user.id).only('id').first() \
+                if request.user.is_authenticated else None
+            if team is None:
+                return HttpResponse(status=403)
+            team_id = team.id
+
+        def build():
+            if team_id is not None and not str(team_id).isdigit():
+                raise api.ApiError('Parametr team musi być liczbą całkowitą')
+            fields = api.parse_fields(request.GET.get('fields'), api.RESOURCES['solutions'])
+            after, limit = api.parse_cursor(request.GET.get('after'), request.GET.get('limit'))
+            queryset = api.solutions(competition, int(team_id) if team_id is not None else None)
+            return api.page(queryset, 'solutions', fields, after, limit)
+
+        return self.respond(request, build)
@@ -0,0 +1,17 @@
+# Gunicorn configuration for gevent workers (see Procfile). Gevent workers keep the long-lived clarifications
+# notification streams (Server-Sent Events, services.clarifications.stream) open without tying up a worker each.
+#
+# Gevent only switches greenlets on cooperative I/O. psycopg2 is a C extension whose blocking calls gevent cannot
+# patch, so without psycogreen every ORM query would block the whole worker - including all open streams - until
+# the database answers. post_fork installs psycogreen's wait callback in every worker before it serves requests.
+# Use these workers only with PostgreSQL (psycopg2); for other databases run sync workers without this file.
+
+worker_class = 'gevent'
+worker_connections = 500
+
+
+def post_fork(server, worker):
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
+    worker.log.info('psycopg2 patched for gevent (psycogreen)')
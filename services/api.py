@@ -0,0 +1,197 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from buzkashi_app.models import Competition, Task, Solution
+from services.scoreboard import RankRow, load_rank
+
+API_VERSION = 1
+"""Wersja API. Zmiana niezgodna wstecz wymaga nowej wersji i nowego prefiksu adresów (api/v<wersja>/)."""
+
+DEFAULT_LIMIT = 50
+"""Domyślna liczba obiektów na stronie."""
+
+MAX_LIMIT = 500
+"""Maksymalna liczba obiektów na stronie."""
+
+RESOURCES = {
+    'competitions': {
+        'id': 'id',
+        'title': 'title',
+        'session': 'session',
+        'start_date': 'start_date',
+        'duration': 'duration',
+        'max_teams': 'max_teams',
+        'is_frozen': 'is_frozen',
+    },
+    'tasks': {
+        'id': 'id',
+        'title': 'title',
+        'body': 'body',
+        'competition': 'competition_id',
+    },
+    'solutions': {
+        'id': 'id',
+        'team': 'author__name',
+        'task': 'task_id',
+        'task_title': 'task__title',
+        'language': 'programming_language',
+        'version': 'version',
+        'submission_time': 'submission_time',
+        'status': 'status',
+    },
+}
+"""Pola zasobów API: nazwa pola w API -> wyrażenie ORM. Inne pola modeli (np. kod źródłowy) nie są udostępniane."""
+
+SCOREBOARD_FIELDS = RankRow._fields
+"""Pola wierszy rankingu."""
+
+
+class ApiError(ValueError):
+    """
+    Błąd niepoprawnych parametrów zapytania API.
+    """
+
+
+def parse_fields(value, allowed):
+    """
+    Zwraca pola wybrane parametrem fields (nazwy oddzielone przecinkami). Pusta wartość oznacza wszystkie pola.
+
+    :param value: wartość parametru fields lub None.
+    :param allowed: dozwolone nazwy pól w kolejności domyślnej.
+    :return: krotka nazw pól.
+    :raise ApiError: jeżeli parametr zawiera nieznane pole.
+    """
+    if not value:
+        return tuple(allowed)
+
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown or not fields:
+        raise ApiError(f'Nieznane pola: {", ".join(unknown)}')
+    return fields
+
+
+def parse_cursor(after, limit):
+    """
+    Sprawdza parametry stronicowania.
+
+    :param after: wartość parametru after (kursor poprzedniej strony) lub None.
+    :param limit: wartość parametru limit lub None.
+    :return: krotka (kursor, limit). Kursor 0 oznacza pierwszą stronę.
+    :raise ApiError: jeżeli parametry nie są nieujemnymi liczbami całkowitymi.
+    """
+    try:
+        after = int(after) if after else 0
+        limit = min(int(limit), MAX_LIMIT) if limit else DEFAULT_LIMIT
+    except ValueError:
+        raise ApiError('Parametry after i limit muszą być liczbami całkowitymi')
+    if after < 0 or limit < 1:
+        raise ApiError('Parametry after i limit muszą być dodatnie')
+    return after, limit
+
+
+def page(queryset, resource, fields, after, limit):
+    """
+    Zwraca stronę obiektów zasobu stronicowaną po id (keyset pagination) - kolejne strony są pobierane
+    zapytaniem id > kursor z wykorzystaniem klucza głównego, więc koszt nie rośnie z numerem strony.
+    Pobierane są tylko wybrane pola, bez tworzenia modeli.
+
+    :param queryset: zapytanie zwracające obiekty zasobu.
+    :param resource: nazwa zasobu z RESOURCES.
+    :param fields: wybrane pola (parse_fields).
+    :param after: id ostatniego obiektu poprzedniej strony.
+    :param limit: liczba obiektów na stronie.
+    :return: krotka (lista słowników z wybranymi polami, kursor następnej strony lub None).
+    """
+    columns = RESOURCES[resource]
+    rows = list(queryset.filter(id__gt=after).order_by('id')
+                .values_list('id', *(columns[name] for name in fields))[:limit + 1])
+
+    cursor = rows[limit - 1][0] if len(rows) > limit else None
+    return [dict(zip(fields, row[1:])) for row in rows[:limit]], cursor
+
+
+def competitions():
+    """
+    Zwraca zapytanie o zawody udostępniane w API.
+
+    :return: zapytanie o zawody.
+    """
+    return Competition.objects.all()
+
+
+def tasks(competition):
+    """
+    Zwraca zapytanie o zadania zawodów.
+
+    :param competition: model zawodów.
+    :return: zapytanie o zadania.
+    """
+    return Task.objects.filter(competition=competition)
+
+
+def solutions(competition, team_id=None):
+    """
+    Zwraca zapytanie o rozwiązania zawodów, opcjonalnie ograniczone do jednego zespołu.
+
+    :param competition: model zawodów.
+    :param team_id: opcjonalne id zespołu.
+    :return: zapytanie o rozwiązania.
+    """
+    queryset = Solution.objects.filter(author__competition=competition)
+    return queryset.filter(author_id=team_id) if team_id is not None else queryset
+
+
+def scoreboard_page(competition, frozen, fields, after, limit):
+    """
+    Zwraca stronę wierszy rankingu. Wiersze czytane są funkcją load_rank, więc API korzysta z tej samej
+    pamięci podręcznej co publikacja rankingów. Kursorem jest liczba wierszy na poprzednich stronach -
+    wiersze są już w pamięci, więc wybór strony jest wycinkiem krotki.
+
+    :param competition: model zawodów.
+    :param frozen: True, jeżeli należy zwrócić ranking zamrożony.
+    :param fields: wybrane pola (parse_fields z SCOREBOARD_FIELDS).
+    :param after: liczba wierszy na poprzednich stronach.
+    :param limit: liczba wierszy na stronie.
+    :return: krotka (lista słowników z wybranymi polami, kursor następnej strony lub None).
+    """
+    rows = load_rank(competition, frozen)
+    results = [{name: getattr(row, name) for name in fields} for row in rows[after:after + limit]]
+    return results, after + limit if len(rows) > after + limit else None
+
+
+def scoreboard_etag(competition, frozen, query):
+    """
+    Wylicza ETag strony rankingu bez czytania rankingu - nazwa pliku rankingu zmienia się przy każdym zapisie
+    (zob. services.scoreboard.save_rank), więc razem z parametrami zapytania jednoznacznie określa odpowiedź.
+
+    :param competition: model zawodów.
+    :param frozen: True dla rankingu zamrożonego.
+    :param query: query string zapytania.
+    :return: ETag.
+    """
+    rank_file = competition.rank_frozen if frozen else competition.rank
+    key = f'{API_VERSION}:{rank_file.name if rank_file else ""}:{query}'
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def dumps(payload):
+    """
+    Serializuje odpowiedź API do JSON. Daty zapisywane są w formacie ISO 8601.
+
+    :param payload: dane odpowiedzi.
+    :return: zawartość odpowiedzi.
+    """
+    return json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def content_etag(content):
+    """
+    Wylicza ETag na podstawie zawartości odpowiedzi.
+
+    :param content: zawartość odpowiedzi.
+    :return: ETag.
+    """
+    return hashlib.md5(content).hexdigest()
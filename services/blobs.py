@@ -0,0 +1,122 @@
+import os
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import models, transaction
+from django.utils import timezone
+
+from buzkashi_app.models import StoredBlob
+from buzkashi_app.storage import ContentAddressedStorage, content_storage, is_blob, blob_digest, blob_name, \
+    BLOB_PREFIX, COMPRESSED_SUFFIX
+
+GRACE_PERIOD = timedelta(hours=24)
+"""Minimalny czas od ostatniej zmiany liczby odwołań, po którym nieużywany plik może zostać usunięty. Chroni pliki
+zapisane w jeszcze niezatwierdzonych transakcjach."""
+
+CHUNK_SIZE = 2000
+"""Liczba wierszy pobieranych z bazy danych jednym zapytaniem iteratora."""
+
+
+def file_fields():
+    """
+    :return: lista par (model, nazwa pola) pól plików korzystających z magazynu plików według skrótu treści.
+    """
+    return [(model, field.name) for model in apps.get_models() for field in model._meta.concrete_fields
+            if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage)]
+
+
+def is_referenced(name):
+    """
+    :param name: nazwa pliku.
+    :return: True, jeżeli dowolny model wskazuje plik.
+    """
+    return any(model.objects.filter(**{field: name}).exists() for model, field in file_fields())
+
+
+def recount():
+    """
+    Wylicza od nowa liczby odwołań do plików na podstawie pól plików wszystkich modeli (np. po usunięciu modeli
+    z pominięciem sygnałów lub zmianie pliku modelu). Nazwy plików pobierane są iteratorem.
+
+    :return: liczba poprawionych wpisów StoredBlob.
+    """
+    counts = Counter()
+    for model, field in file_fields():
+        names = model.objects.filter(**{f'{field}__startswith': BLOB_PREFIX}).values_list(field, flat=True)
+        counts.update(blob_digest(name) for name in names.iterator(CHUNK_SIZE))
+
+    changed = []
+    for blob in StoredBlob.objects.only('digest', 'references').iterator(CHUNK_SIZE):
+        if blob.references != counts[blob.digest]:
+            blob.references = counts[blob.digest]
+            changed.append(blob)
+    StoredBlob.objects.bulk_update(changed, ['references'], batch_size=CHUNK_SIZE)
+    return len(changed)
+
+
+def collect(grace=GRACE_PERIOD, dry_run=False):
+    """
+    Usuwa pliki bez odwołań, których liczba odwołań nie zmieniła się od czasu grace. Przed usunięciem sprawdza,
+    czy żaden model nie wskazuje pliku, a wpis StoredBlob usuwany jest warunkowo (bez odwołań i bez zmiany),
+    więc plik ponownie zapisany w międzyczasie nie jest usuwany.
+
+    :param grace: minimalny czas od ostatniej zmiany liczby odwołań.
+    :param dry_run: True, jeżeli pliki mają zostać tylko policzone.
+    :return: krotka (liczba usuniętych plików, zwolnione miejsce w bajtach).
+    """
+    cutoff = timezone.now() - grace
+    candidates = StoredBlob.objects.filter(references__lte=0, modified__lt=cutoff) \
+        .values_list('digest', 'stored_size')
+
+    count, freed = 0, 0
+    for digest, stored_size in candidates.iterator(CHUNK_SIZE):
+        name = blob_name(digest)
+        if is_referenced(name):
+            continue
+        if not dry_run:
+            with transaction.atomic():
+                deleted, _ = StoredBlob.objects.filter(digest=digest, references__lte=0, modified__lt=cutoff).delete()
+                if not deleted:
+                    continue
+                content_storage.purge(name)
+        count, freed = count + 1, freed + stored_size
+    return count, freed
+
+
+def collect_orphans(grace=GRACE_PERIOD, dry_run=False):
+    """
+    Usuwa pliki bez wpisu StoredBlob starsze niż grace - pliki zapisane w wycofanych transakcjach i pozostałości
+    przerwanych zapisów.
+
+    :param grace: minimalny wiek pliku.
+    :param dry_run: True, jeżeli pliki mają zostać tylko policzone.
+    :return: krotka (liczba usuniętych plików, zwolnione miejsce w bajtach).
+    """
+    root = content_storage.path(BLOB_PREFIX)
+    cutoff = (timezone.now() - grace).timestamp()
+    count, freed = 0, 0
+    for directory, _, files in os.walk(root):
+        for file in files:
+            path = os.path.join(directory, file)
+            digest = file[:-len(COMPRESSED_SUFFIX)] if file.endswith(COMPRESSED_SUFFIX) else file
+            stat = os.stat(path)
+            if stat.st_mtime >= cutoff or StoredBlob.objects.filter(digest=digest).exists():
+                continue
+            if not dry_run:
+                os.remove(path)
+            count, freed = count + 1, freed + stat.st_size
+    return count, freed
+
+
+def release_files(instance):
+    """
+    Zmniejsza liczbę odwołań do plików usuniętego modelu.
+
+    :param instance: usunięty model.
+    """
+    for field in instance._meta.concrete_fields:
+        if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage):
+            name = getattr(instance, field.attname).name
+            if is_blob(name):
+                field.storage.delete(name)
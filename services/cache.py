@@ -0,0 +1,91 @@
+from collections import OrderedDict
+from threading import Lock
+
+
+class PartitionedCache:
+    """
+    Pamięć podręczna procesu podzielona na niezależne partycje (np. jedna partycja na zawody).
+    Każda partycja jest osobną pamięcią LRU o ograniczonym rozmiarze, więc duży ruch w jednej partycji
+    nie usuwa wpisów z pozostałych. Liczba partycji również jest ograniczona - usuwana jest najdawniej używana.
+    """
+
+    def __init__(self, max_entries=64, max_partitions=16):
+        """
+        :param max_entries: maksymalna liczba wpisów w jednej partycji.
+        :param max_partitions: maksymalna liczba partycji.
+        """
+        self.max_entries = max_entries
+        self.max_partitions = max_partitions
+        self._partitions = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, partition, key, default=None):
+        """
+        Zwraca wartość zapisaną pod kluczem w danej partycji.
+
+        :param partition: identyfikator partycji.
+        :param key: klucz wpisu.
+        :param default: wartość zwracana, gdy wpis nie istnieje.
+        :return: zapisana wartość lub default.
+        """
+        with self._lock:
+            entries = self._partitions.get(partition)
+            if entries is None or key not in entries:
+                return default
+            self._partitions.move_to_end(partition)
+            entries.move_to_end(key)
+            return entries[key]
+
+    def set(self, partition, key, value):
+        """
+        Zapisuje wartość pod kluczem w danej partycji.
+        Przy przepełnieniu usuwa najdawniej używany wpis tej samej partycji.
+
+        :param partition: identyfikator partycji.
+        :param key: klucz wpisu.
+        :param value: zapisywana wartość.
+        """
+        with self._lock:
+            entries = self._partitions.get(partition)
+            if entries is None:
+                entries = self._partitions[partition] = OrderedDict()
+                if len(self._partitions) > self.max_partitions:
+                    self._partitions.popitem(last=False)
+            self._partitions.move_to_end(partition)
+
+            entries[key] = value
+            entries.move_to_end(key)
+            if len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def get_or_set(self, partition, key, factory):
+        """
+        Zwraca wartość z pamięci podręcznej, a w przypadku jej braku wylicza ją funkcją factory i zapisuje.
+
+        :param partition: identyfikator partycji.
+        :param key: klucz wpisu.
+        :param factory: bezargumentowa funkcja wyliczająca wartość.
+        :return: zapisana lub wyliczona wartość.
+        """
+        missing = object()
+        value = self.get(partition, key, missing)
+        if value is missing:
+            value = factory()
+            self.set(partition, key, value)
+        return value
+
+    def invalidate(self, partition):
+        """
+        Usuwa wszystkie wpisy danej partycji.
+
+        :param partition: identyfikator partycji.
+        """
+        with self._lock:
+            self._partitions.pop(partition, None)
+
+    def clear(self):
+        """
+        Usuwa wszystkie partycje.
+        """
+        with self._lock:
+            self._partitions.clear()
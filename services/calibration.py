@@ -0,0 +1,129 @@
+import math
+import statistics
+import tempfile
+from collections import namedtuple, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from buzkashi_app.models import AutomatedTest, AutomatedTestResult, ReferenceSolution, TestTimeLimit
+from services import judge
+
+RUNS = 5
+"""Liczba mierzonych uruchomień rozwiązania wzorcowego dla każdego testu."""
+
+WARMUP_RUNS = 1
+"""Liczba początkowych uruchomień pomijanych w pomiarach (wczytanie plików i interpretera do pamięci podręcznej)."""
+
+MULTIPLIER = 2.0
+"""Mnożnik mediany czasu działania najwolniejszego rozwiązania wzorcowego."""
+
+HEADROOM = timedelta(milliseconds=100)
+"""Stały zapas czasu dodawany do limitu (narzut uruchomienia procesu i wahania obciążenia)."""
+
+MEASURE_TIME_LIMIT = timedelta(seconds=30)
+"""Limit czasu jednego uruchomienia rozwiązania wzorcowego podczas pomiarów."""
+
+GRANULARITY = timedelta(milliseconds=10)
+"""Wyznaczone limity są zaokrąglane w górę do wielokrotności tej wartości."""
+
+Measurement = namedtuple('Measurement', ['test', 'language', 'median', 'deviation', 'max_time', 'previous'])
+"""
+Wynik kalibracji testu dla języka: mediana i odchylenie standardowe czasów działania najwolniejszego rozwiązania
+wzorcowego, nowy limit czasu oraz poprzedni limit (timedelta).
+"""
+
+Failure = namedtuple('Failure', ['reference', 'test', 'status'])
+"""Niepowodzenie rozwiązania wzorcowego: model rozwiązania, model testu (None dla kompilacji) i status."""
+
+Calibration = namedtuple('Calibration', ['measurements', 'failures'])
+"""Wynik kalibracji zadania: listy Measurement i Failure."""
+
+
+def time_limit(median, multiplier=MULTIPLIER, headroom=HEADROOM):
+    """
+    :param median: mediana czasu działania (timedelta).
+    :param multiplier: mnożnik mediany.
+    :param headroom: stały zapas czasu.
+    :return: limit czasu zaokrąglony w górę do GRANULARITY.
+    """
+    limit = median * multiplier + headroom
+    return GRANULARITY * math.ceil(limit / GRANULARITY)
+
+
+def _measure(reference, tests, checker, runs, warmup):
+    """
+    Kompiluje rozwiązanie wzorcowe i mierzy czasy jego działania dla każdego testu. Pomiary testu przerywane są
+    przy pierwszym niepoprawnym wyniku.
+
+    :return: krotka (słownik id testu -> lista czasów działania w sekundach, lista Failure).
+    """
+    samples, failures = {}, []
+    with tempfile.TemporaryDirectory(prefix='calibrate-') as workdir:
+        command, _ = judge.compile_solution(reference, workdir)
+        if command is None:
+            return samples, [Failure(reference, None, AutomatedTestResult.TestStatus.COMPILATION_ERROR)]
+
+        for test in tests:
+            runtimes = []
+            for index in range(warmup + runs):
+                result = judge.judge_test(test, command, workdir, checker, MEASURE_TIME_LIMIT)
+                if result.status != AutomatedTestResult.TestStatus.PASSED:
+                    failures.append(Failure(reference, test, result.status))
+                    break
+                if index >= warmup:
+                    runtimes.append(result.runtime.total_seconds())
+            else:
+                samples[test.id] = runtimes
+    return samples, failures
+
+
+def calibrate(task, runs=RUNS, multiplier=MULTIPLIER, headroom=HEADROOM, warmup=WARMUP_RUNS, dry_run=False):
+    """
+    Wyznacza limity czasu testów zadania dla każdego języka programowania rozwiązań wzorcowych. Każde rozwiązanie
+    wzorcowe uruchamiane jest runs razy (po warmup pominiętych uruchomieniach) dla każdego testu na tej samej
+    maszynie co ocena rozwiązań. Limit testu dla języka wynosi multiplier * mediana + headroom dla najwolniejszego
+    rozwiązania wzorcowego w tym języku. Rozwiązania z niepoprawnym wynikiem testu nie są uwzględniane dla tego
+    testu. Limity zapisywane są w modelu TestTimeLimit.
+
+    :param task: model zadania.
+    :param runs: liczba mierzonych uruchomień.
+    :param multiplier: mnożnik mediany.
+    :param headroom: stały zapas czasu.
+    :param warmup: liczba pomijanych uruchomień.
+    :param dry_run: True, jeżeli limity mają zostać tylko wyznaczone.
+    :return: Calibration.
+    :raise judge.CheckerError: jeżeli nie można przygotować programu sprawdzającego zadania.
+    """
+    tests = list(AutomatedTest.objects.filter(task=task).order_by('id'))
+    checker = judge.prepare_checker(task)
+    slowest, failures = defaultdict(dict), []
+    for reference in ReferenceSolution.objects.filter(task=task).order_by('id'):
+        samples, reference_failures = _measure(reference, tests, checker, runs, warmup)
+        failures += reference_failures
+        for test_id, runtimes in samples.items():
+            current = slowest[reference.programming_language].get(test_id)
+            if current is None or statistics.median(runtimes) > statistics.median(current):
+                slowest[reference.programming_language][test_id] = runtimes
+
+    previous = {(limit.test_id, limit.programming_language): limit.max_time
+                for limit in TestTimeLimit.objects.filter(test__task=task)}
+    measurements = []
+    for language, by_test in sorted(slowest.items()):
+        for test in tests:
+            if test.id not in by_test:
+                continue
+            median = timedelta(seconds=statistics.median(by_test[test.id]))
+            deviation = timedelta(seconds=statistics.pstdev(by_test[test.id]))
+            measurements.append(Measurement(test, language, median, deviation, time_limit(median, multiplier, headroom),
+                                            previous.get((test.id, language), test.max_time)))
+
+    if not dry_run:
+        with transaction.atomic():
+            for measurement in measurements:
+                TestTimeLimit.objects.update_or_create(
+                    test=measurement.test, programming_language=measurement.language,
+                    defaults={'max_time': measurement.max_time, 'median': measurement.median,
+                              'deviation': measurement.deviation, 'runs': runs, 'calibrated': timezone.now()})
+    return Calibration(measurements, failures)
@@ -0,0 +1,214 @@
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+from django.template.loader import render_to_string
+
+from buzkashi_app.models import Explanation
+
+PAGE_SIZE = 20
+"""Liczba wyjaśnień na stronie."""
+
+PAGE_TIMEOUT = 600
+"""Czas przechowywania strony w pamięci podręcznej w sekundach. Zmiana wyjaśnień unieważnia strony wcześniej."""
+
+VERSION_KEY = 'clarifications:{competition_id}:version'
+"""Klucz pamięci podręcznej z wersją wyjaśnień zawodów. Zmiana wersji unieważnia wszystkie strony zawodów."""
+
+PAGE_CACHE_KEY = 'clarifications:{competition_id}:{version}:{task_id}:{cursor}'
+"""Klucz pamięci podręcznej strony wyjaśnień."""
+
+NEWER_CACHE_KEY = 'clarifications:{competition_id}:{version}:{task_id}:after:{cursor}'
+"""Klucz pamięci podręcznej wyjaśnień nowszych od kursora (dla kanału powiadomień)."""
+
+STREAM_POLL_INTERVAL = 2
+"""Odstęp w sekundach między sprawdzeniami wersji wyjaśnień w kanale powiadomień."""
+
+STREAM_DURATION = 300
+"""Czas w sekundach, po którym kanał powiadomień jest zamykany - przeglądarka łączy się ponownie od ostatniego
+otrzymanego wyjaśnienia (nagłówek Last-Event-ID)."""
+
+TEMPLATE = 'clarifications/entries.html'
+"""Template listy wyjaśnień."""
+
+Entry = namedtuple('Entry', ['id', 'publication_date', 'task', 'title', 'question', 'answer'])
+"""Wyjaśnienie: id, data opublikowania, tytuł zadania, tytuł i treść uwagi zespołu oraz treść wyjaśnienia."""
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+"""Początek epoki - punkt odniesienia kursorów."""
+
+Page = namedtuple('Page', ['html', 'head', 'next'])
+"""Strona wyjaśnień: wyrenderowana lista, kursor najnowszego wyjaśnienia i kursor następnej strony (lub None)."""
+
+
+def _cache():
+    """
+    :return: pamięć podręczna wyjaśnień (settings.CLARIFICATIONS_CACHE). Wersja wyjaśnień jest zmieniana przez
+        proces zapisujący wyjaśnienie, a sprawdzana przez procesy obsługujące kanały powiadomień, więc pamięć
+        musi być wspólna dla wszystkich procesów (np. memcached, redis).
+    """
+    return caches[settings.CLARIFICATIONS_CACHE]
+
+
+def version(competition_id):
+    """
+    :param competition_id: id zawodów.
+    :return: wersja wyjaśnień zawodów.
+    """
+    return _cache().get_or_set(VERSION_KEY.format(competition_id=competition_id), 1, None)
+
+
+def invalidate(competition_id):
+    """
+    Unieważnia strony wyjaśnień zawodów. Wywoływana po każdej zmianie wyjaśnienia lub uwagi.
+
+    :param competition_id: id zawodów.
+    """
+    key = VERSION_KEY.format(competition_id=competition_id)
+    try:
+        _cache().incr(key)
+    except ValueError:
+        _cache().set(key, 1, None)
+
+
+def encode_cursor(publication_date, explanation_id):
+    """
+    :param publication_date: data opublikowania wyjaśnienia.
+    :param explanation_id: id wyjaśnienia.
+    :return: kursor w postaci "<mikrosekundy od początku epoki>-<id>".
+    """
+    return f'{(publication_date - EPOCH) // timedelta(microseconds=1)}-{explanation_id}'
+
+
+def decode_cursor(cursor):
+    """
+    :param cursor: kursor (encode_cursor).
+    :return: krotka (data opublikowania, id wyjaśnienia).
+    :raise ValueError: jeżeli kursor jest niepoprawny.
+    """
+    microseconds, explanation_id = cursor.split('-')
+    return EPOCH + timedelta(microseconds=int(microseconds)), int(explanation_id)
+
+
+def _entries(competition_id, task_id=None, before=None, after=None, limit=PAGE_SIZE):
+    """
+    Pobiera wyjaśnienia zawodów uporządkowane od najnowszych, stronicowane po (data opublikowania, id)
+    (keyset pagination), więc koszt zapytania nie zależy od numeru strony.
+
+    :param competition_id: id zawodów.
+    :param task_id: opcjonalne id zadania.
+    :param before: opcjonalny kursor - pobierane są wyjaśnienia starsze od kursora.
+    :param after: opcjonalny kursor - pobierane są wyjaśnienia nowsze od kursora.
+    :param limit: maksymalna liczba wyjaśnień.
+    :return: lista Entry.
+    """
+    explanations = Explanation.objects.filter(notice__task__competition_id=competition_id)
+    if task_id is not None:
+        explanations = explanations.filter(notice__task_id=task_id)
+    if before is not None:
+        date, explanation_id = decode_cursor(before)
+        explanations = explanations.filter(Q(publication_date__lt=date) |
+                                           Q(publication_date=date, id__lt=explanation_id))
+    if after is not None:
+        date, explanation_id = decode_cursor(after)
+        explanations = explanations.filter(Q(publication_date__gt=date) |
+                                           Q(publication_date=date, id__gt=explanation_id))
+
+    rows = explanations.order_by('-publication_date', '-id') \
+        .values_list('id', 'publication_date', 'notice__task__title', 'notice__title', 'notice__body', 'body')
+    return [Entry(*row) for row in rows[:limit]]
+
+
+def page(competition_id, task_id=None, before=None):
+    """
+    Zwraca wyrenderowaną stronę wyjaśnień. Strony są przechowywane w pamięci podręcznej do czasu zmiany
+    wyjaśnień zawodów (zob. invalidate), więc równoczesne odświeżenia tej samej strony wykonują jedno zapytanie
+    do bazy danych.
+
+    :param competition_id: id zawodów.
+    :param task_id: opcjonalne id zadania.
+    :param before: opcjonalny kursor poprzedniej strony.
+    :return: Page.
+    :raise ValueError: jeżeli kursor jest niepoprawny.
+    """
+    key = PAGE_CACHE_KEY.format(competition_id=competition_id, version=version(competition_id), task_id=task_id,
+                                cursor=before)
+    result = _cache().get(key)
+    if result is None:
+        entries = _entries(competition_id, task_id, before=before, limit=PAGE_SIZE + 1)
+        cursors = [encode_cursor(entry.publication_date, entry.id) for entry in entries]
+        result = Page(render_to_string(TEMPLATE, {'entries': entries[:PAGE_SIZE]}),
+                      cursors[0] if cursors else before,
+                      cursors[PAGE_SIZE - 1] if len(entries) > PAGE_SIZE else None)
+        _cache().set(key, result, PAGE_TIMEOUT)
+    return result
+
+
+def newer(competition_id, task_id, after):
+    """
+    Zwraca wyrenderowane wyjaśnienia nowsze od kursora. Wynik jest przechowywany w pamięci podręcznej - klienci
+    kanału powiadomień zwykle mają ten sam kursor, więc nowe wyjaśnienie powoduje jedno zapytanie do bazy danych.
+
+    :param competition_id: id zawodów.
+    :param task_id: opcjonalne id zadania.
+    :param after: kursor ostatniego otrzymanego wyjaśnienia lub None.
+    :return: krotka (wyrenderowana lista lub None, jeżeli brak nowych wyjaśnień, kursor najnowszego wyjaśnienia).
+        None, jeżeli nowych wyjaśnień jest więcej niż PAGE_SIZE - klient powinien pobrać stronę ponownie.
+    :raise ValueError: jeżeli kursor jest niepoprawny.
+    """
+    key = NEWER_CACHE_KEY.format(competition_id=competition_id, version=version(competition_id), task_id=task_id,
+                                 cursor=after)
+    result = _cache().get(key)
+    if result is None:
+        entries = _entries(competition_id, task_id, after=after, limit=PAGE_SIZE + 1)
+        if len(entries) > PAGE_SIZE:
+            result = ()
+        elif entries:
+            result = (render_to_string(TEMPLATE, {'entries': entries}),
+                      encode_cursor(entries[0].publication_date, entries[0].id))
+        else:
+            result = (None, after)
+        _cache().set(key, result, PAGE_TIMEOUT)
+    return result or None
+
+
+def stream(competition_id, task_id, after, duration=STREAM_DURATION, interval=STREAM_POLL_INTERVAL):
+    """
+    Generator zdarzeń kanału powiadomień (Server-Sent Events). Co interval sekund sprawdza wersję wyjaśnień
+    w pamięci podręcznej - baza danych jest odpytywana (funkcją newer) tylko po zmianie wersji.
+    Każde zdarzenie zawiera wyrenderowane nowe wyjaśnienia, a jego id jest kursorem najnowszego z nich.
+    Jeżeli nowych wyjaśnień jest zbyt wiele, wysyła zdarzenie reload i kończy się.
+    Pomiędzy zdarzeniami wysyłany jest komentarz podtrzymujący połączenie.
+
+    :param competition_id: id zawodów.
+    :param task_id: opcjonalne id zadania.
+    :param after: kursor ostatniego otrzymanego wyjaśnienia.
+    :param duration: czas w sekundach, po którym generator się kończy.
+    :param interval: odstęp w sekundach między sprawdzeniami wersji.
+    :return: generator fragmentów odpowiedzi.
+    """
+    yield f'retry: {interval * 1000}\n\n'
+
+    deadline = time.monotonic() + duration
+    seen = None
+    while True:
+        current = version(competition_id)
+        if current != seen:
+            seen = current
+            update = newer(competition_id, task_id, after)
+            if update is None:
+                yield 'event: reload\ndata: \n\n'
+                return
+            html, after = update
+            if html is not None:
+                data = ''.join(f'data: {line}\n' for line in html.splitlines())
+                yield f'id: {after}\n{data}\n'
+        else:
+            yield ':\n\n'
+
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(interval)
@@ -0,0 +1,115 @@
+import csv
+import json
+
+from buzkashi_app.models import Solution, AutomatedTestResult
+from services.scoreboard import compute_standings
+
+CHUNK_SIZE = 2000
+"""Liczba wierszy pobieranych z bazy danych jednym zapytaniem iteratora."""
+
+
+def standings_rows(competition):
+    """
+    Generator wierszy rankingu zawodów.
+
+    :param competition: model zawodów.
+    :return: generator krotek (pozycja, zespół, zadania rozwiązane, czas w minutach).
+    """
+    for row in compute_standings(competition):
+        yield tuple(row)
+
+
+def solution_rows(competition):
+    """
+    Generator wierszy werdyktów rozwiązań zawodów. Wiersze pobierane są iteratorem bez tworzenia modeli.
+
+    :param competition: model zawodów.
+    :return: generator krotek (id, zespół, zadanie, język, wersja, czas złożenia, status).
+    """
+    solutions = Solution.objects.filter(author__competition=competition).order_by('id') \
+        .values_list('id', 'author__name', 'task__title', 'programming_language', 'version', 'submission_time',
+                     'status')
+    for solution_id, team, task, language, version, submission_time, status in solutions.iterator(CHUNK_SIZE):
+        yield solution_id, team, task, language, version, \
+            submission_time.isoformat() if submission_time else None, status
+
+
+def test_result_rows(competition):
+    """
+    Generator wierszy podsumowań wyników testów automatycznych rozwiązań zawodów (bez zawartości wyjścia).
+
+    :param competition: model zawodów.
+    :return: generator krotek (id rozwiązania, id testu, test, status, czas wykonania w sekundach).
+    """
+    statuses = dict(AutomatedTestResult.TestStatus.choices)
+    results = AutomatedTestResult.objects.filter(solution__author__competition=competition) \
+        .order_by('solution_id', 'test_id') \
+        .values_list('solution_id', 'test_id', 'test__title', 'status', 'runtime')
+    for solution_id, test_id, title, status, runtime in results.iterator(CHUNK_SIZE):
+        yield solution_id, test_id, title, statuses.get(status, status), runtime.total_seconds()
+
+
+EXPORTS = {
+    'standings': (('position', 'team', 'solved', 'time'), standings_rows),
+    'solutions': (('id', 'team', 'task', 'language', 'version', 'submission_time', 'status'), solution_rows),
+    'test_results': (('solution', 'test', 'title', 'status', 'runtime'), test_result_rows),
+}
+"""Dostępne eksporty: nagłówek oraz generator wierszy według rodzaju eksportu."""
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'json': 'application/json',
+}
+"""Obsługiwane formaty eksportu i ich typy MIME."""
+
+
+class _Echo:
+    """
+    Pseudo-bufor dla csv.writer zwracający zapisany wiersz zamiast go przechowywać.
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    """
+    Generator kolejnych wierszy pliku csv.
+
+    :param header: nagłówek.
+    :param rows: iterowalne wiersze.
+    :return: generator napisów.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_json(header, rows):
+    """
+    Generator kolejnych fragmentów tablicy JSON. Każdy wiersz jest obiektem z kluczami z nagłówka.
+
+    :param header: nagłówek.
+    :param rows: iterowalne wiersze.
+    :return: generator napisów.
+    """
+    separator = '[\n'
+    for row in rows:
+        yield separator + json.dumps(dict(zip(header, row)), ensure_ascii=False)
+        separator = ',\n'
+    yield '[]\n' if separator == '[\n' else '\n]\n'
+
+
+def export(competition, kind, fmt):
+    """
+    Zwraca generator fragmentów eksportu danych zawodów.
+
+    :param competition: model zawodów.
+    :param kind: rodzaj eksportu - klucz słownika EXPORTS.
+    :param fmt: format - klucz słownika FORMATS.
+    :return: generator napisów.
+    """
+    header, rows = EXPORTS[kind]
+    stream = stream_csv if fmt == 'csv' else stream_json
+    return stream(header, rows(competition))
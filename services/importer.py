@@ -0,0 +1,264 @@
+import csv
+import io
+import json
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction, IntegrityError
+
+from buzkashi_app.models import EduInstitution, Team, Participant, Competition
+
+ImportReport = namedtuple('ImportReport', ['created', 'errors'])
+"""Raport importu: liczba utworzonych obiektów oraz lista błędów w postaci par (numer wiersza, opis)."""
+
+FORMATS = ('csv', 'jsonl')
+"""Obsługiwane formaty plików: csv z nagłówkiem oraz JSON Lines (jeden obiekt JSON na wiersz)."""
+
+
+def read_rows(stream, fmt):
+    """
+    Generator czytający plik wiersz po wierszu, bez wczytywania całego pliku do pamięci.
+
+    :param stream: plik otwarty w trybie binarnym lub tekstowym.
+    :param fmt: format pliku: 'csv' lub 'jsonl'.
+    :return: generator par (numer wiersza, słownik wartości lub wyjątek ValueError dla niepoprawnego wiersza).
+    """
+    if isinstance(stream.read(0), bytes):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_num, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError('wiersz nie jest obiektem JSON')
+            except ValueError as e:
+                row = ValueError(f'Niepoprawny JSON: {e}')
+            yield line_num, row
+    else:
+        raise ValueError(f'Nieobsługiwany format: {fmt}')
+
+
+class Importer:
+    """
+    Klasa bazowa importu obiektów modelu z pliku.
+    Wiersze są walidowane pojedynczo (ograniczenia pól modelu oraz unikalność), a poprawne obiekty zapisywane
+    w partiach zapytaniem bulk_create, każda partia w osobnej transakcji. Błędny wiersz nie przerywa importu -
+    również wiersz naruszający ograniczenia bazy danych przy zapisie (zob. save).
+    """
+
+    model = None
+    """Importowany model."""
+
+    unique_fields = ()
+    """Pola unikalne modelu. Istniejące wartości pobierane są z bazy danych jednym zapytaniem na pole."""
+
+    exclude = ()
+    """
+    Pola pomijane podczas walidacji modelu. Klucze obce są sprawdzane przez importer na podstawie danych
+    pobranych z góry, aby uniknąć zapytania do bazy danych dla każdego wiersza.
+    """
+
+    def __init__(self, batch_size=500):
+        """
+        :param batch_size: liczba obiektów zapisywanych jednym zapytaniem.
+        """
+        self.batch_size = batch_size
+        self.seen = {field: set(self.model.objects.values_list(field, flat=True)) for field in self.unique_fields}
+
+    def build(self, row):
+        """
+        Tworzy niezapisany obiekt modelu na podstawie wiersza.
+
+        :param row: słownik wartości wiersza.
+        :return: obiekt modelu.
+        """
+        raise NotImplementedError
+
+    def run(self, stream, fmt):
+        """
+        Importuje obiekty z pliku.
+
+        :param stream: plik otwarty w trybie binarnym lub tekstowym.
+        :param fmt: format pliku: 'csv' lub 'jsonl'.
+        :return: ImportReport.
+        """
+        created = 0
+        errors = []
+        batch = []
+
+        for line_num, row in read_rows(stream, fmt):
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                obj = self.build({key.strip(): (value.strip() if isinstance(value, str) else value)
+                                  for key, value in row.items() if key})
+                obj.full_clean(exclude=self.exclude, validate_unique=False)
+                self.check_unique(obj)
+            except ValidationError as e:
+                errors.append((line_num, '; '.join(f'{field}: {" ".join(messages)}'
+                                                  for field, messages in e.message_dict.items())))
+                continue
+            except (ValueError, KeyError, TypeError) as e:
+                errors.append((line_num, str(e)))
+                continue
+
+            batch.append((line_num, obj))
+            if len(batch) >= self.batch_size:
+                saved, save_errors = self.save(batch)
+                created, errors = created + saved, errors + save_errors
+                batch = []
+
+        if batch:
+            saved, save_errors = self.save(batch)
+            created, errors = created + saved, errors + save_errors
+
+        errors.sort(key=lambda error: error[0])
+        return ImportReport(created, errors)
+
+    def check_unique(self, obj):
+        """
+        Sprawdza unikalność pól obiektu względem bazy danych i wcześniejszych wierszy pliku.
+
+        :param obj: obiekt modelu.
+        """
+        for field in self.unique_fields:
+            value = getattr(obj, field)
+            if value in self.seen[field]:
+                raise ValidationError({field: [f'Wartość {value} już istnieje']})
+        for field in self.unique_fields:
+            self.seen[field].add(getattr(obj, field))
+
+    def prepare(self, obj):
+        """
+        Przygotowuje obiekt do zapisu. Wywoływana w transakcji zapisu obiektu, przed zapisem - zmiany w bazie danych
+        (np. rezerwacje) są wycofywane razem z nieudanym zapisem.
+
+        :param obj: obiekt modelu.
+        """
+
+    def save(self, batch):
+        """
+        Zapisuje partię obiektów w jednej transakcji. Jeżeli zapis partii narusza ograniczenia bazy danych (np. wiersz
+        zapisany w międzyczasie przez inny proces), transakcja jest wycofywana, a obiekty zapisywane pojedynczo,
+        każdy w osobnej transakcji - błędne wiersze są zgłaszane, a pozostałe zapisywane.
+
+        :param batch: lista par (numer wiersza, obiekt modelu).
+        :return: krotka (liczba zapisanych obiektów, lista błędów w postaci par (numer wiersza, opis)).
+        """
+        try:
+            with transaction.atomic():
+                for _, obj in batch:
+                    self.prepare(obj)
+                self.model.objects.bulk_create([obj for _, obj in batch], batch_size=self.batch_size)
+            return len(batch), []
+        except IntegrityError:
+            pass
+
+        created, errors = 0, []
+        for line_num, obj in batch:
+            obj.pk = None
+            try:
+                with transaction.atomic():
+                    self.prepare(obj)
+                    obj.save(force_insert=True)
+                created += 1
+            except IntegrityError as e:
+                errors.append((line_num, str(e)))
+        return created, errors
+
+
+def _parse_bool(value, default):
+    """
+    Zamienia wartość z pliku na wartość logiczną.
+
+    :param value: wartość z pliku (napis, liczba, bool lub None).
+    :param default: wartość domyślna dla pustej wartości.
+    :return: bool.
+    """
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'tak', 'yes')
+
+
+class EduInstitutionImporter(Importer):
+    """
+    Import placówek edukacyjnych. Kolumny: name, region, email, authorization_code, is_university.
+    """
+
+    model = EduInstitution
+    unique_fields = ('name', 'email')
+
+    def build(self, row):
+        institution = EduInstitution(name=row['name'], region=row['region'], email=row['email'],
+                                     authorization_code=row.get('authorization_code') or None,
+                                     is_university=_parse_bool(row.get('is_university'), True))
+        institution.set_search_keys()
+        return institution
+
+
+class TeamImporter(Importer):
+    """
+    Import zespołów. Kolumny: name, competition (id zawodów), institution (nazwa placówki), priority, tutor.
+    Każdy zaimportowany zespół rezerwuje miejsce na zawodach (zob. Competition.reserve_slot) - zespoły ponad
+    limit max_teams trafiają na listę rezerwową.
+    """
+
+    model = Team
+    unique_fields = ('name',)
+    exclude = ('competition', 'institution', 'user')
+
+    def __init__(self, batch_size=500):
+        super(TeamImporter, self).__init__(batch_size)
+        self.institutions = dict(EduInstitution.objects.values_list('name', 'id'))
+        self.competitions = {competition.id: competition for competition in Competition.objects.only('id')}
+
+    def build(self, row):
+        competition_id = int(row['competition'])
+        if competition_id not in self.competitions:
+            raise ValidationError({'competition': [f'Zawody o id {competition_id} nie istnieją']})
+        if row['institution'] not in self.institutions:
+            raise ValidationError({'institution': [f'Placówka {row["institution"]} nie istnieje']})
+
+        return Team(name=row['name'], competition_id=competition_id,
+                    institution_id=self.institutions[row['institution']],
+                    priority=int(row.get('priority') or 1), tutor=row.get('tutor') or None)
+
+    def prepare(self, obj):
+        obj.is_waitlisted = not self.competitions[obj.competition_id].reserve_slot()
+
+
+class ParticipantImporter(Importer):
+    """
+    Import uczestników. Kolumny: name, surname, email, team (nazwa zespołu), is_capitan.
+    """
+
+    model = Participant
+    exclude = ('team',)
+
+    def __init__(self, batch_size=500):
+        super(ParticipantImporter, self).__init__(batch_size)
+        self.teams = dict(Team.objects.values_list('name', 'id'))
+
+    def build(self, row):
+        if row['team'] not in self.teams:
+            raise ValidationError({'team': [f'Zespół {row["team"]} nie istnieje']})
+
+        return Participant(name=row['name'], surname=row['surname'], email=row['email'],
+                           team_id=self.teams[row['team']], is_capitan=_parse_bool(row.get('is_capitan'), False))
+
+
+IMPORTERS = {
+    'institutions': EduInstitutionImporter,
+    'teams': TeamImporter,
+    'participants': ParticipantImporter,
+}
+"""Importery dostępne według rodzaju importowanych danych."""
@@ -0,0 +1,697 @@
+import hashlib
+import os
+import pwd
+import selectors
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from collections import namedtuple, deque
+from datetime import timedelta
+from itertools import zip_longest
+
+from django.conf import settings
+
+from buzkashi_app.models import Task, Solution, AutomatedTest, AutomatedTestResult, TestTimeLimit
+from buzkashi_app.storage import is_blob, blob_digest
+
+HEAD_SIZE = 2048
+"""Liczba pierwszych bajtów wyjścia programu zachowywanych do wyświetlenia."""
+
+TAIL_SIZE = 1024
+"""Liczba ostatnich bajtów wyjścia programu zachowywanych do wyświetlenia."""
+
+READ_SIZE = 64 * 1024
+"""Rozmiar bufora odczytu wyjścia programu w bajtach."""
+
+SPOOL_SIZE = 256 * 1024
+"""Rozmiar wyjścia programu przechowywanego w pamięci przed zapisaniem do pliku tymczasowego w bajtach."""
+
+COMPILE_TIME_LIMIT = 30
+"""Limit czasu kompilacji w sekundach."""
+
+CHECKER_OUTPUT_LIMIT = 64 * 1024
+"""Limit rozmiaru wyjścia programu sprawdzającego w bajtach."""
+
+CHECKER_MESSAGE_SIZE = 255
+"""Maksymalna długość komunikatu programu sprawdzającego zapisywanego w wyniku testu."""
+
+Language = namedtuple('Language', ['source', 'compile', 'run'])
+"""Konfiguracja języka programowania: nazwa pliku kodu źródłowego, polecenie kompilacji (lub None) i uruchomienia."""
+
+LANGUAGES = {
+    Solution.ProgrammingLanguage.JAVA: Language('Main.java', ['javac', '-encoding', 'UTF-8', 'Main.java'],
+                                                ['java', '-Xss64m', 'Main']),
+    Solution.ProgrammingLanguage.CPP: Language('main.cpp', ['g++', '-O2', '-std=c++17', '-o', 'main', 'main.cpp'],
+                                               ['./main']),
+    Solution.ProgrammingLanguage.CS: Language('main.cs', ['mcs', '-optimize+', '-out:main.exe', 'main.cs'],
+                                              ['mono', 'main.exe']),
+    Solution.ProgrammingLanguage.PYTHON: Language('main.py', None, ['python3', 'main.py']),
+}
+"""Konfiguracja języków programowania według enumeratora Solution.ProgrammingLanguage."""
+
+RunResult = namedtuple('RunResult', ['exit_code', 'runtime', 'timed_out', 'output', 'errors'])
+"""
+Wynik uruchomienia programu: kod wyjścia, czas działania (timedelta), True, jeżeli przekroczono limit czasu,
+oraz przechwycone wyjście standardowe i wyjście błędów (OutputCapture).
+"""
+
+Checker = namedtuple('Checker', ['interactive', 'command', 'cwd', 'time_limit'])
+"""
+Skompilowany program sprawdzający: True dla interaktora, polecenie uruchomienia, katalog w pamięci podręcznej
+skompilowanych programów i limit czasu w sekundach.
+"""
+
+_checkers = {}
+"""Skompilowane programy sprawdzające według skrótu kodu źródłowego i języka (w ramach procesu)."""
+
+_checkers_lock = threading.Lock()
+"""Blokada kompilacji programów sprawdzających w ramach procesu."""
+
+
+class CheckerError(Exception):
+    """
+    Błąd programu sprawdzającego zadania (brak pliku, nieobsługiwany język, błąd kompilacji). Komunikat jest
+    przeznaczony dla sędziego.
+    """
+
+
+class OutputCapture:
+    """
+    Bufor wyjścia programu o stałym rozmiarze w pamięci. Zachowuje HEAD_SIZE pierwszych i TAIL_SIZE ostatnich bajtów
+    do wyświetlenia, a całe wyjście (do limitu) opcjonalnie zapisuje w pliku tymczasowym (SpooledTemporaryFile)
+    do porównania z oczekiwanym wyjściem. Bajty ponad limit nie są zachowywane - bufor jest oznaczany jako
+    przepełniony.
+    """
+
+    def __init__(self, limit, spool=True):
+        """
+        :param limit: maksymalny rozmiar wyjścia w bajtach.
+        :param spool: True, jeżeli całe wyjście ma zostać zapisane w pliku tymczasowym.
+        """
+        self.limit = limit
+        self.size = 0
+        self.exceeded = False
+        self.head = bytearray()
+        self.tail = deque()
+        self.tail_size = 0
+        self.file = tempfile.SpooledTemporaryFile(SPOOL_SIZE) if spool else None
+
+    def write(self, data):
+        """
+        Dołącza fragment wyjścia.
+
+        :param data: bajty.
+        :return: False, jeżeli wyjście przekroczyło limit.
+        """
+        if self.size + len(data) > self.limit:
+            data = data[:self.limit - self.size]
+            self.exceeded = True
+        self.size += len(data)
+
+        if len(self.head) < HEAD_SIZE:
+            taken = HEAD_SIZE - len(self.head)
+            self.head += data[:taken]
+            rest = data[taken:]
+        else:
+            rest = data
+        if rest:
+            self.tail.append(bytes(rest[-TAIL_SIZE:]))
+            self.tail_size += len(self.tail[-1])
+            while self.tail_size - len(self.tail[0]) >= TAIL_SIZE:
+                self.tail_size -= len(self.tail.popleft())
+
+        if self.file is not None:
+            self.file.write(data)
+        return not self.exceeded
+
+    def excerpt(self):
+        """
+        :return: pierwsze i ostatnie bajty wyjścia. Jeżeli część wyjścia została pominięta, między nimi wstawiana
+            jest informacja o liczbie pominiętych bajtów.
+        """
+        tail = b''.join(self.tail)[-TAIL_SIZE:]
+        skipped = self.size - len(self.head) - len(tail)
+        marker = f'\n[... pominięto {skipped} B ...]\n'.encode() if skipped else b''
+        suffix = f'\n[... przekroczono limit wyjścia {self.limit} B ...]\n'.encode() if self.exceeded else b''
+        return bytes(self.head) + marker + tail + suffix
+
+    def open(self):
+        """
+        :return: plik tymczasowy z wyjściem przewinięty na początek.
+        """
+        self.file.seek(0)
+        return self.file
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+def _sandbox():
+    """
+    :return: słownik argumentów subprocess.Popen uruchamiających program jako użytkownik
+        settings.JUDGE_SANDBOX_USER (bez grup dodatkowych) lub pusty słownik, jeżeli użytkownik nie jest ustawiony.
+    """
+    user = settings.JUDGE_SANDBOX_USER
+    if user is None:
+        return {}
+    entry = pwd.getpwuid(user) if isinstance(user, int) else pwd.getpwnam(user)
+    return {'user': entry.pw_uid, 'group': entry.pw_gid, 'extra_groups': []}
+
+
+def sandbox_warnings():
+    """
+    Sprawdza konfigurację izolacji rozwiązań (settings.JUDGE_SANDBOX_USER).
+
+    :return: lista ostrzeżeń dla administratora procesu oceniającego.
+    """
+    if settings.JUDGE_SANDBOX_USER is None:
+        return ['Rozwiązania uruchamiane są bez izolacji (settings.JUDGE_SANDBOX_USER) - mogą odczytać pliki testów, '
+                'magazyn plików i bazę danych']
+    warnings = []
+    if os.geteuid() != 0:
+        warnings.append('Uruchamianie rozwiązań jako settings.JUDGE_SANDBOX_USER wymaga uprawnień użytkownika root')
+    database = settings.DATABASES['default']
+    paths = [settings.MEDIA_ROOT] + ([database['NAME']] if database['ENGINE'].endswith('sqlite3') else [])
+    for path in paths:
+        if os.path.exists(path) and os.stat(path).st_mode & 0o007:
+            warnings.append(f'{path} jest dostępny dla innych użytkowników - także dla rozwiązań')
+    return warnings
+
+
+def run(command, input_path, time_limit, cwd, output_limit=None, sandbox=False):
+    """
+    Uruchamia program z plikiem wejściowym na wejściu standardowym. Wyjście standardowe i wyjście błędów są czytane
+    na bieżąco fragmentami (selectors) do buforów OutputCapture, więc zużycie pamięci nie zależy od rozmiaru wyjścia.
+    Program jest przerywany (SIGKILL całej grupy procesów) po przekroczeniu limitu czasu lub limitu wyjścia.
+
+    :param command: polecenie (lista argumentów).
+    :param input_path: ścieżka pliku wejściowego lub None.
+    :param time_limit: limit czasu w sekundach (czas rzeczywisty).
+    :param cwd: katalog roboczy.
+    :param output_limit: limit rozmiaru każdego z wyjść w bajtach. Domyślnie: settings.JUDGE_OUTPUT_LIMIT.
+    :param sandbox: True dla programów zespołów (kompilacja i rozwiązanie) - program uruchamiany jest jako
+        użytkownik settings.JUDGE_SANDBOX_USER (zob. _sandbox).
+    :return: RunResult.
+    """
+    output_limit = output_limit or settings.JUDGE_OUTPUT_LIMIT
+    output, errors = OutputCapture(output_limit), OutputCapture(output_limit, spool=False)
+    stdin = open(input_path, 'rb') if input_path else subprocess.DEVNULL
+    try:
+        start = time.monotonic()
+        process = subprocess.Popen(command, cwd=cwd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   start_new_session=True, **(_sandbox() if sandbox else {}))
+    finally:
+        if input_path:
+            stdin.close()
+
+    timed_out, finished = False, False
+    deadline = start + time_limit
+    with selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ, output)
+        selector.register(process.stderr, selectors.EVENT_READ, errors)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            for key, _ in selector.select(remaining):
+                data = os.read(key.fd, READ_SIZE)
+                if not data:
+                    selector.unregister(key.fileobj)
+                elif not key.data.write(data):
+                    break
+            if output.exceeded or errors.exceeded:
+                break
+        else:
+            finished = True
+
+    if not finished:
+        _kill(process)
+    remaining = max(deadline - time.monotonic(), 0)
+    try:
+        exit_code = process.wait(remaining)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        _kill(process)
+        exit_code = process.wait()
+    runtime = time.monotonic() - start
+    process.stdout.close()
+    process.stderr.close()
+    return RunResult(exit_code, timedelta(seconds=runtime), timed_out, output, errors)
+
+
+def _kill(process):
+    """
+    Przerywa proces i wszystkie jego procesy potomne.
+
+    :param process: subprocess.Popen uruchomiony z start_new_session=True.
+    """
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _tokens(file):
+    """
+    Generator słów (ciągów znaków oddzielonych białymi znakami) pliku czytanego fragmentami.
+
+    :param file: plik otwarty w trybie binarnym.
+    :return: generator bajtów.
+    """
+    rest = b''
+    for chunk in iter(lambda: file.read(READ_SIZE), b''):
+        words = (rest + chunk).split()
+        rest = words.pop() if words and not chunk[-1:].isspace() else b''
+        yield from words
+    if rest:
+        yield rest
+
+
+def compare(output, expected):
+    """
+    Porównuje wyjście programu z oczekiwanym wyjściem słowo po słowie (białe znaki są pomijane). Pliki są czytane
+    fragmentami.
+
+    :param output: plik z wyjściem programu.
+    :param expected: plik z oczekiwanym wyjściem.
+    :return: True, jeżeli wyjścia są zgodne.
+    """
+    return all(first == second for first, second in zip_longest(_tokens(output), _tokens(expected)))
+
+
+def _materialize(field_file, path):
+    """
+    Kopiuje plik z magazynu plików do katalogu roboczego (pliki mogą być przechowywane w postaci skompresowanej).
+    Plik otwierany jest bezpośrednio w magazynie, ponieważ FieldFile po zamknięciu nie może zostać ponownie otwarty,
+    a ten sam model testu może być oceniany wielokrotnie.
+
+    :param field_file: plik pola modelu.
+    :param path: ścieżka docelowa.
+    """
+    with field_file.storage.open(field_file.name, 'rb') as source, open(path, 'wb') as target:
+        shutil.copyfileobj(source, target, READ_SIZE)
+
+
+def _message(capture):
+    """
+    :param capture: OutputCapture z wyjściem programu sprawdzającego.
+    :return: pierwszy wiersz wyjścia skrócony do CHECKER_MESSAGE_SIZE znaków.
+    """
+    lines = bytes(capture.head).decode('utf-8', 'replace').strip().splitlines()
+    return lines[0][:CHECKER_MESSAGE_SIZE] if lines else ''
+
+
+def _checker_status(exit_code, timed_out):
+    """
+    Wyznacza status wyniku testu z kodu wyjścia programu sprawdzającego lub interaktora (konwencja testlib):
+    0 - poprawna odpowiedź, 1 i 2 - błędna odpowiedź, pozostałe kody, sygnały i przekroczenie limitu czasu - błąd
+    programu sprawdzającego.
+
+    :param exit_code: kod wyjścia.
+    :param timed_out: True, jeżeli program przekroczył limit czasu.
+    :return: AutomatedTestResult.TestStatus.
+    """
+    if timed_out or exit_code not in (0, 1, 2):
+        return AutomatedTestResult.TestStatus.CHECKER_ERROR
+    return AutomatedTestResult.TestStatus.PASSED if exit_code == 0 else AutomatedTestResult.TestStatus.FAILED
+
+
+def prepare_checker(task, cache_root=None):
+    """
+    Zwraca skompilowany program sprawdzający zadania. Programy kompilowane są raz dla skrótu SHA-256 kodu źródłowego
+    i języka: wynik kompilacji przechowywany jest w katalogu <cache_root>/<skrót>, współdzielonym przez wszystkie
+    procesy oceniające. Kompilacja odbywa się w katalogu tymczasowym przenoszonym pod docelową nazwę (os.rename),
+    więc równoległe kompilacje tego samego programu nie kolidują ze sobą, a katalog w pamięci podręcznej zawsze
+    zawiera kompletny program.
+
+    :param task: model zadania.
+    :param cache_root: katalog skompilowanych programów. Domyślnie: settings.CHECKER_CACHE_ROOT.
+    :return: Checker lub None, jeżeli zadanie porównuje wyjścia (Task.CheckerType.EXACT).
+    :raise CheckerError: jeżeli program sprawdzający nie może zostać przygotowany.
+    """
+    if task.checker_type == Task.CheckerType.EXACT:
+        return None
+    if not task.checker:
+        raise CheckerError('Zadanie nie ma programu sprawdzającego')
+    language = LANGUAGES.get(task.checker_language)
+    if language is None:
+        raise CheckerError(f'Nieobsługiwany język programu sprawdzającego: {task.checker_language}')
+
+    name = task.checker.name
+    if is_blob(name):
+        source_digest = blob_digest(name)
+    else:
+        source_digest = hashlib.sha256()
+        with task.checker.storage.open(name, 'rb') as file:
+            for chunk in iter(lambda: file.read(READ_SIZE), b''):
+                source_digest.update(chunk)
+        source_digest = source_digest.hexdigest()
+    digest = hashlib.sha256(f'{task.checker_language}:{source_digest}'.encode()).hexdigest()
+
+    cache_root = cache_root or settings.CHECKER_CACHE_ROOT
+    directory = os.path.join(cache_root, digest)
+    with _checkers_lock:
+        if (cache_root, digest) not in _checkers and not os.path.isdir(directory):
+            _compile_checker(task.checker, language, cache_root, directory)
+        _checkers[cache_root, digest] = directory
+
+    interactive = task.checker_type == Task.CheckerType.INTERACTOR
+    return Checker(interactive, language.run, directory, task.checker_time_limit.total_seconds())
+
+
+def _compile_checker(source, language, cache_root, directory):
+    """
+    Kompiluje program sprawdzający w katalogu tymczasowym i przenosi go do pamięci podręcznej.
+
+    :param source: plik pola modelu z kodem źródłowym.
+    :param language: Language.
+    :param cache_root: katalog skompilowanych programów.
+    :param directory: docelowy katalog programu.
+    :raise CheckerError: jeżeli kompilacja się nie powiodła.
+    """
+    os.makedirs(cache_root, exist_ok=True)
+    workdir = tempfile.mkdtemp(prefix='tmp-', dir=cache_root)
+    try:
+        _materialize(source, os.path.join(workdir, language.source))
+        if language.compile is not None:
+            result = run(language.compile, None, COMPILE_TIME_LIMIT, workdir, CHECKER_OUTPUT_LIMIT)
+            result.output.close()
+            if result.exit_code != 0 or result.timed_out:
+                message = result.errors.excerpt().decode('utf-8', 'replace')
+                raise CheckerError(f'Błąd kompilacji programu sprawdzającego:\n{message}')
+        try:
+            os.rename(workdir, directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def check_output(checker, input_path, output, expected_path, testdir):
+    """
+    Uruchamia program sprawdzający z argumentami: plik wejściowy, plik z wyjściem rozwiązania, plik z oczekiwanym
+    wyjściem. Program działa w katalogu pamięci podręcznej z własnym limitem czasu.
+
+    :param checker: Checker.
+    :param input_path: ścieżka pliku wejściowego.
+    :param output: OutputCapture z wyjściem rozwiązania.
+    :param expected_path: ścieżka pliku z oczekiwanym wyjściem.
+    :param testdir: katalog plików testu poza katalogiem roboczym rozwiązania.
+    :return: krotka (status, czas działania programu sprawdzającego, komunikat).
+    """
+    output_path = os.path.join(testdir, 'output.txt')
+    with open(output_path, 'wb') as target:
+        shutil.copyfileobj(output.open(), target, READ_SIZE)
+
+    command = checker.command + [input_path, output_path, expected_path]
+    result = run(command, None, checker.time_limit, checker.cwd, CHECKER_OUTPUT_LIMIT)
+    result.output.close()
+    status = _checker_status(result.exit_code, result.timed_out)
+    return status, result.runtime, _message(result.errors) or _message(result.output)
+
+
+def run_interactive(command, checker, input_path, expected_path, time_limit, cwd):
+    """
+    Uruchamia rozwiązanie połączone potokami z interaktorem: wyjście standardowe każdego z programów jest wejściem
+    standardowym drugiego. Interaktor otrzymuje argumenty: plik wejściowy i plik z oczekiwanym wyjściem, a o wyniku
+    decyduje jego kod wyjścia. Wyjście błędów rozwiązania jest pomijane, a wyjście błędów interaktora przechwytywane
+    do bufora OutputCapture. Czas działania interaktora mierzony jest jako czas procesora (os.wait4), ponieważ
+    większość czasu rzeczywistego interaktor czeka na rozwiązanie. Rozwiązanie uruchamiane jest jako użytkownik
+    settings.JUDGE_SANDBOX_USER.
+
+    :param command: polecenie uruchomienia rozwiązania.
+    :param checker: Checker interaktora.
+    :param input_path: ścieżka pliku wejściowego.
+    :param expected_path: ścieżka pliku z oczekiwanym wyjściem.
+    :param time_limit: limit czasu rozwiązania w sekundach.
+    :param cwd: katalog roboczy rozwiązania.
+    :return: krotka (wynik rozwiązania RunResult bez wyjść, kod wyjścia interaktora, czas działania interaktora,
+        True, jeżeli interaktor przekroczył limit czasu, wyjście błędów interaktora OutputCapture).
+    """
+    to_solution, from_interactor = os.pipe()
+    to_interactor, from_solution = os.pipe()
+    errors = OutputCapture(CHECKER_OUTPUT_LIMIT, spool=False)
+    try:
+        start = time.monotonic()
+        solution = subprocess.Popen(command, cwd=cwd, stdin=to_solution, stdout=from_solution,
+                                    stderr=subprocess.DEVNULL, start_new_session=True, **_sandbox())
+        try:
+            interactor = subprocess.Popen(checker.command + [input_path, expected_path], cwd=checker.cwd,
+                                          stdin=to_interactor, stdout=from_interactor, stderr=subprocess.PIPE,
+                                          start_new_session=True)
+        except OSError:
+            _kill(solution)
+            solution.wait()
+            raise
+    finally:
+        for fd in (to_solution, from_interactor, to_interactor, from_solution):
+            os.close(fd)
+
+    finished = []
+    watcher = threading.Thread(target=lambda: finished.append((solution.wait(), time.monotonic())), daemon=True)
+    watcher.start()
+
+    deadline = start + time_limit
+    interactor_deadline = deadline + checker.time_limit
+    timed_out = False
+    with selectors.DefaultSelector() as selector:
+        selector.register(interactor.stderr, selectors.EVENT_READ)
+        while selector.get_map():
+            now = time.monotonic()
+            running = not timed_out and watcher.is_alive()
+            if running and now >= deadline:
+                timed_out, running = True, False
+                _kill(solution)
+            if now >= interactor_deadline:
+                break
+            for key, _ in selector.select((deadline if running else interactor_deadline) - now):
+                data = os.read(key.fd, READ_SIZE)
+                if not data:
+                    selector.unregister(key.fileobj)
+                else:
+                    errors.write(data)
+    interactor.stderr.close()
+
+    interactor_code, interactor_runtime, interactor_timed_out = _wait_usage(interactor, interactor_deadline)
+    watcher.join(max(deadline - time.monotonic(), 0))
+    if watcher.is_alive():
+        timed_out = True
+        _kill(solution)
+        watcher.join()
+    exit_code, end = finished[0]
+    solution_result = RunResult(exit_code, timedelta(seconds=end - start), timed_out, None, None)
+    return solution_result, interactor_code, interactor_runtime, interactor_timed_out, errors
+
+
+def _wait_usage(process, deadline):
+    """
+    Czeka na zakończenie procesu do podanego czasu (po jego przekroczeniu przerywa proces) i odczytuje zużyty czas
+    procesora (os.wait4).
+
+    :param process: subprocess.Popen uruchomiony z start_new_session=True.
+    :param deadline: czas (time.monotonic) zakończenia oczekiwania.
+    :return: krotka (kod wyjścia, czas procesora (timedelta), True, jeżeli proces został przerwany).
+    """
+    timed_out = False
+    while True:
+        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        if pid:
+            break
+        if time.monotonic() >= deadline:
+            timed_out = True
+            _kill(process)
+            _, status, usage = os.wait4(process.pid, 0)
+            break
+        time.sleep(0.001)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, timedelta(seconds=usage.ru_utime + usage.ru_stime), timed_out
+
+
+def judge_test(test, command, workdir, checker=None, time_limit=None):
+    """
+    Uruchamia skompilowane rozwiązanie dla testu automatycznego i wyznacza status wyniku. Wyjście rozwiązania jest
+    porównywane z oczekiwanym wyjściem (compare) lub oceniane programem sprawdzającym (check_output). Dla zadań
+    interaktywnych rozwiązanie uruchamiane jest z interaktorem (run_interactive). Czas działania programu
+    sprawdzającego zapisywany jest osobno (checker_runtime). Wynik zawiera tylko początek i koniec wyjścia programu
+    (OutputCapture.excerpt).
+
+    :param test: model testu automatycznego.
+    :param command: polecenie uruchomienia rozwiązania.
+    :param workdir: katalog roboczy z rozwiązaniem.
+    :param checker: Checker lub None (porównanie wyjść).
+    :param time_limit: limit czasu (timedelta). Domyślnie: test.max_time.
+    :return: niezapisany model wyniku testu (bez rozwiązania).
+    """
+    with tempfile.TemporaryDirectory(prefix='test-') as testdir:
+        return _judge_test(test, command, workdir, checker, (time_limit or test.max_time).total_seconds(), testdir)
+
+
+def _judge_test(test, command, workdir, checker, time_limit, testdir):
+    """
+    Ocenia rozwiązanie testem (zob. judge_test). Plik wejściowy, oczekiwane wyjście i wyjście rozwiązania dla
+    programu sprawdzającego zapisywane są w katalogu testdir (dostępnym tylko dla użytkownika procesu
+    oceniającego) poza katalogiem roboczym rozwiązania. Rozwiązanie nie może ich odczytać ani zmienić tylko, jeżeli
+    działa jako inny użytkownik (settings.JUDGE_SANDBOX_USER) - w przeciwnym wypadku może otworzyć je pełną ścieżką.
+
+    :param time_limit: limit czasu w sekundach.
+    :param testdir: katalog plików testu.
+    """
+    input_path = None
+    if test.input or checker is not None:
+        input_path = os.path.join(testdir, 'input.txt')
+        if test.input:
+            _materialize(test.input, input_path)
+        else:
+            open(input_path, 'wb').close()
+    expected_path = None
+    if checker is not None:
+        expected_path = os.path.join(testdir, 'expected.txt')
+        _materialize(test.expected_output, expected_path)
+
+    if checker is not None and checker.interactive:
+        return _judge_interactive(test, command, workdir, checker, input_path, expected_path, time_limit)
+
+    result = run(command, input_path, time_limit, workdir, sandbox=True)
+    checker_runtime, message = timedelta(0), ''
+    try:
+        if result.output.exceeded or result.errors.exceeded:
+            status = AutomatedTestResult.TestStatus.OUTPUT_LIMIT_EXCEEDED
+        elif result.timed_out:
+            status = AutomatedTestResult.TestStatus.TIME_EXCEEDED_ERROR
+        elif result.exit_code != 0:
+            status = AutomatedTestResult.TestStatus.RUNTIME_ERROR
+        elif checker is not None:
+            status, checker_runtime, message = check_output(checker, input_path, result.output, expected_path,
+                                                            testdir)
+        else:
+            with test.expected_output.storage.open(test.expected_output.name, 'rb') as expected:
+                passed = compare(result.output.open(), expected)
+            status = AutomatedTestResult.TestStatus.PASSED if passed else AutomatedTestResult.TestStatus.FAILED
+
+        test_result = AutomatedTestResult(test=test, status=status, runtime=result.runtime,
+                                          checker_runtime=checker_runtime, checker_message=message)
+        test_result.set_output(result.output.excerpt())
+        return test_result
+    finally:
+        result.output.close()
+
+
+def _judge_interactive(test, command, workdir, checker, input_path, expected_path, time_limit):
+    """
+    Ocenia rozwiązanie interaktywne. Błąd interaktora ma pierwszeństwo, następnie przekroczenie limitu czasu przez
+    rozwiązanie i odrzucenie odpowiedzi przez interaktor (rozwiązanie może wtedy zakończyć się błędem zapisu do
+    zamkniętego potoku), a na końcu błąd wykonania rozwiązania.
+
+    :return: niezapisany model wyniku testu (bez rozwiązania). Wyjście zawiera wyjście błędów interaktora.
+    """
+    result, exit_code, checker_runtime, checker_timed_out, errors = run_interactive(
+        command, checker, input_path, expected_path, time_limit, workdir)
+    status = _checker_status(exit_code, checker_timed_out)
+    if status != AutomatedTestResult.TestStatus.CHECKER_ERROR:
+        if result.timed_out:
+            status = AutomatedTestResult.TestStatus.TIME_EXCEEDED_ERROR
+        elif status == AutomatedTestResult.TestStatus.PASSED and result.exit_code != 0:
+            status = AutomatedTestResult.TestStatus.RUNTIME_ERROR
+
+    test_result = AutomatedTestResult(test=test, status=status, runtime=result.runtime,
+                                      checker_runtime=checker_runtime, checker_message=_message(errors))
+    test_result.set_output(errors.excerpt())
+    return test_result
+
+
+def compile_solution(solution, workdir):
+    """
+    Zapisuje kod źródłowy rozwiązania w katalogu roboczym i kompiluje go. Katalog roboczy przekazywany jest
+    użytkownikowi settings.JUDGE_SANDBOX_USER, który uruchamia kompilator i rozwiązanie.
+
+    :param solution: model rozwiązania.
+    :param workdir: katalog roboczy.
+    :return: krotka (polecenie uruchomienia lub None, jeżeli kompilacja się nie powiodła, wynik kompilacji RunResult
+        lub None dla języków bez kompilacji).
+    """
+    language = LANGUAGES[solution.programming_language]
+    sandbox = _sandbox()
+    if sandbox:
+        os.chown(workdir, sandbox['user'], sandbox['group'])
+    _materialize(solution.source_code, os.path.join(workdir, language.source))
+    if language.compile is None:
+        return language.run, None
+
+    result = run(language.compile, None, COMPILE_TIME_LIMIT, workdir, sandbox=True)
+    result.output.close()
+    success = result.exit_code == 0 and not result.timed_out and not result.errors.exceeded
+    return (language.run if success else None), result
+
+
+def evaluate_solution(solution, progress=None):
+    """
+    Ocenia rozwiązanie wszystkimi testami automatycznymi zadania bez zapisywania wyników. Jeżeli kompilacja się nie
+    powiedzie, każdy test otrzymuje status COMPILATION_ERROR, a wynik zawiera komunikat kompilatora. Jeżeli nie można
+    przygotować programu sprawdzającego zadania, każdy test otrzymuje status CHECKER_ERROR. Testy z limitem czasu dla
+    języka rozwiązania (TestTimeLimit) oceniane są z tym limitem zamiast AutomatedTest.max_time.
+
+    :param solution: model rozwiązania.
+    :param progress: opcjonalna funkcja bez argumentów wywoływana przed i po kompilacji oraz po każdym teście (np.
+        przedłużenie dzierżawy zadania oceny). Wyjątek funkcji przerywa ocenę.
+    :return: lista niezapisanych wyników testów.
+    """
+    tests = AutomatedTest.objects.filter(task_id=solution.task_id).order_by('id')
+    time_limits = dict(TestTimeLimit.objects.filter(test__task_id=solution.task_id,
+                                                    programming_language=solution.programming_language)
+                       .values_list('test_id', 'max_time'))
+    results = []
+    with tempfile.TemporaryDirectory(prefix='judge-') as workdir:
+        try:
+            checker, checker_error = prepare_checker(solution.task), None
+        except CheckerError as error:
+            checker, checker_error = None, str(error)
+        if progress is not None:
+            progress()
+        command, compilation = compile_solution(solution, workdir) if checker_error is None else (None, None)
+        if progress is not None:
+            progress()
+        for test in tests:
+            if checker_error is not None:
+                result = AutomatedTestResult(test=test, status=AutomatedTestResult.TestStatus.CHECKER_ERROR,
+                                             runtime=timedelta(0), checker_message=checker_error[:CHECKER_MESSAGE_SIZE])
+                result.set_output(checker_error.encode())
+            elif command is None:
+                result = AutomatedTestResult(test=test, status=AutomatedTestResult.TestStatus.COMPILATION_ERROR,
+                                             runtime=timedelta(0))
+                result.set_output(compilation.errors.excerpt())
+            else:
+                result = judge_test(test, command, workdir, checker, time_limits.get(test.id))
+                if progress is not None:
+                    progress()
+            result.solution = solution
+            results.append(result)
+    return results
+
+
+def save_results(solution, results):
+    """
+    Zastępuje wyniki testów rozwiązania nowymi wynikami (bulk_create).
+
+    :param solution: model rozwiązania.
+    :param results: lista niezapisanych wyników testów.
+    :return: lista zapisanych wyników testów.
+    """
+    AutomatedTestResult.objects.filter(solution=solution).delete()
+    return AutomatedTestResult.objects.bulk_create(results)
+
+
+def judge_solution(solution):
+    """
+    Ocenia rozwiązanie wszystkimi testami automatycznymi zadania (evaluate_solution) i zapisuje wyniki. Poprzednie
+    wyniki rozwiązania są usuwane.
+
+    :param solution: model rozwiązania.
+    :return: lista zapisanych wyników testów.
+    """
+    return save_results(solution, evaluate_solution(solution))
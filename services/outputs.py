@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.db import transaction
+
+from buzkashi_app.models import AutomatedTestResult
+from services.cache import PartitionedCache
+
+expected_output_cache = PartitionedCache(max_entries=512, max_partitions=1)
+"""
+Pamięć podręczna początków plików oczekiwanego wyjścia testów (zob. expected_output) według nazwy pliku. Nazwy
+plików nie są ponownie używane dla innej zawartości (zob. buzkashi_app.storage), więc wpisy nie wymagają
+unieważniania.
+"""
+
+EXPECTED_OUTPUT_HEAD_SIZE = 64 * 1024
+"""Maksymalny rozmiar wyświetlanego początku oczekiwanego wyjścia w bajtach."""
+
+BATCH_SIZE = 500
+"""Liczba wyników testów zapisywanych w bazie danych jednym zapytaniem."""
+
+
+def expected_output(test):
+    """
+    Zwraca początek oczekiwanego wyjścia testu do wyświetlenia: co najwyżej EXPECTED_OUTPUT_HEAD_SIZE pierwszych
+    bajtów pliku, a jeżeli plik jest większy - również informację o liczbie pominiętych bajtów (jak
+    services.judge.OutputCapture.excerpt). Plik nie jest czytany w całości, a wynik przechowywany jest w pamięci
+    podręcznej, więc wyświetlenie wyników kolejnych rozwiązań nie wymaga odczytu pliku.
+
+    :param test: model testu automatycznego.
+    :return: początek oczekiwanego wyjścia (bajty).
+    :raise FileNotFoundError: jeżeli plik nie istnieje.
+    """
+    name = test.expected_output.name
+    content = expected_output_cache.get('expected', name)
+    if content is None:
+        with test.expected_output.open('rb') as file:
+            content = file.read(EXPECTED_OUTPUT_HEAD_SIZE + 1)
+        if len(content) > EXPECTED_OUTPUT_HEAD_SIZE:
+            content = content[:EXPECTED_OUTPUT_HEAD_SIZE]
+            skipped = test.expected_output.size - len(content)
+            content += f'\n[... pominięto {skipped} B ...]\n'.encode()
+        expected_output_cache.set('expected', name, content)
+    return content
+
+
+def inline_outputs(batch_size=BATCH_SIZE):
+    """
+    Przenosi wyjścia programów nie większe niż settings.TEST_OUTPUT_INLINE_MAX_SIZE z plików do wierszy wyników
+    testów (zob. AutomatedTestResult.set_output). Wyniki pobierane są iteratorem i zapisywane partiami
+    (bulk_update). Liczba odwołań do przeniesionych plików jest zmniejszana - pliki usuwa komenda gc_blobs.
+
+    :param batch_size: liczba wyników zapisywanych jednym zapytaniem.
+    :return: krotka (liczba przeniesionych wyjść, liczba brakujących plików).
+    """
+    results = AutomatedTestResult.objects.filter(output_inline__isnull=True).exclude(output='') \
+        .only('id', 'output').order_by('id')
+
+    moved, missing, batch, released = 0, 0, [], []
+
+    def flush():
+        with transaction.atomic():
+            AutomatedTestResult.objects.bulk_update(batch, ['output', 'output_inline'])
+            for name in released:
+                AutomatedTestResult.output.field.storage.delete(name)
+        batch.clear()
+        released.clear()
+
+    for result in results.iterator(batch_size):
+        name = result.output.name
+        try:
+            if result.output.size > settings.TEST_OUTPUT_INLINE_MAX_SIZE:
+                continue
+            content = result.read_output()
+        except FileNotFoundError:
+            missing += 1
+            continue
+
+        result.set_output(content)
+        batch.append(result)
+        released.append(name)
+        moved += 1
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return moved, missing
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import posixpath
+import zipfile
+from datetime import timedelta
+
+from django.core.files import File
+from django.db import transaction
+
+from buzkashi_app.models import Task, AutomatedTest
+from services import statements
+
+FORMAT_VERSION = 1
+"""Wersja formatu pakietu zadania."""
+
+MANIFEST = 'manifest.json'
+"""Nazwa pliku manifestu w archiwum pakietu."""
+
+STATEMENT = 'statement.md'
+"""Nazwa pliku treści zadania w archiwum pakietu."""
+
+MAX_MANIFEST_SIZE = 16 * 1024 * 1024
+"""Maksymalny rozmiar manifestu w bajtach."""
+
+CHUNK_SIZE = 64 * 1024
+"""Rozmiar fragmentu pliku testu kopiowanego jednorazowo w bajtach."""
+
+BATCH_SIZE = 500
+"""Liczba testów zapisywanych w bazie danych jednym zapytaniem."""
+
+FILES = (('input', 'in'), ('expected_output', 'out'))
+"""Pola plików testu i rozszerzenia odpowiadających im plików w archiwum."""
+
+storage = AutomatedTest._meta.get_field('expected_output').storage
+"""Magazyn plików testów."""
+
+
+class PackageError(ValueError):
+    """
+    Błąd niepoprawnego pakietu zadania. Komunikat jest przeznaczony dla użytkownika.
+    """
+
+
+class _Stream:
+    """
+    Nieprzewijalny strumień dla zipfile.ZipFile gromadzący zapisane bajty do czasu ich pobrania metodą drain.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """
+        :return: bajty zapisane od poprzedniego wywołania.
+        """
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _copy(source, target, digest):
+    """
+    Kopiuje plik fragmentami, aktualizując skrót.
+
+    :param source: plik źródłowy.
+    :param target: plik docelowy lub None (tylko wyliczenie skrótu).
+    :param digest: obiekt skrótu hashlib.
+    :return: generator liczby skopiowanych bajtów po każdym fragmencie.
+    """
+    for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+        if target is not None:
+            target.write(chunk)
+        yield len(chunk)
+
+
+def export_package(task):
+    """
+    Generator fragmentów archiwum zip pakietu zadania. Archiwum zawiera treść zadania (STATEMENT), pliki testów
+    automatycznych (tests/<numer>.in i tests/<numer>.out) oraz manifest (MANIFEST) z tytułem zadania, listą testów
+    i skrótami SHA-256 plików. Pliki testów są kopiowane fragmentami, a każdy skompresowany fragment jest od razu
+    zwracany, więc zużycie pamięci nie zależy od rozmiaru testów. Manifest zapisywany jest na końcu archiwum,
+    ponieważ zawiera skróty wyliczane podczas kopiowania.
+
+    :param task: model zadania.
+    :return: generator bajtów.
+    """
+    stream = _Stream()
+    tests = []
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(STATEMENT, task.body)
+        yield stream.drain()
+
+        for number, test in enumerate(AutomatedTest.objects.filter(task=task).order_by('id').iterator(), 1):
+            entry = {'title': test.title, 'max_time': test.max_time.total_seconds()}
+            for field, extension in FILES:
+                file = getattr(test, field)
+                if not file:
+                    entry[field] = entry[f'{field}_sha256'] = None
+                    continue
+
+                name = f'tests/{number}.{extension}'
+                digest = hashlib.sha256()
+                with file.open('rb') as source, archive.open(name, 'w', force_zip64=True) as target:
+                    for _ in _copy(source, target, digest):
+                        yield stream.drain()
+                entry[field], entry[f'{field}_sha256'] = name, digest.hexdigest()
+            tests.append(entry)
+            yield stream.drain()
+
+        manifest = {'format': FORMAT_VERSION, 'title': task.title, 'statement': STATEMENT, 'tests': tests}
+        archive.writestr(MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=2))
+    yield stream.drain()
+
+
+def read_manifest(archive):
+    """
+    Czyta i sprawdza manifest pakietu zadania.
+
+    :param archive: otwarte archiwum zipfile.ZipFile.
+    :return: manifest (słownik).
+    :raise PackageError: jeżeli manifest nie istnieje lub jest niepoprawny.
+    """
+    try:
+        info = archive.getinfo(MANIFEST)
+    except KeyError:
+        raise PackageError('Archiwum nie zawiera manifestu')
+    if info.file_size > MAX_MANIFEST_SIZE:
+        raise PackageError('Manifest jest zbyt duży')
+
+    try:
+        manifest = json.loads(archive.read(info).decode('utf-8'))
+    except ValueError:
+        raise PackageError('Manifest nie jest poprawnym plikiem JSON')
+
+    if not isinstance(manifest, dict) or manifest.get('format') != FORMAT_VERSION:
+        raise PackageError(f'Nieobsługiwana wersja formatu pakietu (oczekiwana: {FORMAT_VERSION})')
+    if not isinstance(manifest.get('title'), str) or not isinstance(manifest.get('tests'), list):
+        raise PackageError('Manifest nie zawiera tytułu zadania lub listy testów')
+
+    names = set(archive.namelist())
+    for number, entry in enumerate(manifest['tests'], 1):
+        if not isinstance(entry, dict) or not entry.get('expected_output'):
+            raise PackageError(f'Test {number} nie ma pliku z oczekiwanym wyjściem')
+        for field, _ in FILES:
+            if entry.get(field) is not None and entry[field] not in names:
+                raise PackageError(f'Archiwum nie zawiera pliku {entry[field]} (test {number})')
+        if not isinstance(entry.get('max_time', 1), (int, float)) or entry.get('max_time', 1) <= 0:
+            raise PackageError(f'Test {number} ma niepoprawny limit czasu')
+    return manifest
+
+
+def _existing_file(digest):
+    """
+    :param digest: skrót SHA-256 pliku.
+    :return: ścieżka zapisanego pliku testu o tym skrócie lub None.
+    """
+    for field, _ in FILES:
+        name = AutomatedTest.objects.filter(**{f'{field}_hash': digest}).values_list(field, flat=True).first()
+        if name and storage.exists(name):
+            return name
+    return None
+
+
+def _store(archive, member, expected_digest, known):
+    """
+    Zapisuje plik testu z archiwum w magazynie plików, chyba że plik o tym samym skrócie SHA-256 jest już zapisany
+    (w bazie danych lub wcześniej w tym samym imporcie) - wtedy zwracana jest ścieżka istniejącego pliku, a liczba
+    odwołań do niego jest zwiększana (zob. buzkashi_app.storage). Skrót wyliczany jest przed zapisaniem pliku,
+    więc nowy plik jest czytany z archiwum fragmentami dwukrotnie, ale nigdy nie jest przechowywany w całości
+    w pamięci.
+
+    :param archive: otwarte archiwum.
+    :param member: nazwa pliku w archiwum.
+    :param expected_digest: skrót z manifestu lub None.
+    :param known: słownik skrót -> ścieżka plików zapisanych w tym imporcie.
+    :return: krotka (ścieżka pliku, skrót).
+    :raise PackageError: jeżeli skrót pliku nie zgadza się ze skrótem z manifestu.
+    """
+    digest = hashlib.sha256()
+    with archive.open(member) as source:
+        for _ in _copy(source, None, digest):
+            pass
+    digest = digest.hexdigest()
+    if expected_digest is not None and expected_digest != digest:
+        raise PackageError(f'Skrót pliku {member} nie zgadza się z manifestem')
+
+    name = known.get(digest) or _existing_file(digest)
+    if name is None:
+        upload_to = AutomatedTest._meta.get_field('expected_output').upload_to
+        with archive.open(member) as source:
+            name = storage.save(posixpath.join(upload_to, f'{digest[:16]}_{posixpath.basename(member)}'),
+                                File(source))
+    else:
+        storage.retain(name)
+    known[digest] = name
+    return name, digest
+
+
+def import_package(file, author, title=None, batch_size=BATCH_SIZE):
+    """
+    Tworzy zadanie z pakietu zadania (zob. export_package). Pliki testów kopiowane są z archiwum do magazynu
+    plików fragmentami, a testy zapisywane są w bazie danych partiami (bulk_create), więc zużycie pamięci nie zależy
+    od rozmiaru testów. Pliki identyczne z już zapisanymi plikami testów (według skrótu SHA-256) nie są zapisywane
+    ponownie. W przypadku błędu zadanie nie jest tworzone - nowo zapisane pliki nie mają odwołań i usuwa je
+    komenda gc_blobs.
+
+    :param file: ścieżka lub przewijalny plik archiwum.
+    :param author: model sędziego - autora zadania.
+    :param title: opcjonalny tytuł zadania. Domyślnie tytuł z manifestu.
+    :param batch_size: liczba testów zapisywanych w bazie danych jednym zapytaniem.
+    :return: model utworzonego zadania.
+    :raise PackageError: jeżeli pakiet jest niepoprawny lub zadanie o tym tytule już istnieje.
+    """
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        raise PackageError('Plik nie jest archiwum zip')
+
+    with archive, transaction.atomic():
+        manifest = read_manifest(archive)
+        title = title or manifest['title']
+        if Task.objects.filter(title=title).exists():
+            raise PackageError(f'Zadanie o tytule "{title}" już istnieje')
+
+        statement = manifest.get('statement', STATEMENT)
+        try:
+            body = archive.read(statement).decode('utf-8') if statement in archive.namelist() else ''
+        except UnicodeDecodeError:
+            raise PackageError('Treść zadania nie jest zapisana w UTF-8')
+        task = Task(title=title, body=body, author=author)
+        statements.update_statement(task)
+        task.save()
+
+        known, batch = {}, []
+        for entry in manifest['tests']:
+            test = AutomatedTest(title=entry.get('title'), task=task,
+                                 max_time=timedelta(seconds=entry.get('max_time', 1)))
+            for field, _ in FILES:
+                if entry.get(field) is not None:
+                    name, digest = _store(archive, entry[field], entry.get(f'{field}_sha256'), known)
+                    setattr(test, field, name)
+                    setattr(test, f'{field}_hash', digest)
+            batch.append(test)
+            if len(batch) >= batch_size:
+                AutomatedTest.objects.bulk_create(batch)
+                batch = []
+        AutomatedTest.objects.bulk_create(batch)
+    return task
@@ -0,0 +1,193 @@
+import hashlib
+import logging
+import re
+from collections import Counter, namedtuple
+from itertools import combinations, groupby
+
+from buzkashi_app.models import Solution, SolutionFingerprint
+
+logger = logging.getLogger(__name__)
+
+K = 8
+"""Długość fragmentu (k-gramu) znormalizowanego kodu w tokenach."""
+
+WINDOW = 6
+"""Rozmiar okna algorytmu winnowing. Wspólny fragment o długości co najmniej K + WINDOW - 1 tokenów jest zawsze
+wykrywany."""
+
+MAX_POSTING = 50
+"""
+Maksymalna liczba rozwiązań o wspólnym skrócie. Częstsze skróty (np. szablon wczytywania danych) są pomijane
+podczas wyszukiwania par - ogranicza to liczbę porównań, więc czas wyszukiwania jest prawie liniowy.
+"""
+
+CHUNK_SIZE = 5000
+"""Liczba odcisków pobieranych z bazy danych jednym zapytaniem iteratora."""
+
+CandidatePair = namedtuple('CandidatePair', ['similarity', 'first', 'second', 'shared'])
+"""Para podobnych rozwiązań: podobieństwo (0-1), id rozwiązań oraz liczba wspólnych odcisków."""
+
+_KEYWORDS = {
+    Solution.ProgrammingLanguage.JAVA: 'abstract boolean break byte case catch char class continue default do '
+                                       'double else extends final finally float for if implements import int interface '
+                                       'long new null private protected public return short static super switch '
+                                       'this throw throws try void while',
+    Solution.ProgrammingLanguage.CPP: 'auto bool break case catch char class const continue default delete do '
+                                      'double else enum float for if include int long namespace new nullptr '
+                                      'private public return short signed sizeof static struct switch template '
+                                      'this throw try typedef unsigned using void while',
+    Solution.ProgrammingLanguage.CS: 'abstract bool break byte case catch char class const continue default do '
+                                     'double else enum float for foreach if in int interface long namespace new '
+                                     'null private protected public return short static string struct switch this '
+                                     'throw try using var void while',
+    Solution.ProgrammingLanguage.PYTHON: 'and as break class continue def del elif else except False finally for '
+                                         'from global if import in is lambda None nonlocal not or pass raise '
+                                         'return True try while with yield',
+}
+"""Słowa kluczowe języków programowania - pozostałe identyfikatory są zastępowane jednym tokenem."""
+
+_COMMENTS = {
+    Solution.ProgrammingLanguage.JAVA: r'//[^\n]*|/\*.*?\*/',
+    Solution.ProgrammingLanguage.CPP: r'//[^\n]*|/\*.*?\*/',
+    Solution.ProgrammingLanguage.CS: r'//[^\n]*|/\*.*?\*/',
+    Solution.ProgrammingLanguage.PYTHON: r'#[^\n]*',
+}
+"""Wyrażenia regularne komentarzy według języka programowania."""
+
+_TOKEN_PATTERNS = {
+    language: re.compile(rf'(?P<comment>{comments})'
+                         r'|(?P<string>"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')'
+                         r'|(?P<word>[A-Za-z_]\w*)'
+                         r'|(?P<number>\d+(?:\.\d+)?)'
+                         r'|(?P<symbol>\S)', re.DOTALL)
+    for language, comments in _COMMENTS.items()
+}
+"""Wyrażenia regularne tokenizujące kod źródłowy według języka programowania."""
+
+_KEYWORD_SETS = {language: frozenset(keywords.split()) for language, keywords in _KEYWORDS.items()}
+
+
+def tokenize(source, language):
+    """
+    Zamienia kod źródłowy na ciąg znormalizowanych tokenów. Komentarze i białe znaki są pomijane, identyfikatory
+    (oprócz słów kluczowych) zastępowane są tokenem V, literały liczbowe - tokenem N, a napisy - tokenem S,
+    więc zmiana nazw zmiennych, komentarzy czy formatowania nie zmienia wyniku.
+
+    :param source: kod źródłowy.
+    :param language: język programowania z enumeratora Solution.ProgrammingLanguage.
+    :return: lista tokenów.
+    """
+    keywords = _KEYWORD_SETS[language]
+    tokens = []
+    for match in _TOKEN_PATTERNS[language].finditer(source):
+        kind = match.lastgroup
+        if kind == 'word':
+            word = match.group()
+            tokens.append(word if word in keywords else 'V')
+        elif kind == 'symbol':
+            tokens.append(match.group())
+        elif kind == 'number':
+            tokens.append('N')
+        elif kind == 'string':
+            tokens.append('S')
+    return tokens
+
+
+def _hash(kgram, language):
+    """
+    :param kgram: krotka tokenów.
+    :param language: język programowania - skróty różnych języków są rozłączne.
+    :return: 64-bitowy skrót ze znakiem (zgodny z BigIntegerField).
+    """
+    digest = hashlib.blake2b(f'{language}\0{" ".join(kgram)}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def fingerprint(source, language):
+    """
+    Wylicza odciski kodu źródłowego algorytmem winnowing: ze skrótów kolejnych k-gramów tokenów w każdym oknie
+    WINDOW skrótów wybierany jest najmniejszy.
+
+    :param source: kod źródłowy.
+    :param language: język programowania z enumeratora Solution.ProgrammingLanguage.
+    :return: zbiór odcisków. Pusty dla kodu krótszego niż K tokenów.
+    """
+    tokens = tokenize(source, language)
+    hashes = [_hash(tuple(tokens[index:index + K]), language) for index in range(len(tokens) - K + 1)]
+    if len(hashes) <= WINDOW:
+        return {min(hashes)} if hashes else set()
+
+    return {min(hashes[index:index + WINDOW]) for index in range(len(hashes) - WINDOW + 1)}
+
+
+def index_solution(solution, content=None):
+    """
+    Zapisuje odciski rozwiązania w odwróconym indeksie (SolutionFingerprint). Poprzednie odciski rozwiązania
+    są usuwane.
+
+    :param solution: model rozwiązania.
+    :param content: opcjonalna zawartość pliku kodu źródłowego. Domyślnie plik czytany jest z magazynu plików.
+    :return: liczba zapisanych odcisków.
+    """
+    if content is None:
+        with solution.source_code.open('rb') as source:
+            content = source.read()
+
+    hashes = fingerprint(content.decode('utf-8', errors='replace'), solution.programming_language)
+    SolutionFingerprint.objects.filter(solution=solution).delete()
+    SolutionFingerprint.objects.bulk_create(
+        [SolutionFingerprint(solution_id=solution.id, task_id=solution.task_id, hash=value) for value in hashes])
+    return len(hashes)
+
+
+def index_safely(solution, content=None):
+    """
+    Wywołuje index_solution, zapisując w logach błąd odczytu pliku zamiast go zgłaszać - indeksowanie nie może
+    przerwać zgłoszenia rozwiązania. Nieindeksowane rozwiązania indeksuje komenda index_fingerprints.
+
+    :param solution: model rozwiązania.
+    :param content: opcjonalna zawartość pliku kodu źródłowego.
+    """
+    try:
+        index_solution(solution, content)
+    except (OSError, ValueError):
+        logger.exception('Nie udało się wyliczyć odcisków rozwiązania %s', solution.id)
+
+
+def find_candidates(task, threshold=0.5, limit=100):
+    """
+    Wyszukuje pary podobnych rozwiązań różnych zespołów dla zadania. Odciski zadania pobierane są jednym
+    zapytaniem uporządkowanym według skrótu, więc rozwiązania o wspólnym skrócie są kolejnymi wierszami.
+    Porównywane są tylko rozwiązania ze wspólnymi odciskami (bez porównywania wszystkich par).
+    Podobieństwo to współczynnik Jaccarda zbiorów odcisków. Dla każdej pary zespołów zwracana jest jedna,
+    najbardziej podobna para rozwiązań.
+
+    :param task: model zadania.
+    :param threshold: minimalne podobieństwo.
+    :param limit: maksymalna liczba zwracanych par.
+    :return: lista CandidatePair uporządkowana malejąco według podobieństwa.
+    """
+    rows = SolutionFingerprint.objects.filter(task=task).order_by('hash') \
+        .values_list('hash', 'solution_id', 'solution__author_id')
+
+    sizes = Counter()
+    shared = Counter()
+    teams = {}
+    for _, posting in groupby(rows.iterator(CHUNK_SIZE), key=lambda row: row[0]):
+        posting = [(solution_id, team_id) for _, solution_id, team_id in posting]
+        sizes.update(solution_id for solution_id, _ in posting)
+        if len(posting) > MAX_POSTING:
+            continue
+        for (first, first_team), (second, second_team) in combinations(sorted(posting), 2):
+            if first_team != second_team:
+                shared[first, second] += 1
+                teams[first], teams[second] = first_team, second_team
+
+    best = {}
+    for (first, second), count in shared.items():
+        pair = CandidatePair(count / (sizes[first] + sizes[second] - count), first, second, count)
+        key = frozenset((teams[first], teams[second]))
+        if pair.similarity >= threshold and (key not in best or pair > best[key]):
+            best[key] = pair
+
+    return sorted(best.values(), reverse=True)[:limit]
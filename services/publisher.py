@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from services.scoreboard import load_rank
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_ARTIFACTS = ('public.json', 'public.html')
+"""
+Pliki rankingu widocznego dla gości publikowane dla każdych zawodów w katalogu SCOREBOARD_ROOT/<id zawodów>/:
+ranking zamrożony, jeżeli ranking jest zamrożony, w przeciwnym wypadku aktualny. Katalog SCOREBOARD_ROOT może być
+serwowany bez uwierzytelniania.
+"""
+
+JUDGE_ARTIFACTS = ('rank.json', 'rank.html', 'rank_frozen.json', 'rank_frozen.html')
+"""
+Pliki rankingu aktualnego i zamrożonego publikowane dla każdych zawodów w katalogu SCOREBOARD_JUDGE_ROOT/<id zawodów>/.
+Ranking aktualny zawiera wyniki ukryte podczas zamrożenia, więc pliki są dostępne tylko dla sędziów.
+"""
+
+ARTIFACTS = JUDGE_ARTIFACTS + PUBLIC_ARTIFACTS
+"""Wszystkie pliki publikowane dla każdych zawodów."""
+
+
+def competition_dir(competition_id, artifact='public.json'):
+    """
+    Zwraca katalog opublikowanych rankingów zawodów.
+
+    :param competition_id: id zawodów.
+    :param artifact: nazwa pliku z ARTIFACTS.
+    :return: ścieżka katalogu.
+    """
+    root = settings.SCOREBOARD_ROOT if artifact in PUBLIC_ARTIFACTS else settings.SCOREBOARD_JUDGE_ROOT
+    return os.path.join(root, str(competition_id))
+
+
+def competition_url(competition_id, artifact):
+    """
+    Zwraca adres URL opublikowanego pliku rankingu.
+
+    :param competition_id: id zawodów.
+    :param artifact: nazwa pliku z ARTIFACTS.
+    :return: adres URL.
+    """
+    url = settings.SCOREBOARD_URL if artifact in PUBLIC_ARTIFACTS else settings.SCOREBOARD_JUDGE_URL
+    return f'{url}{competition_id}/{artifact}'
+
+
+def publish(competition):
+    """
+    Publikuje ranking aktualny, zamrożony i publiczny zawodów jako statyczne pliki JSON i HTML (zob. PUBLIC_ARTIFACTS
+    i JUDGE_ARTIFACTS).
+    Każdy plik zapisywany jest najpierw do pliku tymczasowego w tym samym katalogu, a następnie podmieniany
+    atomowo (os.replace), więc serwer nigdy nie odczyta częściowo zapisanego pliku.
+
+    :param competition: model zawodów.
+    """
+
+    rank = load_rank(competition)
+    rank_frozen = load_rank(competition, frozen=True)
+    public = rank_frozen if competition.is_frozen else rank
+    generated = timezone.now().isoformat()
+
+    for name, rows, title in (('rank', rank, 'Ranking aktualny'),
+                              ('rank_frozen', rank_frozen, 'Ranking zamrożony'),
+                              ('public', public, 'Ranking zamrożony' if competition.is_frozen else 'Ranking aktualny')):
+        data = {
+            'competition': competition.id,
+            'title': competition.title,
+            'frozen': name == 'rank_frozen' or (name == 'public' and competition.is_frozen),
+            'generated': generated,
+            'rows': [list(row) for row in rows],
+        }
+        directory = competition_dir(competition.id, f'{name}.json')
+        os.makedirs(directory, exist_ok=True)
+        _write_atomic(directory, f'{name}.json', json.dumps(data, ensure_ascii=False))
+        _write_atomic(directory, f'{name}.html', render_to_string('rank/rank_table.html', {
+            'title': title, 'rows': rows, 'generated': generated,
+        }))
+
+
+def publish_safely(competition):
+    """
+    Publikuje ranking zawodów. Błąd zapisu jest logowany i nie przerywa obsługi żądania.
+
+    :param competition: model zawodów.
+    """
+    try:
+        publish(competition)
+    except OSError:
+        logger.exception('Nie udało się opublikować rankingu zawodów %s', competition.id)
+
+
+def _write_atomic(directory, name, content):
+    """
+    Zapisuje plik atomowo: do pliku tymczasowego w tym samym katalogu, a następnie zmienia jego nazwę.
+
+    :param directory: katalog docelowy.
+    :param name: nazwa pliku.
+    :param content: zawartość pliku.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp:
+            tmp.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, os.path.join(directory, name))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
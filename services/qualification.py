@@ -0,0 +1,166 @@
+from collections import Counter, namedtuple
+
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage
+from django.db import transaction
+
+from buzkashi_app.models import Team, Participant
+
+QualificationResult = namedtuple('QualificationResult', ['qualified', 'added', 'removed', 'unsent'])
+"""
+Wynik kwalifikacji: zbiór id zakwalifikowanych zespołów, listy zespołów dodanych i usuniętych względem obecnego
+stanu oraz lista zespołów, do których nie udało się wysłać danych logowania.
+"""
+
+PASSWORD_LENGTH = 12
+"""Długość losowego hasła konta zespołu."""
+
+CREDENTIALS_SUBJECT = 'Zespół {team} zakwalifikowany na zawody {competition}'
+"""Temat wiadomości z danymi logowania zespołu."""
+
+CREDENTIALS_BODY = '''Zespół {team} został zakwalifikowany na zawody {competition}.
+
+Dane logowania do konta zespołu:
+login: {username}
+hasło: {password}
+'''
+"""Treść wiadomości z danymi logowania zespołu."""
+
+
+def select_qualified(teams, max_teams, institution_quota=None):
+    """
+    Wybiera zespoły zakwalifikowane na zawody. Zespoły są porządkowane według priorytetu (mniejsza wartość
+    oznacza wyższy priorytet) i daty zgłoszenia, a następnie wybierane kolejno do wyczerpania limitu max_teams.
+    Jeżeli podano institution_quota, placówka edukacyjna może wystawić co najwyżej tyle zespołów.
+    Zdyskwalifikowane zespoły i zespoły z listy rezerwowej (bez przydzielonego miejsca, zob.
+    Competition.reserve_slot) są pomijane.
+
+    :param teams: modele zespołów-kandydatów.
+    :param max_teams: maksymalna liczba zakwalifikowanych zespołów.
+    :param institution_quota: opcjonalny limit zespołów z jednej placówki edukacyjnej.
+    :return: zbiór id zakwalifikowanych zespołów.
+    """
+    candidates = sorted((team for team in teams if not team.is_disqualified and not team.is_waitlisted),
+                        key=lambda team: (team.priority, team.application_date, team.id))
+
+    qualified = set()
+    per_institution = Counter()
+    for team in candidates:
+        if len(qualified) >= max_teams:
+            break
+        if institution_quota is not None and per_institution[team.institution_id] >= institution_quota:
+            continue
+        per_institution[team.institution_id] += 1
+        qualified.add(team.id)
+
+    return qualified
+
+
+def qualify(competition, institution_quota=None, dry_run=False):
+    """
+    Przeprowadza kwalifikację zespołów na zawody. Wszystkie zespoły zawodów są pobierane jednym zapytaniem.
+    Jeżeli dry_run jest równe False, zmienione oznaczenia is_qualified zapisywane są jednym zapytaniem bulk_update,
+    a nowo zakwalifikowane zespoły bez konta otrzymują konta użytkowników tworzone zapytaniem bulk_create.
+    Konta mają losowe hasła, a dane logowania wysyłane są na email kapitana po zapisaniu zmian.
+
+    :param competition: model zawodów.
+    :param institution_quota: opcjonalny limit zespołów z jednej placówki edukacyjnej.
+    :param dry_run: True, jeżeli wynik ma zostać jedynie wyliczony, bez zapisu.
+    :return: QualificationResult.
+    """
+    teams = list(Team.objects.filter(competition=competition)
+                 .only('id', 'name', 'priority', 'application_date', 'is_qualified', 'is_disqualified',
+                       'is_waitlisted', 'institution_id', 'user_id'))
+    qualified = select_qualified(teams, competition.max_teams, institution_quota)
+
+    added = [team for team in teams if team.id in qualified and not team.is_qualified]
+    removed = [team for team in teams if team.id not in qualified and team.is_qualified]
+
+    if not dry_run:
+        with transaction.atomic():
+            for team in added:
+                team.is_qualified = True
+            for team in removed:
+                team.is_qualified = False
+            Team.objects.bulk_update(added + removed, ['is_qualified'], batch_size=500)
+            credentials = _create_users([team for team in added if team.user_id is None])
+        unsent = _send_credentials(competition, credentials)
+    else:
+        unsent = []
+
+    return QualificationResult(qualified, added, removed, unsent)
+
+
+def team_username(team):
+    """
+    Zwraca nazwę konta użytkownika zespołu.
+
+    :param team: model zespołu.
+    :return: nazwa użytkownika.
+    """
+    return f'team-{team.id}'
+
+
+def _create_users(teams):
+    """
+    Tworzy konta użytkowników z losowymi hasłami dla zespołów. Dane konta (imię, nazwisko, email) są danymi
+    kapitana zespołu. Istniejące konta o nazwie zespołu (zob. team_username, np. utworzone przez przerwaną
+    kwalifikację) nie są tworzone ponownie, lecz przypisywane do zespołu i otrzymują nowe hasło.
+
+    :param teams: modele zespołów bez konta użytkownika.
+    :return: lista krotek (zespół, konto użytkownika, hasło).
+    """
+    if not teams:
+        return []
+
+    captains = {participant.team_id: participant
+                for participant in Participant.objects.filter(team__in=teams, is_capitan=True)}
+
+    existing = {user.username: user
+                for user in User.objects.filter(username__in=[team_username(team) for team in teams])}
+
+    credentials, users = [], []
+    for team in teams:
+        user = existing.get(team_username(team))
+        if user is None:
+            captain = captains.get(team.id)
+            user = User(username=team_username(team),
+                        first_name=captain.name if captain else '',
+                        last_name=captain.surname if captain else '',
+                        email=captain.email if captain else '')
+            users.append(user)
+        password = User.objects.make_random_password(PASSWORD_LENGTH)
+        user.set_password(password)
+        credentials.append((team, user, password))
+    User.objects.bulk_create(users, batch_size=500)
+    User.objects.bulk_update(list(existing.values()), ['password'], batch_size=500)
+
+    user_ids = dict(User.objects.filter(username__in=[team_username(team) for team in teams])
+                    .values_list('username', 'id'))
+    for team in teams:
+        team.user_id = user_ids[team_username(team)]
+    Team.objects.bulk_update(teams, ['user'], batch_size=500)
+    return credentials
+
+
+def _send_credentials(competition, credentials):
+    """
+    Wysyła dane logowania kont zespołów na email kapitana.
+
+    :param competition: model zawodów.
+    :param credentials: lista krotek (zespół, konto użytkownika, hasło).
+    :return: lista zespołów, do których nie udało się wysłać wiadomości (brak adresu kapitana lub błąd wysyłki).
+    """
+    unsent = []
+    for team, user, password in credentials:
+        if not user.email:
+            unsent.append(team)
+            continue
+        context = {'team': team.name, 'competition': competition.title, 'username': user.username,
+                   'password': password}
+        try:
+            EmailMessage(CREDENTIALS_SUBJECT.format(**context), CREDENTIALS_BODY.format(**context),
+                         to=[user.email]).send()
+        except OSError:
+            unsent.append(team)
+    return unsent
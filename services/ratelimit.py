@@ -0,0 +1,103 @@
+import math
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'retry_after'])
+"""Wynik sprawdzenia limitu: True, jeżeli zapytanie jest dozwolone, oraz czas w sekundach do kolejnej próby."""
+
+MICROSECONDS = 1000000
+
+
+class RateLimiter:
+    """
+    Ogranicznik liczby zapytań działający jak wiadro żetonów (token bucket) o pojemności rate, napełniane
+    jednym żetonem co period / rate sekund. Zaimplementowany algorytmem GCRA - dla każdego klucza w pamięci
+    podręcznej Django przechowywany jest tylko teoretyczny czas nadejścia kolejnego zapytania (TAT)
+    w mikrosekundach. Zapytanie rezerwuje żeton atomową operacją incr, więc ogranicznik działa poprawnie
+    dla wielu procesów korzystających ze wspólnej pamięci podręcznej (np. memcached, redis) - w typowym przypadku
+    wykonuje dwie operacje na pamięci podręcznej (incr i przedłużenie ważności klucza). Odrzucone zapytanie
+    zwraca rezerwację operacją decr.
+    """
+
+    def __init__(self, name, rate, period, cache_alias=None):
+        """
+        :param name: nazwa ogranicznika - prefiks kluczy w pamięci podręcznej.
+        :param rate: liczba zapytań dozwolonych w okresie (pojemność wiadra).
+        :param period: okres w sekundach.
+        :param cache_alias: nazwa pamięci podręcznej z settings.CACHES. Domyślnie: settings.RATELIMIT_CACHE.
+        """
+        self.name = name
+        self.interval = int(period * MICROSECONDS / rate)
+        self.tolerance = self.interval * rate
+        self.timeout = math.ceil(period) + 1
+        self.cache = caches[cache_alias or settings.RATELIMIT_CACHE]
+
+    def hit(self, *key):
+        """
+        Pobiera żeton dla klucza.
+
+        :param key: elementy klucza (np. id zespołu i id zadania).
+        :return: RateLimitResult.
+        """
+        cache_key = self.make_key(key)
+        now = int(time.time() * MICROSECONDS)
+
+        try:
+            tat = self.cache.incr(cache_key, self.interval)
+        except ValueError:
+            # brak klucza - wiadro jest pełne
+            if self.cache.add(cache_key, now + self.interval, self.timeout):
+                return RateLimitResult(True, 0)
+            tat = self.cache.incr(cache_key, self.interval)
+
+        if tat <= now + self.interval:
+            # wiadro zdążyło się napełnić - TAT nie może być wcześniejszy niż bieżąca chwila
+            self.cache.set(cache_key, now + self.interval, self.timeout)
+            return RateLimitResult(True, 0)
+
+        if tat - now <= self.tolerance:
+            self.cache.touch(cache_key, self.timeout)
+            return RateLimitResult(True, 0)
+
+        self.cache.decr(cache_key, self.interval)
+        return RateLimitResult(False, math.ceil((tat - now - self.tolerance) / MICROSECONDS))
+
+    def refund(self, *key):
+        """
+        Zwraca żeton pobrany metodą hit (np. gdy zapytanie zostało odrzucone przez inny ogranicznik).
+
+        :param key: elementy klucza.
+        """
+        try:
+            self.cache.decr(self.make_key(key), self.interval)
+        except ValueError:
+            pass
+
+    def reset(self, *key):
+        """
+        Napełnia wiadro dla klucza.
+
+        :param key: elementy klucza.
+        """
+        self.cache.delete(self.make_key(key))
+
+    def make_key(self, key):
+        """
+        :param key: elementy klucza.
+        :return: klucz pamięci podręcznej.
+        """
+        return ':'.join(('ratelimit', self.name, *map(str, key)))
+
+
+def get_limiter(name):
+    """
+    Zwraca ogranicznik skonfigurowany w settings.RATE_LIMITS (nazwa -> (liczba zapytań, okres w sekundach)).
+
+    :param name: nazwa ogranicznika.
+    :return: RateLimiter.
+    """
+    rate, period = settings.RATE_LIMITS[name]
+    return RateLimiter(name, rate, period)
@@ -0,0 +1,194 @@
+import csv
+import uuid
+from collections import namedtuple
+from functools import partial
+from io import StringIO
+
+import msgpack
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Count, Q
+
+from buzkashi_app.models import Team, Solution, Competition
+from services.cache import PartitionedCache
+
+RankRow = namedtuple('RankRow', ['position', 'team', 'solved', 'time'])
+"""Wiersz rankingu: pozycja, nazwa zespołu, liczba rozwiązanych zadań, czas."""
+
+rank_cache = PartitionedCache(max_entries=8, max_partitions=16)
+"""Pamięć podręczna rankingów. Każde zawody mają własną partycję."""
+
+RANK_MAGIC = b'BZSB'
+"""Nagłówek binarnego formatu rankingu."""
+
+RANK_VERSION = 1
+"""
+Wersja binarnego formatu rankingu. Plik w wersji 1: RANK_MAGIC, bajt wersji, a następnie tablica msgpack
+wierszy [pozycja, nazwa zespołu, zadania rozwiązane, czas w minutach].
+"""
+
+RANK_EXTENSION = 'bzsb'
+"""Rozszerzenie plików rankingu w formacie binarnym."""
+
+_make_row = partial(tuple.__new__, RankRow)
+"""Tworzy RankRow z krotki bez sprawdzania długości (szybciej niż RankRow._make)."""
+
+
+def load_rank(competition, frozen=False):
+    """
+    Zwraca wiersze rankingu aktualnego lub zamrożonego dla danych zawodów.
+    Wiersze są przechowywane w partycji pamięci podręcznej przypisanej do zawodów, a kluczem jest nazwa pliku
+    rankingu - wgranie nowego pliku zmienia nazwę, więc nieaktualne dane nie są zwracane.
+
+    :param competition: model zawodów.
+    :param frozen: True, jeżeli należy zwrócić ranking zamrożony.
+    :return: krotka wierszy RankRow. Pusta, jeżeli zawody nie mają pliku rankingu.
+    """
+    rank_file = competition.rank_frozen if frozen else competition.rank
+    if not rank_file:
+        return ()
+
+    return rank_cache.get_or_set(competition.id, rank_file.name, lambda: _read_rank(rank_file))
+
+
+def _read_rank(rank_file):
+    """
+    Czyta plik rankingu w formacie binarnym lub csv.
+
+    :param rank_file: plik rankingu (FieldFile).
+    :return: krotka wierszy RankRow.
+    """
+    try:
+        rank_file.open('rb')
+        content = rank_file.read()
+        rank_file.close()
+    except FileNotFoundError:
+        return ()
+
+    return parse_rank(content)
+
+
+def dump_rank(rows):
+    """
+    Serializuje wiersze rankingu do formatu binarnego.
+
+    :param rows: iterowalne wiersze rankingu (RankRow lub krotki).
+    :return: zawartość pliku rankingu.
+    """
+    return RANK_MAGIC + bytes([RANK_VERSION]) + msgpack.packb([tuple(row) for row in rows], use_bin_type=True)
+
+
+def is_binary_rank(content):
+    """
+    Sprawdza, czy zawartość pliku rankingu jest w formacie binarnym.
+
+    :param content: zawartość pliku rankingu.
+    :return: True dla formatu binarnego, False dla csv.
+    """
+    return content[:len(RANK_MAGIC)] == RANK_MAGIC
+
+
+def parse_rank(content):
+    """
+    Deserializuje zawartość pliku rankingu. Obsługuje format binarny oraz format csv (dla wgranych ręcznie plików
+    i plików sprzed wprowadzenia formatu binarnego).
+
+    :param content: zawartość pliku rankingu.
+    :return: krotka wierszy RankRow.
+    """
+    if not is_binary_rank(content):
+        return _parse_csv_rank(content.decode('utf-8-sig'))
+
+    version = content[len(RANK_MAGIC)]
+    if version != RANK_VERSION:
+        raise ValueError(f'Nieobsługiwana wersja formatu rankingu: {version}')
+
+    rows = msgpack.unpackb(content[len(RANK_MAGIC) + 1:], use_list=False, raw=False)
+    return tuple(map(_make_row, rows))
+
+
+def _parse_csv_rank(content):
+    """
+    Deserializuje ranking w formacie csv.
+
+    :param content: zawartość pliku rankingu.
+    :return: krotka wierszy RankRow.
+    """
+    rows = (row for row in csv.reader(StringIO(content), delimiter=',') if len(row) >= 4)
+    return tuple(RankRow(_parse_number(position), team, _parse_number(solved), _parse_number(time))
+                 for position, team, solved, time, *_ in rows)
+
+
+def _parse_number(value):
+    """
+    Zamienia komórkę pliku csv na liczbę całkowitą, jeżeli jest to możliwe.
+
+    :param value: wartość komórki.
+    :return: liczba całkowita lub niezmieniona wartość.
+    """
+    return int(value) if value.isdigit() else value
+
+
+def compute_standings(competition):
+    """
+    Generator wyliczający ranking zawodów na podstawie zaakceptowanych rozwiązań.
+    Zespoły są porządkowane malejąco według liczby rozwiązanych zadań, a następnie rosnąco według czasu
+    (pola Team.score). Zespoły z tą samą liczbą zadań i czasem zajmują tę samą pozycję.
+    Zdyskwalifikowane zespoły oraz zespoły z listy rezerwowej są pomijane. Zespoły pobierane są iteratorem,
+    więc pamięć nie zależy od liczby zespołów.
+
+    :param competition: model zawodów.
+    :return: generator wierszy RankRow. Czas podawany jest w minutach.
+    """
+    teams = Team.objects.filter(competition=competition, is_disqualified=False, is_waitlisted=False) \
+        .annotate(solved=Count('solution__task', distinct=True,
+                               filter=Q(solution__status=Solution.SolutionStatus.ACCEPTED))) \
+        .order_by('-solved', 'score', 'name') \
+        .values_list('name', 'solved', 'score')
+
+    position, previous = 0, None
+    for index, (name, solved, score) in enumerate(teams.iterator(), start=1):
+        if (solved, score) != previous:
+            position, previous = index, (solved, score)
+        yield RankRow(position, name, solved, int(score.total_seconds() // 60))
+
+
+def update_rank(competition):
+    """
+    Wylicza ranking zawodów (compute_standings) i zapisuje go w formacie binarnym w pliku rankingu aktualnego.
+    Dopóki ranking nie jest zamrożony, ten sam ranking zapisywany jest jako ranking zamrożony - po zamrożeniu
+    ranking zamrożony pozostaje bez zmian. Poprzednie pliki rankingów są usuwane.
+    Zapis modelu zawodów wywołuje publikację rankingu (zob. services.publisher).
+    Wiersz zawodów jest blokowany (select_for_update) przed wyliczeniem rankingu, więc równoczesne aktualizacje
+    są wykonywane kolejno i ostatnia zapisana wersja rankingu uwzględnia wszystkie zatwierdzone werdykty.
+
+    :param competition: model zawodów.
+    """
+    with transaction.atomic():
+        locked = Competition.objects.select_for_update().get(id=competition.id)
+        content = dump_rank(compute_standings(locked))
+        fields = ['rank'] if locked.is_frozen else ['rank', 'rank_frozen']
+        save_rank(locked, {field: content for field in fields})
+    competition.rank, competition.rank_frozen = locked.rank, locked.rank_frozen
+
+
+def save_rank(competition, contents):
+    """
+    Zapisuje nowe pliki rankingów zawodów w formacie binarnym i usuwa poprzednie pliki.
+
+    :param competition: model zawodów.
+    :param contents: słownik {nazwa pola ('rank' lub 'rank_frozen'): zawartość pliku}.
+    """
+    old_files = []
+    for field, content in contents.items():
+        rank_file = getattr(competition, field)
+        if rank_file:
+            old_files.append((rank_file.storage, rank_file.name))
+        # unikalna nazwa pliku - nazwa jest kluczem pamięci podręcznej rankingów (zob. load_rank)
+        rank_file.save(f'{field}-{competition.id}-{uuid.uuid4().hex[:12]}.{RANK_EXTENSION}', ContentFile(content),
+                       save=False)
+
+    competition.save(update_fields=list(contents))
+
+    for storage, name in old_files:
+        storage.delete(name)
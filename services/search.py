@@ -0,0 +1,257 @@
+import re
+from collections import namedtuple
+
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from buzkashi_app.models import Task, Notice, Explanation
+
+Document = namedtuple('Document', ['kind', 'object_id', 'title', 'body'])
+"""Dokument indeksu wyszukiwania: rodzaj ('task', 'notice' lub 'explanation'), id obiektu, tytuł i treść."""
+
+SearchResult = namedtuple('SearchResult', ['kind', 'object_id', 'title', 'snippet', 'rank'])
+"""Wynik wyszukiwania: rodzaj i id obiektu, tytuł, fragment treści z zaznaczonymi słowami (HTML) i ocena."""
+
+KINDS = {Task: 'task', Notice: 'notice', Explanation: 'explanation'}
+"""Rodzaje dokumentów według modelu."""
+
+KIND_CODES = {'task': 1, 'notice': 2, 'explanation': 3}
+"""Kody rodzajów dokumentów. Id wiersza indeksu to id obiektu * 4 + kod rodzaju."""
+
+TABLE = 'buzkashi_search_index'
+"""Nazwa tabeli indeksu wyszukiwania."""
+
+MAX_TERMS = 8
+"""Maksymalna liczba słów zapytania."""
+
+SNIPPET_WORDS = 16
+"""Przybliżona liczba słów fragmentu treści w wynikach."""
+
+_START, _STOP = '\x02', '\x03'
+"""Znaczniki zaznaczenia słów we fragmencie treści zwracanym przez bazę danych (zamieniane na <mark>)."""
+
+
+def row_id(kind, object_id):
+    """
+    :param kind: rodzaj dokumentu.
+    :param object_id: id obiektu.
+    :return: id wiersza indeksu.
+    """
+    return object_id * 4 + KIND_CODES[kind]
+
+
+def terms(query):
+    """
+    Dzieli zapytanie na słowa. Znaki specjalne składni zapytań baz danych są pomijane.
+
+    :param query: zapytanie użytkownika.
+    :return: lista słów (małymi literami).
+    """
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def highlight(snippet):
+    """
+    :param snippet: fragment treści ze znacznikami _START i _STOP.
+    :return: fragment treści jako bezpieczny HTML z zaznaczonymi słowami.
+    """
+    return mark_safe(escape(snippet).replace(_START, '<mark>').replace(_STOP, '</mark>'))
+
+
+class SearchBackend:
+    """
+    Interfejs indeksu wyszukiwania pełnotekstowego. Indeks jest tabelą bazy danych spoza ORM tworzoną metodą
+    install (zob. sygnał post_migrate w buzkashi_app.signals).
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        """
+        :param using: alias połączenia z bazą danych.
+        """
+        self.connection = connections[using]
+
+    def install(self):
+        """
+        Tworzy tabelę indeksu, jeżeli nie istnieje.
+        """
+        raise NotImplementedError
+
+    def index(self, documents):
+        """
+        Dodaje lub aktualizuje dokumenty w indeksie.
+
+        :param documents: iterowalne dokumenty (Document).
+        """
+        raise NotImplementedError
+
+    def remove(self, kind, object_id):
+        """
+        Usuwa dokument z indeksu.
+
+        :param kind: rodzaj dokumentu.
+        :param object_id: id obiektu.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [row_id(kind, object_id)])
+
+    def clear(self):
+        """
+        Usuwa wszystkie dokumenty z indeksu.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE}')
+
+    def search(self, query, limit=20):
+        """
+        Wyszukuje dokumenty zawierające wszystkie słowa zapytania (ostatnie słowo może być początkiem słowa).
+
+        :param query: zapytanie użytkownika.
+        :param limit: maksymalna liczba wyników.
+        :return: lista SearchResult uporządkowana od najlepiej dopasowanych.
+        """
+        raise NotImplementedError
+
+
+class SqliteSearchBackend(SearchBackend):
+    """
+    Indeks wyszukiwania w wirtualnej tabeli SQLite FTS5. Wyniki oceniane są funkcją bm25 (dopasowanie w tytule
+    ma większą wagę), a fragmenty treści wybiera funkcja snippet.
+    """
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+                           f"title, body, kind UNINDEXED, object_id UNINDEXED, "
+                           f"tokenize = 'unicode61 remove_diacritics 2')")
+
+    def index(self, documents):
+        rows = [(row_id(document.kind, document.object_id), document.title, document.body, document.kind,
+                 document.object_id) for document in documents]
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(f'INSERT INTO {TABLE} (rowid, title, body, kind, object_id) '
+                               f'VALUES (%s, %s, %s, %s, %s)', rows)
+
+    def search(self, query, limit=20):
+        words = terms(query)
+        if not words:
+            return []
+
+        match = ' '.join(f'"{word}"*' for word in words)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"SELECT kind, object_id, title, "
+                           f"snippet({TABLE}, 1, %s, %s, '…', %s), bm25({TABLE}, 10.0, 1.0) AS score "
+                           f"FROM {TABLE} WHERE {TABLE} MATCH %s ORDER BY score LIMIT %s",
+                           [_START, _STOP, SNIPPET_WORDS, match, limit])
+            return [SearchResult(kind, object_id, title, highlight(snippet), -score)
+                    for kind, object_id, title, snippet, score in cursor.fetchall()]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Indeks wyszukiwania w tabeli PostgreSQL z kolumną tsvector i indeksem GIN. Słowa tytułu mają wagę A,
+    a treści wagę B. Wyniki oceniane są funkcją ts_rank_cd, a fragmenty treści wybiera funkcja ts_headline.
+    Używana jest konfiguracja 'simple' (bez odmiany słów - PostgreSQL nie zawiera słownika języka polskiego).
+    """
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'CREATE TABLE IF NOT EXISTS {TABLE} ('
+                           f'rowid bigint PRIMARY KEY, title text NOT NULL, body text NOT NULL, '
+                           f'kind varchar(16) NOT NULL, object_id integer NOT NULL, document tsvector NOT NULL)')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {TABLE}_document_idx ON {TABLE} USING gin (document)')
+
+    def index(self, documents):
+        rows = [(row_id(document.kind, document.object_id), document.title, document.body, document.kind,
+                 document.object_id) for document in documents]
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f"INSERT INTO {TABLE} (rowid, title, body, kind, object_id, document) "
+                               f"VALUES (%s, %s, %s, %s, %s, "
+                               f"setweight(to_tsvector('simple', %s), 'A') || "
+                               f"setweight(to_tsvector('simple', %s), 'B')) "
+                               f"ON CONFLICT (rowid) DO UPDATE SET title = excluded.title, body = excluded.body, "
+                               f"document = excluded.document",
+                               [row + (row[1], row[2]) for row in rows])
+
+    def search(self, query, limit=20):
+        words = terms(query)
+        if not words:
+            return []
+
+        options = f'StartSel={_START}, StopSel={_STOP}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}'
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"SELECT kind, object_id, title, ts_headline('simple', body, query, %s), score "
+                           f"FROM (SELECT kind, object_id, title, body, query, ts_rank_cd(document, query) AS score "
+                           f"      FROM {TABLE}, to_tsquery('simple', %s) AS query "
+                           f"      WHERE document @@ query ORDER BY score DESC LIMIT %s) AS matches "
+                           f"ORDER BY score DESC",
+                           [options, ' & '.join(f'{word}:*' for word in words), limit])
+            return [SearchResult(kind, object_id, title, highlight(snippet), score)
+                    for kind, object_id, title, snippet, score in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SqliteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+"""Implementacje indeksu wyszukiwania według rodzaju bazy danych."""
+
+
+def get_backend(using=DEFAULT_DB_ALIAS):
+    """
+    :param using: alias połączenia z bazą danych.
+    :return: indeks wyszukiwania dla bazy danych lub None, jeżeli baza danych nie jest obsługiwana.
+    """
+    backend = BACKENDS.get(connections[using].vendor)
+    return backend(using) if backend is not None else None
+
+
+def document(instance):
+    """
+    Tworzy dokument indeksu dla modelu. Tytułem wyjaśnienia jest tytuł uwagi, której dotyczy.
+
+    :param instance: model zadania, uwagi lub wyjaśnienia.
+    :return: Document.
+    """
+    if isinstance(instance, Explanation):
+        title = Notice.objects.filter(id=instance.notice_id).values_list('title', flat=True).first() or ''
+        return Document('explanation', instance.id, title, instance.body or '')
+    return Document(KINDS[type(instance)], instance.id, instance.title, instance.body or '')
+
+
+def documents():
+    """
+    Generator dokumentów wszystkich zadań, uwag i wyjaśnień. Dane pobierane są iteratorami bez tworzenia modeli.
+
+    :return: generator dokumentów.
+    """
+    for task_id, title, body in Task.objects.order_by('id').values_list('id', 'title', 'body').iterator():
+        yield Document('task', task_id, title, body)
+    for notice_id, title, body in Notice.objects.order_by('id').values_list('id', 'title', 'body').iterator():
+        yield Document('notice', notice_id, title, body)
+    explanations = Explanation.objects.order_by('id').values_list('id', 'notice__title', 'body')
+    for explanation_id, title, body in explanations.iterator():
+        yield Document('explanation', explanation_id, title or '', body or '')
+
+
+def rebuild(using=DEFAULT_DB_ALIAS, batch_size=1000):
+    """
+    Tworzy indeks wyszukiwania od nowa.
+
+    :param using: alias połączenia z bazą danych.
+    :param batch_size: liczba dokumentów zapisywanych jednym zapytaniem.
+    :return: liczba zindeksowanych dokumentów.
+    """
+    backend = get_backend(using)
+    backend.install()
+    backend.clear()
+
+    batch, count = [], 0
+    for item in documents():
+        batch.append(item)
+        if len(batch) >= batch_size:
+            backend.index(batch)
+            count, batch = count + len(batch), []
+    backend.index(batch)
+    return count + len(batch)
@@ -0,0 +1,186 @@
+import hashlib
+import re
+
+from django.utils.html import escape
+
+from buzkashi_app.models import Task
+from services.cache import PartitionedCache
+
+statement_cache = PartitionedCache(max_entries=256, max_partitions=1)
+"""Pamięć podręczna wyrenderowanych treści zadań (HTML) według skrótu treści. Wpisy nie wymagają unieważniania."""
+
+_FENCE = re.compile(r'^```\s*([\w+#-]*)\s*$')
+_MATH_FENCE = re.compile(r'^\$\$\s*$')
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_BULLET = re.compile(r'^\s*[-*+]\s+(.*)$')
+_NUMBERED = re.compile(r'^\s*\d+[.)]\s+(.*)$')
+_QUOTE = re.compile(r'^>\s?(.*)$')
+_RULE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+
+_INLINE_LITERAL = re.compile(r'(`+)(.+?)\1|\$\$(.+?)\$\$|\$(?=\S)(.+?)(?<=\S)\$|\\([\\`*_$\[\]()#+\-.!{}])')
+"""Fragmenty wierszy renderowane dosłownie: kod, wzory matematyczne i znaki poprzedzone ukośnikiem."""
+
+_STRONG = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*|__(?=\S)(.+?)(?<=\S)__')
+_EMPHASIS = re.compile(r'\*(?=\S)(.+?)(?<=\S)\*|(?<!\w)_(?=\S)(.+?)(?<=\S)_(?!\w)')
+_LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+_SAFE_URL = re.compile(r'^(https?://|mailto:|/|#)', re.IGNORECASE)
+_PLACEHOLDER = re.compile('\x00(\\d+)\x00')
+
+
+def body_hash(body):
+    """
+    :param body: treść zadania.
+    :return: skrót SHA-256 treści (szesnastkowo).
+    """
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def render_markdown(text):
+    """
+    Zamienia treść w podzbiorze składni Markdown na HTML. Obsługiwane są nagłówki, akapity, listy (bez
+    zagnieżdżania), cytaty, linie poziome, bloki kodu (```), pogrubienie, kursywa, kod w wierszu, odnośniki
+    (wyłącznie http(s), mailto i adresy względne) oraz wzory LaTeX: $...$ w wierszu i $$...$$ (również jako blok).
+    Wzory nie są przetwarzane - trafiają do elementów z klasą "math" w ogranicznikach \\( \\) lub \\[ \\]
+    do wyrenderowania przez KaTeX/MathJax w przeglądarce. Cały tekst jest escapowany, więc HTML w treści
+    nie jest interpretowany - wynik jest bezpieczny do wstawienia na stronę.
+
+    :param text: treść w formacie Markdown.
+    :return: HTML.
+    """
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    html = []
+    paragraph = []
+    index = 0
+
+    def flush():
+        if paragraph:
+            html.append(f'<p>{render_inline(chr(10).join(paragraph))}</p>')
+            paragraph.clear()
+
+    while index < len(lines):
+        line = lines[index]
+
+        fence = _FENCE.match(line)
+        if fence or _MATH_FENCE.match(line):
+            flush()
+            closing = _FENCE if fence else _MATH_FENCE
+            end = next((end for end in range(index + 1, len(lines)) if closing.match(lines[end])), len(lines))
+            content = escape('\n'.join(lines[index + 1:end]))
+            if fence:
+                language = f' class="language-{escape(fence.group(1))}"' if fence.group(1) else ''
+                html.append(f'<pre><code{language}>{content}</code></pre>')
+            else:
+                html.append(f'<div class="math">\\[{content}\\]</div>')
+            index = end + 1
+            continue
+
+        if not line.strip():
+            flush()
+        elif _HEADING.match(line):
+            flush()
+            level, title = _HEADING.match(line).groups()
+            html.append(f'<h{len(level)}>{render_inline(title)}</h{len(level)}>')
+        elif _RULE.match(line):
+            flush()
+            html.append('<hr>')
+        elif _BULLET.match(line) or _NUMBERED.match(line):
+            flush()
+            pattern, tag = (_BULLET, 'ul') if _BULLET.match(line) else (_NUMBERED, 'ol')
+            items = []
+            while index < len(lines) and pattern.match(lines[index]):
+                items.append(f'<li>{render_inline(pattern.match(lines[index]).group(1))}</li>')
+                index += 1
+            html.append(f'<{tag}>{"".join(items)}</{tag}>')
+            continue
+        elif _QUOTE.match(line):
+            flush()
+            quoted = []
+            while index < len(lines) and _QUOTE.match(lines[index]):
+                quoted.append(_QUOTE.match(lines[index]).group(1))
+                index += 1
+            html.append(f'<blockquote>{render_markdown(chr(10).join(quoted))}</blockquote>')
+            continue
+        else:
+            paragraph.append(line.strip())
+        index += 1
+
+    flush()
+    return '\n'.join(html)
+
+
+def render_inline(text):
+    """
+    Zamienia formatowanie w wierszu (pogrubienie, kursywa, kod, wzory, odnośniki) na HTML. Kod, wzory i odnośniki
+    są zastępowane znacznikami przed przetwarzaniem formatowania, więc znaki * i _ wewnątrz nich nie są
+    interpretowane. Odnośniki muszą mieć bezpieczny adres (http(s), mailto lub adres względny).
+
+    :param text: tekst wiersza.
+    :return: HTML.
+    """
+    literals = []
+
+    def literal(match):
+        code, display, math, escaped = match.group(2), match.group(3), match.group(4), match.group(5)
+        if code is not None:
+            literals.append(f'<code>{escape(code.strip())}</code>')
+        elif display is not None:
+            literals.append(f'<span class="math">\\[{escape(display)}\\]</span>')
+        elif math is not None:
+            literals.append(f'<span class="math">\\({escape(math)}\\)</span>')
+        else:
+            literals.append(escape(escaped))
+        return f'\x00{len(literals) - 1}\x00'
+
+    def expand(text):
+        return _PLACEHOLDER.sub(lambda match: literals[int(match.group(1))], text)
+
+    def link(match):
+        label, url = match.groups()
+        if not _SAFE_URL.match(url):
+            return match.group()
+        literals.append(f'<a href="{url}" rel="nofollow noopener">{expand(label)}</a>')
+        return f'\x00{len(literals) - 1}\x00'
+
+    text = escape(_INLINE_LITERAL.sub(literal, text.replace('\x00', '')))
+    text = _LINK.sub(link, text)
+    text = _STRONG.sub(lambda match: f'<strong>{match.group(1) or match.group(2)}</strong>', text)
+    text = _EMPHASIS.sub(lambda match: f'<em>{match.group(1) or match.group(2)}</em>', text)
+    return expand(text)
+
+
+def update_statement(task):
+    """
+    Renderuje treść zadania do HTML (render_markdown), jeżeli treść zmieniła się od ostatniego renderowania
+    (porównanie skrótów). Nie zapisuje modelu.
+
+    :param task: model zadania.
+    :return: True, jeżeli treść została wyrenderowana ponownie.
+    """
+    digest = body_hash(task.body)
+    if digest == task.body_hash and task.body_html:
+        return False
+
+    task.body_html = render_markdown(task.body)
+    task.body_hash = digest
+    statement_cache.set('statements', digest, task.body_html)
+    return True
+
+
+def statement_html(task_id, digest):
+    """
+    Zwraca wyrenderowaną treść zadania z pamięci podręcznej. W przypadku braku wpisu treść pobierana jest
+    z modelu zadania. Zadania bez wyrenderowanej treści (np. utworzone w panelu administratora) są renderowane
+    i zapisywane przy pierwszym wyświetleniu.
+
+    :param task_id: id zadania.
+    :param digest: skrót treści zadania (Task.body_hash).
+    :return: krotka (skrót treści, HTML). Skrót różni się od przekazanego, jeżeli treść została wyrenderowana.
+    """
+    html = statement_cache.get('statements', digest) if digest else None
+    if html is None:
+        task = Task.objects.only('body', 'body_html', 'body_hash').get(id=task_id)
+        if update_statement(task):
+            task.save(update_fields=['body_html', 'body_hash'])
+        digest, html = task.body_hash, task.body_html
+        statement_cache.set('statements', digest, html)
+    return digest, html
@@ -0,0 +1,115 @@
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.db import transaction
+
+from buzkashi_app.models import Solution, SubmissionCounter, JudgingJob
+from services import plagiarism
+
+FORM_OVERHEAD = 16 * 1024
+"""Dopuszczalny rozmiar pozostałych pól formularza zgłoszenia (oprócz pliku) w bajtach."""
+
+EXTENSIONS = {
+    Solution.ProgrammingLanguage.JAVA: 'java',
+    Solution.ProgrammingLanguage.CPP: 'cpp',
+    Solution.ProgrammingLanguage.CS: 'cs',
+    Solution.ProgrammingLanguage.PYTHON: 'py',
+}
+"""Rozszerzenia plików kodu źródłowego według języka programowania."""
+
+
+class SourceUploadHandler(FileUploadHandler):
+    """
+    Handler przesyłania pliku kodu źródłowego. Podczas odbierania kolejnych fragmentów pliku wylicza skrót SHA-256
+    i rozmiar, więc po zakończeniu przesyłania plik nie jest czytany ponownie. Przesyłanie jest przerywane,
+    gdy tylko rozmiar pliku przekroczy limit - zapytania, których nagłówek Content-Length przekracza limit,
+    są odrzucane przed odebraniem pliku. Plik przechowywany jest w pamięci (jego rozmiar jest ograniczony).
+    Gotowy plik ma atrybut sha256 ze skrótem (szesnastkowo).
+    """
+
+    def __init__(self, request=None, max_size=None):
+        """
+        :param request: zapytanie HTTP.
+        :param max_size: maksymalny rozmiar pliku w bajtach. Domyślnie: settings.SOLUTION_MAX_SIZE.
+        """
+        super().__init__(request)
+        self.max_size = max_size or settings.SOLUTION_MAX_SIZE
+        self.too_large = False
+        self.digest = None
+        self.buffer = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        """
+        Oznacza zapytanie jako zbyt duże na podstawie nagłówka Content-Length.
+        """
+        self.too_large = content_length > self.max_size + FORM_OVERHEAD
+
+    def new_file(self, *args, **kwargs):
+        """
+        Rozpoczyna odbieranie pliku. Przerywa przesyłanie, jeżeli zapytanie jest zbyt duże.
+        """
+        super().new_file(*args, **kwargs)
+        if self.too_large:
+            raise StopUpload(connection_reset=True)
+        self.digest = hashlib.sha256()
+        self.buffer = BytesIO()
+
+    def receive_data_chunk(self, raw_data, start):
+        """
+        Dołącza fragment pliku i aktualizuje skrót. Przerywa przesyłanie po przekroczeniu limitu rozmiaru.
+        """
+        if start + len(raw_data) > self.max_size:
+            self.too_large = True
+            raise StopUpload(connection_reset=True)
+        self.digest.update(raw_data)
+        self.buffer.write(raw_data)
+
+    def file_complete(self, file_size):
+        """
+        Zwraca odebrany plik z atrybutem sha256.
+        """
+        self.buffer.seek(0)
+        file = InMemoryUploadedFile(self.buffer, self.field_name, self.file_name, self.content_type, file_size,
+                                    self.charset, self.content_type_extra)
+        file.sha256 = self.digest.hexdigest()
+        return file
+
+
+def submit(team, task, language, source):
+    """
+    Zgłasza rozwiązanie zespołu. Plik kodu źródłowego zapisywany jest w magazynie plików przed rozpoczęciem
+    transakcji, więc transakcja obejmuje tylko trzy krótkie zapytania: zwiększenie licznika zgłoszeń
+    (SubmissionCounter.next_version), zapis rozwiązania i dodanie go do kolejki oceny (JudgingJob).
+    Rozwiązanie przypisywane jest do sędziego - autora zadania.
+    Jeżeli transakcja się nie powiedzie, zapisany plik jest usuwany.
+    Po zakończeniu transakcji rozwiązanie jest dodawane do indeksu odcisków (zob. services.plagiarism).
+
+    :param team: model zespołu.
+    :param task: model zadania.
+    :param language: język programowania z enumeratora Solution.ProgrammingLanguage.
+    :param source: plik kodu źródłowego (z SourceUploadHandler lub z atrybutem sha256).
+    :return: model zapisanego rozwiązania.
+    """
+    digest = getattr(source, 'sha256', None)
+    if digest is None:
+        digest = hashlib.sha256(source.read()).hexdigest()
+        source.seek(0)
+    solution = Solution(author=team, task=task, judge_id=task.author_id, programming_language=language,
+                        status=Solution.SolutionStatus.PENDING, source_hash=digest, source_size=source.size)
+    solution.source_code.save(f'{team.id}-{task.id}-{digest[:16]}.{EXTENSIONS[language]}', source, save=False)
+
+    try:
+        with transaction.atomic():
+            solution.version = SubmissionCounter.next_version(team, task)
+            solution.save()
+            JudgingJob.objects.create(solution=solution)
+    except Exception:
+        solution.source_code.delete(save=False)
+        raise
+
+    source.seek(0)
+    plagiarism.index_safely(solution, source.read())
+    return solution
@@ -0,0 +1,172 @@
+import math
+
+import msgpack
+from django.db import transaction
+
+from buzkashi_app.models import Team, Solution, StandingsSnapshot, StandingsDelta
+from services.scoreboard import RankRow
+
+SNAPSHOT_INTERVAL = 15
+"""Minimalny odstęp (w minutach) między pełnymi migawkami rankingu."""
+
+
+def minute_of(competition, timestamp):
+    """
+    Zwraca minutę zawodów dla danej chwili.
+
+    :param competition: model zawodów.
+    :param timestamp: chwila (datetime).
+    :return: liczba pełnych minut od rozpoczęcia zawodów (nie mniejsza od -1).
+    """
+    return max(math.floor((timestamp - competition.start_date).total_seconds() / 60), -1)
+
+
+def _pack(state):
+    """
+    Serializuje stan zespołów.
+
+    :param state: słownik {id zespołu: (zadania rozwiązane, czas w minutach)}.
+    :return: dane w formacie msgpack.
+    """
+    return msgpack.packb([[team_id, solved, time] for team_id, (solved, time) in state.items()])
+
+
+def _unpack(data):
+    """
+    Deserializuje stan zespołów.
+
+    :param data: dane w formacie msgpack.
+    :return: słownik {id zespołu: (zadania rozwiązane, czas w minutach)}.
+    """
+    return {team_id: (solved, time) for team_id, solved, time in msgpack.unpackb(bytes(data))}
+
+
+def state_at(competition, minute):
+    """
+    Odtwarza stan zespołów po danej minucie zawodów: od najbliższej wcześniejszej migawki stosuje kolejne
+    zmiany aż do danej minuty włącznie. Koszt zależy od liczby zmian od migawki, a nie od długości zawodów.
+
+    :param competition: model zawodów.
+    :param minute: minuta zawodów.
+    :return: słownik {id zespołu: (zadania rozwiązane, czas w minutach)}.
+    """
+    snapshot = StandingsSnapshot.objects.filter(competition=competition, minute__lte=minute) \
+        .order_by('-minute').first()
+
+    state = _unpack(snapshot.data) if snapshot else {}
+    deltas = StandingsDelta.objects.filter(competition=competition, minute__lte=minute)
+    if snapshot:
+        deltas = deltas.filter(minute__gt=snapshot.minute)
+
+    for data in deltas.order_by('minute').values_list('data', flat=True):
+        state.update(_unpack(data))
+    return state
+
+
+def record(competition, team_id, minute, state):
+    """
+    Zapisuje zmianę stanu zespołu w danej minucie zawodów. Migawki od tej minuty stają się nieaktualne i są
+    usuwane. Jeżeli od ostatniej migawki minęło co najmniej SNAPSHOT_INTERVAL minut, zapisywana jest nowa migawka.
+
+    :param competition: model zawodów.
+    :param team_id: id zespołu.
+    :param minute: minuta zawodów.
+    :param state: nowy stan zespołu - para (zadania rozwiązane, czas w minutach).
+    """
+    with transaction.atomic():
+        delta, created = StandingsDelta.objects.select_for_update() \
+            .get_or_create(competition=competition, minute=minute, defaults={'data': _pack({team_id: state})})
+        if not created:
+            changes = _unpack(delta.data)
+            changes[team_id] = state
+            delta.data = _pack(changes)
+            delta.save(update_fields=['data'])
+
+        StandingsSnapshot.objects.filter(competition=competition, minute__gte=minute).delete()
+        if not StandingsSnapshot.objects.filter(competition=competition,
+                                                minute__gt=minute - SNAPSHOT_INTERVAL).exists():
+            StandingsSnapshot.objects.create(competition=competition, minute=minute,
+                                             data=_pack(state_at(competition, minute)))
+
+
+def _accepted(solutions):
+    """
+    Generator stanów zespołów po kolejnych zaakceptowanych rozwiązaniach. Czas zespołu jest sumą ocen rozwiązań
+    (Solution.score), a liczba rozwiązanych zadań - liczbą różnych zadań.
+
+    :param solutions: zaakceptowane rozwiązania w kolejności złożenia (z powiązanym zespołem i zawodami).
+    :return: generator par (rozwiązanie, stan zespołu po rozwiązaniu).
+    """
+    solved_tasks = {}
+    state = {}
+    for solution in solutions:
+        tasks = solved_tasks.setdefault(solution.author_id, set())
+        tasks.add(solution.task_id)
+        time = state.get(solution.author_id, (0, 0))[1] + int(solution.score.total_seconds() // 60)
+        state[solution.author_id] = (len(tasks), time)
+        yield solution, state[solution.author_id]
+
+
+def _accepted_solutions(**filters):
+    """
+    :return: zapytanie o zaakceptowane rozwiązania w kolejności złożenia.
+    """
+    return Solution.objects.filter(status=Solution.SolutionStatus.ACCEPTED, **filters) \
+        .select_related('author__competition').order_by('submission_time', 'id')
+
+
+def record_verdict(solution):
+    """
+    Zapisuje w historii rankingu zmianę wynikającą z werdyktu rozwiązania. Zmiana przypisywana jest do minuty
+    złożenia rozwiązania. Werdykt może dotyczyć rozwiązania złożonego przed rozwiązaniami już zaakceptowanymi,
+    więc stany zespołu są wyliczane od nowa z zaakceptowanych rozwiązań i zapisywane dla każdej minuty od minuty
+    złożenia rozwiązania - tak jak w rebuild.
+
+    :param solution: model rozwiązania (z powiązanym zespołem i zawodami).
+    """
+    competition = solution.author.competition
+    minute = minute_of(competition, solution.submission_time)
+    with transaction.atomic():
+        for accepted, state in _accepted(_accepted_solutions(author_id=solution.author_id).iterator()):
+            accepted_minute = minute_of(competition, accepted.submission_time)
+            if accepted_minute >= minute:
+                record(competition, solution.author_id, accepted_minute, state)
+
+
+def rebuild(competition):
+    """
+    Odbudowuje historię rankingu zawodów od początku na podstawie zaakceptowanych rozwiązań
+    (w kolejności złożenia). Czas zespołu jest sumą ocen rozwiązań (Solution.score).
+
+    :param competition: model zawodów.
+    """
+    with transaction.atomic():
+        StandingsSnapshot.objects.filter(competition=competition).delete()
+        StandingsDelta.objects.filter(competition=competition).delete()
+
+        for solution, state in _accepted(_accepted_solutions(author__competition=competition).iterator()):
+            record(competition, solution.author_id, minute_of(competition, solution.submission_time), state)
+
+
+def standings_at(competition, timestamp):
+    """
+    Zwraca ranking zawodów w danej chwili.
+
+    :param competition: model zawodów.
+    :param timestamp: chwila (datetime).
+    :return: lista wierszy RankRow.
+    """
+    state = state_at(competition, minute_of(competition, timestamp))
+    names = dict(Team.objects.filter(competition=competition, is_disqualified=False, is_waitlisted=False)
+                 .values_list('id', 'name'))
+
+    ordered = sorted(((name, state.get(team_id, (0, 0))) for team_id, name in names.items()),
+                     key=lambda item: (-item[1][0], item[1][1], item[0]))
+
+    rows = []
+    position, previous = 0, None
+    for index, (name, (solved, time)) in enumerate(ordered, start=1):
+        if (solved, time) != previous:
+            position, previous = index, (solved, time)
+        rows.append(RankRow(position, name, solved, time))
+    return rows
@@ -0,0 +1,223 @@
+import logging
+import os
+import random
+import socket
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from buzkashi_app.models import JudgingJob
+from services import blobs, judge
+
+logger = logging.getLogger(__name__)
+
+LEASE_DURATION = timedelta(seconds=3 * judge.COMPILE_TIME_LIMIT)
+"""
+Czas dzierżawy zadania oceny. Dzierżawa przedłużana jest między krokami oceny, gdy minie połowa czasu dzierżawy,
+więc połowa dzierżawy musi być dłuższa niż najdłuższy krok: kompilacja (judge.COMPILE_TIME_LIMIT) lub ocena
+jednego testu (limit czasu rozwiązania i programu sprawdzającego).
+"""
+
+POLL_INTERVAL = 1.0
+"""Średni czas oczekiwania procesu oceniającego na nowe zadania oceny przy pustej kolejce w sekundach."""
+
+MAX_ATTEMPTS = 3
+"""Liczba pobrań zadania oceny, po której zadanie z wygasłą dzierżawą lub błędem oceny otrzymuje status FAILED."""
+
+CANDIDATES = 16
+"""Liczba najstarszych zadań oceny pobieranych jednym zapytaniem w bazach danych bez SKIP LOCKED."""
+
+
+class LeaseLost(Exception):
+    """
+    Dzierżawa zadania oceny wygasła i zadanie zostało pobrane przez inny proces oceniający.
+    """
+
+
+def worker_name():
+    """
+    :return: domyślna nazwa procesu oceniającego: <nazwa hosta>:<pid>.
+    """
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _candidates(now):
+    """
+    :param now: bieżący czas.
+    :return: zapytania o zadania oceny do pobrania w kolejności pierwszeństwa: zadania z wygasłą dzierżawą
+        (porzucone przez przerwane procesy oceniające) i oczekujące zadania oceny.
+    """
+    return [
+        JudgingJob.objects.filter(status=JudgingJob.JobStatus.RUNNING, lease_expires__lt=now).order_by('lease_expires'),
+        JudgingJob.objects.filter(status=JudgingJob.JobStatus.QUEUED).order_by('id'),
+    ]
+
+
+def _lease(status, attempts, worker, now, lease):
+    """
+    :return: słownik zmienianych pól pobieranego zadania oceny. Zadanie z wygasłą dzierżawą, które było pobierane
+        MAX_ATTEMPTS razy, otrzymuje status FAILED zamiast nowej dzierżawy.
+    """
+    if status == JudgingJob.JobStatus.RUNNING and attempts >= MAX_ATTEMPTS:
+        return {'status': JudgingJob.JobStatus.FAILED, 'lease_expires': None}
+    return {'status': JudgingJob.JobStatus.RUNNING, 'worker': worker, 'lease_expires': now + lease,
+            'attempts': attempts + 1}
+
+
+def _claim_locked(worker, now, lease):
+    """
+    Pobiera zadanie oceny zapytaniem SELECT ... FOR UPDATE SKIP LOCKED: wiersze zablokowane przez inne procesy
+    oceniające są pomijane, więc procesy nie czekają na siebie nawzajem.
+    """
+    with transaction.atomic():
+        for queryset in _candidates(now):
+            while True:
+                job = queryset.select_for_update(skip_locked=True).first()
+                if job is None:
+                    break
+                updates = _lease(job.status, job.attempts, worker, now, lease)
+                for field, value in updates.items():
+                    setattr(job, field, value)
+                job.save(update_fields=list(updates))
+                if job.status == JudgingJob.JobStatus.RUNNING:
+                    return job
+    return None
+
+
+def _claim_compare_and_set(worker, now, lease):
+    """
+    Pobiera zadanie oceny bez blokowania wierszy (bazy danych bez SKIP LOCKED, np. SQLite): kolejne zadania spośród
+    CANDIDATES najstarszych są zmieniane warunkowym zapytaniem UPDATE (warunki zapytania o zadania i porównanie
+    liczby pobrań). Jeżeli inny proces pobrał zadanie wcześniej lub przedłużył jego dzierżawę, zapytanie nie zmienia
+    wiersza i próbowane jest kolejne zadanie.
+    """
+    for queryset in _candidates(now):
+        for job_id, status, attempts in queryset.values_list('id', 'status', 'attempts')[:CANDIDATES]:
+            updates = _lease(status, attempts, worker, now, lease)
+            claimed = queryset.filter(id=job_id, attempts=attempts).update(**updates)
+            if claimed and updates['status'] == JudgingJob.JobStatus.RUNNING:
+                return JudgingJob.objects.get(id=job_id)
+    return None
+
+
+def claim(worker, lease=LEASE_DURATION):
+    """
+    Pobiera najstarsze zadanie oceny: zadanie z wygasłą dzierżawą lub oczekujące. Pobrane zadanie otrzymuje status
+    RUNNING, dzierżawę do czasu now + lease i zwiększoną liczbę pobrań. Każde zadanie może być jednocześnie
+    dzierżawione przez co najwyżej jeden proces oceniający. Procesy na wielu maszynach korzystają wyłącznie
+    ze wspólnej bazy danych, a pobranie zadania wymaga kilku krótkich zapytań, więc przepustowość oceny rośnie
+    z liczbą procesów.
+
+    :param worker: nazwa procesu oceniającego.
+    :param lease: czas dzierżawy.
+    :return: model pobranego zadania oceny lub None, jeżeli kolejka jest pusta.
+    """
+    now = timezone.now()
+    if connection.features.has_select_for_update_skip_locked:
+        return _claim_locked(worker, now, lease)
+    return _claim_compare_and_set(worker, now, lease)
+
+
+def _held(job):
+    """
+    :param job: model dzierżawionego zadania oceny.
+    :return: zapytanie o wiersz zadania, jeżeli dzierżawa nie została przejęta przez inny proces.
+    """
+    return JudgingJob.objects.filter(id=job.id, status=JudgingJob.JobStatus.RUNNING, attempts=job.attempts)
+
+
+def heartbeat(job, lease=LEASE_DURATION):
+    """
+    Przedłuża dzierżawę zadania oceny do czasu now + lease.
+
+    :param job: model dzierżawionego zadania oceny.
+    :param lease: czas dzierżawy.
+    :raise LeaseLost: jeżeli zadanie zostało pobrane przez inny proces oceniający.
+    """
+    expires = timezone.now() + lease
+    if not _held(job).update(lease_expires=expires):
+        raise LeaseLost(f'Utracono dzierżawę zadania oceny {job.id}')
+    job.lease_expires = expires
+
+
+def complete(job, results):
+    """
+    Kończy zadanie oceny i zapisuje wyniki testów rozwiązania w jednej transakcji. Wyniki są zapisywane tylko,
+    jeżeli proces nadal dzierżawi zadanie.
+
+    :param job: model dzierżawionego zadania oceny.
+    :param results: lista niezapisanych wyników testów.
+    :raise LeaseLost: jeżeli zadanie zostało pobrane przez inny proces oceniający.
+    """
+    with transaction.atomic():
+        if not _held(job).update(status=JudgingJob.JobStatus.DONE, lease_expires=None):
+            raise LeaseLost(f'Utracono dzierżawę zadania oceny {job.id}')
+        judge.save_results(job.solution, results)
+    job.status = JudgingJob.JobStatus.DONE
+
+
+def release(job):
+    """
+    Zwraca zadanie oceny do kolejki po błędzie oceny. Zadanie pobrane MAX_ATTEMPTS razy otrzymuje status FAILED.
+
+    :param job: model dzierżawionego zadania oceny.
+    """
+    status = JudgingJob.JobStatus.FAILED if job.attempts >= MAX_ATTEMPTS else JudgingJob.JobStatus.QUEUED
+    _held(job).update(status=status, lease_expires=None)
+
+
+def process(job, lease=LEASE_DURATION):
+    """
+    Ocenia rozwiązanie zadania oceny (judge.evaluate_solution) i zapisuje wyniki. Dzierżawa przedłużana jest
+    przed i po kompilacji oraz po testach, gdy minie połowa czasu dzierżawy, więc liczba zapisów w bazie danych nie zależy
+    od liczby testów. Po utracie dzierżawy ocena jest przerywana, a wyniki odrzucane.
+
+    :param job: model dzierżawionego zadania oceny.
+    :param lease: czas dzierżawy.
+    :return: True, jeżeli wyniki zostały zapisane.
+    """
+    def progress():
+        if job.lease_expires - timezone.now() < lease / 2:
+            heartbeat(job, lease)
+
+    results = []
+    try:
+        results = judge.evaluate_solution(job.solution, progress)
+        complete(job, results)
+        return True
+    except LeaseLost:
+        logger.warning('Utracono dzierżawę zadania oceny %s - wyniki zostały odrzucone', job.id)
+    except Exception:
+        logger.exception('Nie udało się ocenić rozwiązania %s', job.solution_id)
+        release(job)
+    for result in results:
+        blobs.release_files(result)
+    return False
+
+
+def work(worker=None, lease=LEASE_DURATION, poll=POLL_INTERVAL, once=False, stop=None):
+    """
+    Pętla procesu oceniającego: pobiera i ocenia kolejne zadania oceny. Przy pustej kolejce czeka losowy czas
+    (średnio poll sekund), więc procesy nie odpytują bazy danych jednocześnie.
+
+    :param worker: nazwa procesu oceniającego. Domyślnie: worker_name().
+    :param lease: czas dzierżawy.
+    :param poll: średni czas oczekiwania przy pustej kolejce w sekundach.
+    :param once: True, jeżeli pętla ma się zakończyć po opróżnieniu kolejki.
+    :param stop: opcjonalna funkcja bez argumentów - pętla kończy się, gdy zwróci True (sprawdzana między
+        zadaniami oceny).
+    :return: liczba ocenionych rozwiązań.
+    """
+    worker = worker or worker_name()
+    processed = 0
+    while stop is None or not stop():
+        job = claim(worker, lease)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll * random.uniform(0.5, 1.5))
+            continue
+        processed += process(job, lease)
+    return processed
@@ -455,10 +455,15 @@ class RegistrationViewTest(StaticLiveServerTestCase):
 
     def select_institution(self, id_value):
         """
-        Wybiera z pola select placówkę edukacyjną o podanym id.
+        Wyszukuje placówkę edukacyjną o podanym id po nazwie i wybiera ją z pola select.
 
         :param id_value: Id placówki edukacyjnej.
         """
+        search = self.browser.find_element_by_id('id_institution_search')
+        search.clear()
+        search.send_keys(EduInstitution.objects.get(id=id_value).name)
+        self.browser.find_element_by_css_selector(f'#id_institution option[value="{id_value}"]')
+
         select = Select(self.browser.find_element_by_id('id_institution'))
         select.select_by_value(id_value)
 